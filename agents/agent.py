@@ -10,6 +10,8 @@ class Agent(ABC):
             player_symbol (str): 'X' or 'O'
         """
         self.player_symbol = player_symbol
+        self.epsilon = 0.0  # Exploration rate; agents that do not explore keep it at 0
+        self.episode_count = 0
     
     @abstractmethod
     def choose_action(self, state):
@@ -51,4 +53,12 @@ class Agent(ABC):
         Args:
             filepath (str): Path to the file
         """
+        pass
+    
+    def increment_episode(self):
+        """Increment the episode counter."""
+        self.episode_count += 1
+    
+    def close(self):
+        """Release resources such as worker processes held by the agent."""
         pass
\ No newline at end of file
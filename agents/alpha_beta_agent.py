@@ -0,0 +1,363 @@
+import time
+import pickle
+from agents.agent import Agent
+from game.board import THREAT_FIVE, THREAT_OPEN_THREE
+
+# Score of a won position; wins found sooner score higher
+WIN_SCORE = 1000000
+
+# Static evaluation weight of an empty cell by the length of the line
+# (index, capped at 4) a stone there would complete in one direction
+LINE_WEIGHTS = [0, 1, 8, 64, 512]
+
+# Move ordering weight by threat level (see game.board.THREAT_*)
+ORDER_WEIGHTS = [0, 10, 20, 100, 200, 10000, 1000000]
+
+# Transposition table entry bounds
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is used up."""
+
+class AlphaBetaAgent(Agent):
+    """Gomoku agent playing by alpha-beta search with iterative deepening.
+    
+    The search explores the board in place with make/unmake, caches results
+    in a Zobrist-keyed transposition table of fixed size, and orders moves by
+    threats first, then killer moves and the history heuristic. It does not
+    learn; it is meant as a fixed-strength opponent for evaluation.
+    """
+    
+    def __init__(self, player_symbol, time_limit=1.0, max_depth=8, max_moves=12, table_size=1 << 18):
+        """Initialize the search agent.
+        
+        Args:
+            player_symbol (str): 'X' or 'O'
+            time_limit (float): Search time budget per move in seconds
+            max_depth (int): Maximum search depth in plies
+            max_moves (int): Number of best-ordered moves searched at each node
+            table_size (int): Number of transposition table entries
+        """
+        super().__init__(player_symbol)
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.max_moves = max_moves
+        self.table_size = max(2, table_size - table_size % 2)
+        self.table = [None] * self.table_size
+        self.killers = {}
+        self.history_scores = {}
+        
+        # Statistics of the last search
+        self.nodes = 0
+        self.last_depth = 0
+        self.deadline = 0.0
+    
+    def choose_action(self, state):
+        """Choose the best move found within the time budget.
+        
+        Args:
+            state (dict): Current game state
+        
+        Returns:
+            tuple: (row, col) position to play
+        """
+        if not state['valid_moves']:
+            raise ValueError("No valid moves available")
+        
+        board = state['board']
+        if not hasattr(board, 'threat_level'):
+            raise ValueError("Alpha-beta search needs the threat index of the 'board' engine")
+        player = state['current_player']
+        if board.move_count == 0:
+            return board.get_candidate_moves()[0]
+        
+        self.deadline = time.perf_counter() + self.time_limit
+        self.nodes = 0
+        self.last_depth = 0
+        self.killers = {}
+        self.history_scores = {move: score // 2 for move, score in self.history_scores.items() if score > 1}
+        
+        best_move = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._search_root(board, depth, player)
+            except SearchTimeout:
+                break
+            
+            best_move = move
+            self.last_depth = depth
+            if abs(score) >= WIN_SCORE - self.max_depth:
+                break  # Forced result, deeper search cannot change it
+        
+        if best_move is None:
+            best_move = self._ordered_moves(board, player, None, 0)[0]
+        return best_move
+    
+    def _search_root(self, board, depth, player):
+        """Search the root position to a fixed depth.
+        
+        Args:
+            board (Board): Board to search, restored on return
+            depth (int): Search depth in plies
+            player (str): Side to move
+        
+        Returns:
+            tuple: (score, move) for the side to move
+        """
+        opponent = 'O' if player == 'X' else 'X'
+        entry = self._probe(board.hash)
+        moves = self._ordered_moves(board, player, entry[4] if entry else None, 0)
+        if board.threat_level(moves[0][0], moves[0][1], player) == THREAT_FIVE:
+            return WIN_SCORE, moves[0]
+        
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            board.make_move(move[0], move[1], player)
+            try:
+                score = -self._search(board, depth - 1, -beta, -alpha, opponent, 1)
+            finally:
+                board.unmake_move()
+            
+            if score > alpha:
+                alpha = score
+                best_move = move
+        
+        self._store(board.hash, depth, alpha, EXACT, best_move)
+        return alpha, best_move
+    
+    def _search(self, board, depth, alpha, beta, player, ply):
+        """Negamax alpha-beta search.
+        
+        Args:
+            board (Board): Board to search, restored on return
+            depth (int): Remaining depth in plies
+            alpha (int): Lower bound
+            beta (int): Upper bound
+            player (str): Side to move
+            ply (int): Distance from the root
+        
+        Returns:
+            int: Score for the side to move
+        
+        Raises:
+            SearchTimeout: If the time budget runs out
+        """
+        # Nodes cost up to milliseconds (move ordering scans every candidate),
+        # so the clock, which is cheap by comparison, is read at every one
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        
+        # Transposition table cutoff
+        original_alpha = alpha
+        entry = self._probe(board.hash)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                score, bound = entry[2], entry[3]
+                if bound == EXACT:
+                    return score
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+        
+        if depth <= 0:
+            return self._evaluate(board, player, ply)
+        
+        moves = self._ordered_moves(board, player, tt_move, ply)
+        if not moves:
+            return 0  # Board is full
+        if board.threat_level(moves[0][0], moves[0][1], player) == THREAT_FIVE:
+            return WIN_SCORE - ply
+        
+        opponent = 'O' if player == 'X' else 'X'
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        for move in moves:
+            board.make_move(move[0], move[1], player)
+            try:
+                score = -self._search(board, depth - 1, -beta, -alpha, opponent, ply + 1)
+            finally:
+                board.unmake_move()
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                # Remember quiet refutations for move ordering
+                killers = self.killers.setdefault(ply, [])
+                if move not in killers:
+                    killers.insert(0, move)
+                    del killers[2:]
+                self.history_scores[move] = self.history_scores.get(move, 0) + depth * depth
+                break
+        
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self._store(board.hash, depth, best_score, bound, best_move)
+        return best_score
+    
+    def _ordered_moves(self, board, player, tt_move, ply):
+        """Get the moves worth searching, best first.
+        
+        Winning moves come first. If the opponent threatens to win, only the
+        blocking moves are returned.
+        
+        Args:
+            board (Board): Current board
+            player (str): Side to move
+            tt_move (tuple): Best move stored in the transposition table, if any
+            ply (int): Distance from the root
+        
+        Returns:
+            list: Up to max_moves (row, col) tuples
+        """
+        opponent = 'O' if player == 'X' else 'X'
+        killers = self.killers.get(ply, ())
+        scored = []
+        blocks = []
+        for move in board.get_candidate_moves():
+            attack = board.threat_level(move[0], move[1], player)
+            defend = board.threat_level(move[0], move[1], opponent)
+            if attack == THREAT_FIVE:
+                return [move]
+            if defend == THREAT_FIVE:
+                blocks.append(move)
+            
+            score = ORDER_WEIGHTS[attack] * 2 + ORDER_WEIGHTS[defend] + self.history_scores.get(move, 0)
+            if move == tt_move:
+                score += 10 * ORDER_WEIGHTS[THREAT_FIVE]
+            elif move in killers:
+                score += ORDER_WEIGHTS[THREAT_OPEN_THREE]
+            scored.append((score, move))
+        
+        if blocks:
+            return blocks
+        scored.sort(reverse=True)
+        return [move for _, move in scored[:self.max_moves]]
+    
+    def _evaluate(self, board, player, ply):
+        """Statically evaluate a position.
+        
+        Args:
+            board (Board): Current board
+            player (str): Side to move
+            ply (int): Distance from the root
+        
+        Returns:
+            int: Score for the side to move
+        """
+        opponent = 'O' if player == 'X' else 'X'
+        own = board.runs[player]
+        other = board.runs[opponent]
+        size = board.size
+        score = 0
+        for row, col in board.candidates:
+            base = (row * size + col) * 8
+            for i in range(base, base + 8, 2):
+                length = own[i] + own[i + 1]
+                if length >= 4:
+                    return WIN_SCORE - ply - 1  # Side to move completes five
+                if length:
+                    score += LINE_WEIGHTS[length]
+                length = other[i] + other[i + 1]
+                if length:
+                    score -= LINE_WEIGHTS[min(length, 4)]
+        return score
+    
+    def _probe(self, key):
+        """Look up a position in the transposition table.
+        
+        Args:
+            key (int): Zobrist hash of the position
+        
+        Returns:
+            tuple: (key, depth, score, bound, move), or None if not stored
+        """
+        slot = (key % (self.table_size // 2)) * 2
+        entry = self.table[slot]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.table[slot + 1]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+    
+    def _store(self, key, depth, score, bound, move):
+        """Store a search result in the transposition table.
+        
+        Each bucket has two entries: one keeps the deepest result seen, the
+        other is always overwritten by results that do not qualify for the first.
+        
+        Args:
+            key (int): Zobrist hash of the position
+            depth (int): Depth the position was searched to
+            score (int): Search score
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND
+            move (tuple): Best move found
+        """
+        slot = (key % (self.table_size // 2)) * 2
+        deepest = self.table[slot]
+        entry = (key, depth, score, bound, move)
+        if deepest is None or deepest[0] == key or depth >= deepest[1]:
+            self.table[slot] = entry
+        else:
+            self.table[slot + 1] = entry
+    
+    def learn(self, state, action, reward, next_state):
+        """Search agents do not learn from experience.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        pass
+    
+    def save(self, filepath):
+        """Save the search settings to a file.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        with open(filepath, 'wb') as f:
+            pickle.dump({
+                'time_limit': self.time_limit,
+                'max_depth': self.max_depth,
+                'max_moves': self.max_moves,
+                'table_size': self.table_size
+            }, f)
+    
+    def load(self, filepath):
+        """Load search settings from a file.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+                self.time_limit = data['time_limit']
+                self.max_depth = data['max_depth']
+                self.max_moves = data['max_moves']
+                self.table_size = data['table_size']
+                self.table = [None] * self.table_size
+        except (FileNotFoundError, KeyError):
+            print(f"No saved settings found for agent {self.player_symbol} or invalid format")
\ No newline at end of file
@@ -0,0 +1,185 @@
+from agents.q_learning_agent import QLearningAgent
+
+class QSnapshot:
+    """Read-only view of a Q-table as it was when the snapshot was taken.
+    
+    Snapshots of one table form a chain, oldest first. Each snapshot keeps
+    the pre-images of the states first changed while it was the newest one,
+    i.e. copies of their action values from before the change. A lookup walks
+    from the snapshot towards newer ones and takes the first pre-image it
+    finds; states changed in none of them are read from the live table.
+    Taking a snapshot is O(1) and its memory grows with the number of states
+    changed afterwards, not with the size of the table.
+    """
+    
+    def __init__(self, chain):
+        """Initialize an empty snapshot; use SnapshotChain.snapshot.
+        
+        Args:
+            chain (SnapshotChain): Chain the snapshot belongs to
+        """
+        self.chain = chain
+        self.preimages = {}
+        self.older = None
+        self.newer = None
+    
+    def actions(self, state_key):
+        """Get the action values a state had when the snapshot was taken.
+        
+        Args:
+            state_key (str): State representation
+        
+        Returns:
+            dict: {"row,col": value}, or None if the state was unknown; do not modify
+        """
+        node = self
+        while node is not None:
+            preimages = node.preimages
+            if state_key in preimages:
+                return preimages[state_key]
+            node = node.newer
+        return self.chain.q_table.get(state_key)
+    
+    def __len__(self):
+        """Get the number of pre-images held by this snapshot."""
+        return len(self.preimages)
+    
+    def release(self):
+        """Remove the snapshot from its chain.
+        
+        Its pre-images are handed to the next older snapshot, which still
+        needs those it does not hold itself.
+        """
+        chain = self.chain
+        if self.older is not None:
+            older = self.older.preimages
+            for state_key, actions in self.preimages.items():
+                older.setdefault(state_key, actions)
+            self.older.newer = self.newer
+        if self.newer is not None:
+            self.newer.older = self.older
+        if chain.newest is self:
+            chain.newest = self.older
+        self.preimages = {}
+        self.older = self.newer = None
+
+class SnapshotChain:
+    """Copy-on-write snapshots of a live Q-table.
+    
+    The agents writing to the table call before_write with a state's key
+    before changing its values (QLearningAgent does this once its
+    `snapshots` attribute is set to the chain).
+    """
+    
+    def __init__(self, q_table):
+        """Initialize a chain without snapshots.
+        
+        Args:
+            q_table (dict): Live Q-table
+        """
+        self.q_table = q_table
+        self.newest = None
+    
+    def snapshot(self):
+        """Freeze the current contents of the table.
+        
+        Returns:
+            QSnapshot: New newest snapshot
+        """
+        snapshot = QSnapshot(self)
+        snapshot.older = self.newest
+        if self.newest is not None:
+            self.newest.newer = snapshot
+        self.newest = snapshot
+        return snapshot
+    
+    def before_write(self, state_key):
+        """Preserve a state's values before the live table changes them.
+        
+        Args:
+            state_key (str): State about to be updated
+        """
+        newest = self.newest
+        if newest is not None and state_key not in newest.preimages:
+            actions = self.q_table.get(state_key)
+            newest.preimages[state_key] = None if actions is None else dict(actions)
+
+class FrozenQAgent(QLearningAgent):
+    """Greedy agent playing from a Q-table snapshot; it never learns.
+    
+    State keys are formed like those of the agent the snapshot was taken
+    from, so the snapshot plays the side that agent played, or either side
+    if its table is perspective-normalized.
+    """
+    
+    def __init__(self, snapshot, source, player_symbol=None):
+        """Initialize the frozen agent.
+        
+        Args:
+            snapshot (QSnapshot): Q-table snapshot
+            source (QLearningAgent): Agent whose table was snapshotted
+            player_symbol (str, optional): Side to play; the source's if not given
+        """
+        super().__init__(player_symbol or source.player_symbol,
+                         epsilon_start=0.0, epsilon_end=0.0,
+                         normalize_perspective=source.normalize_perspective,
+                         symmetric=source.symmetric, relative=source.relative)
+        self.snapshot = snapshot
+        self.episode_count = source.episode_count
+    
+    def get_q_value(self, state_key, action):
+        """Get a Q-value from the snapshot.
+        
+        Args:
+            state_key (str): State representation
+            action (tuple): (row, col) position
+        
+        Returns:
+            float: Q-value
+        """
+        actions = self.snapshot.actions(state_key)
+        if actions is None:
+            return 0.0
+        return actions.get(f"{action[0]},{action[1]}", 0.0)
+    
+    def best_actions(self, state_key, valid_moves):
+        """Get the highest Q-value of a state and the actions reaching it.
+        
+        Args:
+            state_key (str): State representation
+            valid_moves (list): (row, col) positions available in the state
+        
+        Returns:
+            list: [best value, list of best (row, col) actions]
+        """
+        actions = self.snapshot.actions(state_key) or {}
+        q_values = [actions.get(f"{row},{col}", 0.0) for row, col in valid_moves]
+        max_q = max(q_values)
+        return [max_q, [tuple(move) for move, q in zip(valid_moves, q_values) if q == max_q]]
+    
+    def learn(self, state, action, reward, next_state):
+        """Frozen agents do not learn from experience.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        pass
+    
+    def save(self, filepath):
+        """Snapshots live in memory only; nothing is saved.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        pass
+    
+    def load(self, filepath):
+        """Snapshots live in memory only; nothing is loaded.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        pass
\ No newline at end of file
@@ -0,0 +1,68 @@
+import random
+from agents.agent import Agent
+from agents.alpha_beta_agent import ORDER_WEIGHTS
+
+class HeuristicAgent(Agent):
+    """Agent playing the move with the strongest threats, without search.
+    
+    Every candidate move is scored by the line it would make for the agent
+    and the line it would take from the opponent (see Board.threat_level),
+    attack counting double. It wins when it can, blocks fours and open
+    threes, and otherwise extends its longest open lines. It needs the
+    list-based Board engine and is meant as a cheap fixed opponent for
+    evaluation.
+    """
+    
+    def choose_action(self, state):
+        """Choose the move with the highest threat score, breaking ties randomly.
+        
+        Args:
+            state (dict): Current game state
+            
+        Returns:
+            tuple: (row, col) position to play
+        """
+        if not state['valid_moves']:
+            raise ValueError("No valid moves available")
+        
+        board = state['board']
+        player = state['current_player']
+        opponent = 'O' if player == 'X' else 'X'
+        best_score = -1
+        best_moves = []
+        for row, col in state['valid_moves']:
+            score = (2 * ORDER_WEIGHTS[board.threat_level(row, col, player)]
+                     + ORDER_WEIGHTS[board.threat_level(row, col, opponent)])
+            if score > best_score:
+                best_score = score
+                best_moves = [(row, col)]
+            elif score == best_score:
+                best_moves.append((row, col))
+        return random.choice(best_moves)
+    
+    def learn(self, state, action, reward, next_state):
+        """Heuristic agents do not learn from experience.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        pass
+    
+    def save(self, filepath):
+        """Heuristic agents have nothing to save.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        pass
+    
+    def load(self, filepath):
+        """Heuristic agents have nothing to load.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        pass
\ No newline at end of file
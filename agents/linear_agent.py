@@ -0,0 +1,189 @@
+import random
+import pickle
+import numpy as np
+from agents.agent import Agent
+from game.board import DIRECTIONS
+
+# Cells looked at on each side of a move along every line
+REACH = 4
+
+# Line shapes through a move: run length (0-4, capped) times open ends (0-2)
+NUM_LENGTHS = 5
+NUM_OPEN_ENDS = 3
+LINE_FEATURES = NUM_LENGTHS * NUM_OPEN_ENDS
+
+# Bias, own line shapes, opponent line shapes, own and opponent adjacent stones
+NUM_FEATURES = 1 + 2 * LINE_FEATURES + 2
+
+# Cell codes of the byte view of Board.get_state_key, plus the off-board padding
+EMPTY = ord(' ')
+WALL = 0
+
+def pattern_features(board, moves, player):
+    """Compute the feature vectors of many candidate moves at once.
+    
+    For every move and each of the four line directions, the lengths of the
+    player's and the opponent's runs the move would join or block are counted
+    together with the number of open ends, and added up into a histogram of
+    line shapes.
+    
+    Args:
+        board (Board): Current board (Board or BitBoard)
+        moves (list): (row, col) positions
+        player (str): Player whose point of view the features take
+    
+    Returns:
+        numpy.ndarray: Array of shape (len(moves), NUM_FEATURES)
+    """
+    size = board.size
+    opponent = 'O' if player == 'X' else 'X'
+    
+    cells = np.full((size + 2 * REACH, size + 2 * REACH), WALL, dtype=np.uint8)
+    cells[REACH:-REACH, REACH:-REACH] = np.frombuffer(
+        board.get_state_key().encode(), dtype=np.uint8).reshape(size, size)
+    
+    moves = np.asarray(moves, dtype=np.intp).reshape(-1, 2)
+    count = len(moves)
+    
+    # Offsets of shape (direction, side, distance, 1) for the cells along each line
+    steps = np.arange(1, REACH + 1)[None, None, :, None] * np.array([-1, 1])[None, :, None, None]
+    directions = np.array(DIRECTIONS)
+    row_offsets = directions[:, 0][:, None, None, None] * steps
+    col_offsets = directions[:, 1][:, None, None, None] * steps
+    lines = cells[moves[:, 0] + REACH + row_offsets, moves[:, 1] + REACH + col_offsets]
+    
+    features = np.zeros((count, NUM_FEATURES))
+    features[:, 0] = 1.0
+    shapes = np.arange(LINE_FEATURES)
+    for k, code in enumerate((ord(player), ord(opponent))):
+        stones = lines == code
+        
+        # Stones directly next to the move on each side, then the cell beyond them
+        runs = np.cumprod(stones, axis=2).sum(axis=2)
+        beyond = np.take_along_axis(lines, np.minimum(runs, REACH - 1)[:, :, None, :], axis=2)[:, :, 0, :]
+        open_ends = ((beyond == EMPTY) & (runs < REACH)).sum(axis=1)
+        lengths = np.minimum(runs.sum(axis=1), NUM_LENGTHS - 1)
+        
+        # Histogram of (length, open ends) over the four directions
+        shape = lengths * NUM_OPEN_ENDS + open_ends
+        base = 1 + k * LINE_FEATURES
+        features[:, base:base + LINE_FEATURES] = (shape[:, :, None] == shapes).sum(axis=0)
+        features[:, 1 + 2 * LINE_FEATURES + k] = stones[:, :, 0, :].sum(axis=(0, 1)) / 8.0
+    
+    return features
+
+class LinearAgent(Agent):
+    """Agent approximating Q-values with a linear function of local patterns.
+    
+    Q(s, a) is the dot product of a fixed-size weight vector with the line
+    shape features of move a (see pattern_features), trained by semi-gradient
+    Q-learning. Memory does not grow with the number of positions seen.
+    """
+    
+    def __init__(self, player_symbol, learning_rate=0.01, discount_factor=0.9,
+                 epsilon_start=1.0, epsilon_end=0.1, epsilon_decay=0.9995):
+        """Initialize the linear agent.
+        
+        Args:
+            player_symbol (str): 'X' or 'O'
+            learning_rate (float): Alpha - step size of the weight update
+            discount_factor (float): Gamma - future reward discount factor
+            epsilon_start (float): Initial exploration rate
+            epsilon_end (float): Final exploration rate
+            epsilon_decay (float): Rate of exploration decay
+        """
+        super().__init__(player_symbol)
+        self.weights = np.zeros(NUM_FEATURES)
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon_start
+        self.epsilon_end = epsilon_end
+        self.epsilon_decay = epsilon_decay
+    
+    def q_values(self, board, moves):
+        """Get the Q-values of many moves.
+        
+        Args:
+            board (Board): Current board
+            moves (list): (row, col) positions
+        
+        Returns:
+            numpy.ndarray: One Q-value per move
+        """
+        return pattern_features(board, moves, self.player_symbol) @ self.weights
+    
+    def choose_action(self, state):
+        """Choose an action using epsilon-greedy policy.
+        
+        Args:
+            state (dict): Current game state
+        
+        Returns:
+            tuple: (row, col) position to play
+        """
+        valid_moves = state['valid_moves']
+        if not valid_moves:
+            raise ValueError("No valid moves available")
+        
+        # Exploration: random move
+        if random.random() < self.epsilon:
+            return random.choice(valid_moves)
+        
+        # Exploitation: best estimated move, random among ties
+        q_values = self.q_values(state['board'], valid_moves)
+        best_indices = np.flatnonzero(q_values == q_values.max())
+        return valid_moves[random.choice(best_indices)]
+    
+    def learn(self, state, action, reward, next_state):
+        """Update the weights with a semi-gradient Q-learning step.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        features = pattern_features(state['board'], [action], self.player_symbol)[0]
+        current_q = features @ self.weights
+        
+        if next_state['valid_moves'] and not next_state['is_terminal']:
+            max_next_q = self.q_values(next_state['board'], next_state['valid_moves']).max()
+        else:
+            max_next_q = 0.0
+        
+        td_error = reward + self.discount_factor * max_next_q - current_q
+        self.weights += self.learning_rate * td_error * features
+        
+        # Decay exploration rate
+        self.epsilon = max(self.epsilon_end, self.epsilon * self.epsilon_decay)
+    
+    def save(self, filepath):
+        """Save the weights to a file.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        with open(filepath, 'wb') as f:
+            pickle.dump({
+                'weights': self.weights,
+                'epsilon': self.epsilon,
+                'episode_count': self.episode_count
+            }, f)
+    
+    def load(self, filepath):
+        """Load the weights from a file.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+                if len(data['weights']) != NUM_FEATURES:
+                    raise KeyError('weights')
+                self.weights = np.asarray(data['weights'], dtype=float)
+                self.epsilon = data['epsilon']
+                self.episode_count = data['episode_count']
+            print(f"Loaded linear agent {self.player_symbol} with {NUM_FEATURES} weights")
+        except (FileNotFoundError, KeyError):
+            print(f"No saved model found for agent {self.player_symbol} or invalid format")
\ No newline at end of file
@@ -0,0 +1,433 @@
+import math
+import time
+import random
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from agents.agent import Agent
+from game.bitboard import BitBoard
+
+# Playout boards cached per process, keyed by (size, candidate_radius)
+_playout_boards = {}
+
+def random_playout(size, candidate_radius, moves, max_plies, seed=None):
+    """Play random moves from a position until the game ends.
+    
+    Runs on a BitBoard, drawing moves near existing stones. The board is
+    rewound with unmake_move afterwards, so one board per process is reused.
+    
+    Args:
+        size (int): Size of the board
+        candidate_radius (int): Candidate move radius
+        moves (list): Flat cell indices (row * size + col) of the moves leading to
+            the position, starting with X
+        max_plies (int): Number of random moves after which the playout is a draw
+        seed (int, optional): Random seed
+    
+    Returns:
+        str: 'X' or 'O' for the winner, None for a draw
+    """
+    key = (size, candidate_radius)
+    if key not in _playout_boards:
+        _playout_boards[key] = BitBoard(size, candidate_radius)
+    board = _playout_boards[key]
+    
+    player = 'X'
+    for move in moves:
+        board.make_move(move // size, move % size, player)
+        player = 'O' if player == 'X' else 'X'
+    
+    winner = board.random_playout(player, max_plies, random.Random(seed))
+    while board.history:
+        board.unmake_move()
+    return winner
+
+def _playout_job(args):
+    """Process pool entry point for random_playout."""
+    return random_playout(*args)
+
+class MCTSAgent(Agent):
+    """Gomoku agent playing by Monte Carlo Tree Search.
+    
+    Nodes live in flat typed arrays rather than one Python object each, so
+    large trees stay compact. The subtree of the move actually played is kept
+    between moves. Playouts can run in a process pool; leaves selected for
+    the same batch are spread out with virtual loss.
+    """
+    
+    def __init__(self, player_symbol, num_playouts=1000, time_limit=None, exploration=1.4,
+                 selection='uct', workers=0, batch_size=None, max_playout_plies=200,
+                 max_nodes=2000000):
+        """Initialize the MCTS agent.
+        
+        Args:
+            player_symbol (str): 'X' or 'O'
+            num_playouts (int, optional): Playout budget per move (None for no limit)
+            time_limit (float, optional): Time budget per move in seconds (None for no limit)
+            exploration (float): Exploration constant
+            selection (str): 'uct', or 'puct' for priors from the board's threat index
+                (uniform on a BitBoard, which has none)
+            workers (int): Playout processes; 0 runs playouts in this process
+            batch_size (int, optional): Leaves selected per batch (default: 4 per worker)
+            max_playout_plies (int): Random moves after which a playout counts as a draw
+            max_nodes (int): Node limit; leaves are no longer expanded beyond it
+        """
+        super().__init__(player_symbol)
+        if num_playouts is None and time_limit is None:
+            raise ValueError("MCTS needs a playout budget or a time limit")
+        
+        self.num_playouts = num_playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.selection = selection
+        self.workers = workers
+        self.batch_size = batch_size or max(1, workers * 4)
+        self.max_playout_plies = max_playout_plies
+        self.max_nodes = max_nodes
+        self.pool = None
+        
+        # Statistics of the last search
+        self.playouts = 0
+        
+        self._new_tree()
+    
+    def _new_tree(self, root_moves=()):
+        """Discard the search tree and start a new one.
+        
+        Args:
+            root_moves (iterable): Flat cell indices of the moves leading to the root
+        """
+        self.parent = array('i', [-1])
+        self.move = array('i', [-1])
+        self.first_child = array('i', [-1])
+        self.num_children = array('i', [0])
+        self.visits = array('i', [0])
+        self.value = array('d', [0.0])
+        self.virtual = array('i', [0])
+        self.prior = array('f', [1.0])
+        self.root_moves = list(root_moves)
+    
+    def __len__(self):
+        """Get the number of nodes in the search tree."""
+        return len(self.visits)
+    
+    def choose_action(self, state):
+        """Choose the most visited move after searching.
+        
+        Args:
+            state (dict): Current game state
+        
+        Returns:
+            tuple: (row, col) position to play
+        """
+        if not state['valid_moves']:
+            raise ValueError("No valid moves available")
+        
+        board = state['board']
+        size = board.size
+        self._advance_root(board)
+        
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        self.playouts = 0
+        while self.num_playouts is None or self.playouts < self.num_playouts:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            batch = self.batch_size
+            if self.num_playouts is not None:
+                batch = min(batch, self.num_playouts - self.playouts)
+            self._run_batch(board, state['current_player'], batch)
+        
+        # Most visited child of the root
+        first, count = self.first_child[0], self.num_children[0]
+        if first < 0 or count == 0:
+            return board.get_candidate_moves()[0]
+        best = max(range(first, first + count), key=lambda child: self.visits[child])
+        
+        # Keep the chosen subtree for the next move
+        self._reroot(best)
+        self.root_moves.append(self.move[0])
+        return (self.move[0] // size, self.move[0] % size)
+    
+    def _advance_root(self, board):
+        """Move the tree root to the current position, or start a new tree.
+        
+        Args:
+            board (Board): Current board
+        """
+        size = board.size
+        played = [entry[0] * size + entry[1] for entry in board.history]
+        if played[:len(self.root_moves)] != self.root_moves:
+            self._new_tree(played)
+            return
+        
+        for move in played[len(self.root_moves):]:
+            child = self._find_child(0, move)
+            if child < 0:
+                self._new_tree(played)
+                return
+            self._reroot(child)
+            self.root_moves.append(move)
+    
+    def _find_child(self, node, move):
+        """Find the child of a node reached by a move.
+        
+        Args:
+            node (int): Node index
+            move (int): Flat cell index
+        
+        Returns:
+            int: Child node index, or -1 if not expanded
+        """
+        first = self.first_child[node]
+        if first < 0:
+            return -1
+        for child in range(first, first + self.num_children[node]):
+            if self.move[child] == move:
+                return child
+        return -1
+    
+    def _reroot(self, new_root):
+        """Make a node the root, keeping only its subtree.
+        
+        The subtree is copied breadth first into fresh arrays, which keeps
+        every child block contiguous and releases the rest of the tree.
+        
+        Args:
+            new_root (int): Index of the new root
+        """
+        parent, move, first_child, num_children = array('i'), array('i'), array('i'), array('i')
+        visits, value, virtual, prior = array('i'), array('d'), array('i'), array('f')
+        
+        def copy_node(old, new_parent):
+            parent.append(new_parent)
+            move.append(self.move[old])
+            first_child.append(-1)
+            num_children.append(0)
+            visits.append(self.visits[old])
+            value.append(self.value[old])
+            virtual.append(0)
+            prior.append(self.prior[old])
+        
+        copy_node(new_root, -1)
+        queue = [(new_root, 0)]
+        head = 0
+        while head < len(queue):
+            old, new = queue[head]
+            head += 1
+            first, count = self.first_child[old], self.num_children[old]
+            if first < 0:
+                continue
+            first_child[new] = len(visits)
+            num_children[new] = count
+            for child in range(first, first + count):
+                queue.append((child, len(visits)))
+                copy_node(child, new)
+        
+        self.parent, self.move, self.first_child, self.num_children = parent, move, first_child, num_children
+        self.visits, self.value, self.virtual, self.prior = visits, value, virtual, prior
+    
+    def _run_batch(self, board, player, batch):
+        """Select leaves, run their playouts and back up the results.
+        
+        Args:
+            board (Board): Board at the root position, restored on return
+            player (str): Side to move at the root
+            batch (int): Number of leaves to select
+        """
+        size = board.size
+        leaves = []
+        for _ in range(batch):
+            path, winner = self._select(board, player)
+            if winner is None:
+                moves = [entry[0] * size + entry[1] for entry in board.history]
+            else:
+                moves = None
+            leaves.append((path, winner, moves))
+            for _ in range(len(path) - 1):
+                board.unmake_move()
+        
+        # Playouts for leaves that are not already decided
+        jobs = [(size, board.candidate_radius, moves, self.max_playout_plies, random.getrandbits(32))
+                for _, _, moves in leaves if moves is not None]
+        if self.workers and len(jobs) > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            results = iter(self.pool.map(_playout_job, jobs))
+        else:
+            results = iter([random_playout(*job) for job in jobs])
+        
+        for path, winner, moves in leaves:
+            if moves is not None:
+                winner = next(results)
+            self._backup(path, winner, player)
+            self.playouts += 1
+    
+    def _select(self, board, player):
+        """Walk down the tree to a leaf, playing the moves on the board.
+        
+        Every node on the path receives a virtual loss, steering the other
+        selections of the same batch elsewhere.
+        
+        Args:
+            board (Board): Board at the root position; left at the leaf position
+            player (str): Side to move at the root
+        
+        Returns:
+            tuple: (path, winner) where path lists node indices from the root and
+                winner is 'X', 'O' or 'draw' if the leaf ends the game, else None
+        """
+        size = board.size
+        node = 0
+        path = [0]
+        self.virtual[0] += 1
+        
+        while True:
+            if board.winner != ' ':
+                return path, board.winner
+            if board.is_full():
+                return path, 'draw'
+            
+            if self.first_child[node] < 0:
+                if node != 0 and self.visits[node] == 0 or len(self.visits) >= self.max_nodes:
+                    return path, None
+                self._expand(node, board, player)
+            
+            node = self._best_child(node)
+            move = self.move[node]
+            board.make_move(move // size, move % size, player)
+            player = 'O' if player == 'X' else 'X'
+            path.append(node)
+            self.virtual[node] += 1
+    
+    def _expand(self, node, board, player):
+        """Add a contiguous block of children for the candidate moves of a node.
+        
+        Args:
+            node (int): Node index
+            board (Board): Board at the node's position
+            player (str): Side to move at the node
+        """
+        size = board.size
+        opponent = 'O' if player == 'X' else 'X'
+        moves = board.get_candidate_moves()
+        
+        weights = [1.0] * len(moves)
+        if self.selection == 'puct' and hasattr(board, 'threat_level'):
+            weights = [1.0 + 2 * board.threat_level(row, col, player) + board.threat_level(row, col, opponent)
+                       for row, col in moves]
+        total = sum(weights)
+        
+        self.first_child[node] = len(self.visits)
+        self.num_children[node] = len(moves)
+        for (row, col), weight in zip(moves, weights):
+            self.parent.append(node)
+            self.move.append(row * size + col)
+            self.first_child.append(-1)
+            self.num_children.append(0)
+            self.visits.append(0)
+            self.value.append(0.0)
+            self.virtual.append(0)
+            self.prior.append(weight / total)
+    
+    def _best_child(self, node):
+        """Pick the child to descend into.
+        
+        Pending virtual losses count as visits that were lost.
+        
+        Args:
+            node (int): Node index
+        
+        Returns:
+            int: Child node index
+        """
+        first, count = self.first_child[node], self.num_children[node]
+        parent_visits = self.visits[node] + self.virtual[node]
+        puct = self.selection == 'puct'
+        if puct:
+            scale = self.exploration * math.sqrt(parent_visits + 1)
+        else:
+            log_visits = math.log(parent_visits + 1)
+        
+        best, best_score = first, -1.0
+        for child in range(first, first + count):
+            visits = self.visits[child] + self.virtual[child]
+            if puct:
+                mean = self.value[child] / visits if visits else 0.5
+                score = mean + scale * self.prior[child] / (1 + visits)
+            elif visits == 0:
+                return child  # Try every move once before exploiting
+            else:
+                score = self.value[child] / visits + self.exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+    
+    def _backup(self, path, winner, root_player):
+        """Add a playout result to every node on a path and clear its virtual loss.
+        
+        Each node's value is kept from the view of the player who made the move
+        leading to it.
+        
+        Args:
+            path (list): Node indices from the root
+            winner (str): 'X', 'O', or 'draw' / None for a draw
+            root_player (str): Side to move at the root
+        """
+        mover = 'O' if root_player == 'X' else 'X'
+        for node in path:
+            self.visits[node] += 1
+            self.virtual[node] -= 1
+            if winner == mover:
+                self.value[node] += 1.0
+            elif winner not in ('X', 'O'):
+                self.value[node] += 0.5
+            mover = 'O' if mover == 'X' else 'X'
+    
+    def learn(self, state, action, reward, next_state):
+        """Search agents do not learn from experience.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        pass
+    
+    def close(self):
+        """Shut down the playout process pool."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+    
+    def save(self, filepath):
+        """Save the search settings to a file.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        with open(filepath, 'wb') as f:
+            pickle.dump({
+                'num_playouts': self.num_playouts,
+                'time_limit': self.time_limit,
+                'exploration': self.exploration,
+                'selection': self.selection,
+                'max_playout_plies': self.max_playout_plies
+            }, f)
+    
+    def load(self, filepath):
+        """Load search settings from a file.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+                self.num_playouts = data['num_playouts']
+                self.time_limit = data['time_limit']
+                self.exploration = data['exploration']
+                self.selection = data['selection']
+                self.max_playout_plies = data['max_playout_plies']
+        except (FileNotFoundError, KeyError):
+            print(f"No saved settings found for agent {self.player_symbol} or invalid format")
\ No newline at end of file
@@ -0,0 +1,261 @@
+import time
+import struct
+import argparse
+from array import array
+from collections import deque
+from agents.agent import Agent
+from game.game import TicTacToe
+from game.symmetry import canonical_hash, transform, INVERSE
+
+# File header: magic, board size, number of plies covered, number of entries
+_MAGIC = b'GBK1'
+_HEADER = struct.Struct('<4sIII')
+
+class OpeningBook:
+    """Precomputed moves for the first plies of the game.
+    
+    Positions are keyed by a symmetry-reduced Zobrist hash, so the eight
+    rotated and mirrored variants of a position share one entry. Moves are
+    stored in the frame of the canonical variant and mapped back on lookup.
+    On disk the book is a small header followed by packed arrays of 64-bit
+    keys and 16-bit cell indices.
+    """
+    
+    def __init__(self, board_size=50, plies=0):
+        """Initialize an empty book.
+        
+        Args:
+            board_size (int): Size of the board
+            plies (int): Number of plies covered; positions with fewer moves
+                than this can be in the book
+        """
+        self.board_size = board_size
+        self.plies = plies
+        self.moves = {}
+    
+    def __len__(self):
+        """Get the number of positions in the book."""
+        return len(self.moves)
+    
+    def add(self, stones, move):
+        """Store the move to play in a position.
+        
+        Args:
+            stones (list): (row, col, player) tuples of the position
+            move (tuple): (row, col) move
+        """
+        key, symmetry = canonical_hash(stones, self.board_size)
+        row, col = transform(move[0], move[1], self.board_size, symmetry)
+        self.moves[key] = row * self.board_size + col
+    
+    def lookup(self, board):
+        """Find the book move for a board.
+        
+        Args:
+            board (Board): Current board (Board or BitBoard)
+            
+        Returns:
+            tuple: (row, col) move, or None if the position is not in the book
+        """
+        if board.move_count >= self.plies or board.size != self.board_size:
+            return None
+        
+        key, symmetry = canonical_hash((entry[:3] for entry in board.history), self.board_size)
+        cell = self.moves.get(key)
+        if cell is None:
+            return None
+        return transform(cell // self.board_size, cell % self.board_size, self.board_size, INVERSE[symmetry])
+    
+    def save(self, filepath):
+        """Save the book to a file.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        keys = array('Q', self.moves.keys())
+        cells = array('H', self.moves.values())
+        with open(filepath, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.board_size, self.plies, len(keys)))
+            keys.tofile(f)
+            cells.tofile(f)
+    
+    @classmethod
+    def load(cls, filepath):
+        """Load a book from a file.
+        
+        Args:
+            filepath (str): Path to the file
+            
+        Returns:
+            OpeningBook: The loaded book
+            
+        Raises:
+            ValueError: If the file is not an opening book
+        """
+        with open(filepath, 'rb') as f:
+            magic, board_size, plies, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not an opening book: {filepath}")
+            keys = array('Q')
+            keys.fromfile(f, count)
+            cells = array('H')
+            cells.fromfile(f, count)
+        
+        book = cls(board_size, plies)
+        book.moves = dict(zip(keys, cells))
+        return book
+
+def build_book(agents, plies=4, board_size=50, candidate_radius=1, max_positions=2000):
+    """Build an opening book from the moves agents choose.
+    
+    Positions are explored breadth first from the empty board. In each one the
+    agent of the side to move is asked for its move (with epsilon 0), and every
+    reply within candidate_radius of the stones is explored further, so the
+    book covers deviations by either side. Symmetric positions are visited once.
+    
+    Args:
+        agents (dict): Maps 'X' and 'O' to the agents whose moves are stored
+        plies (int): Number of plies covered
+        board_size (int): Size of the board
+        candidate_radius (int): Radius of the replies explored
+        max_positions (int): Maximum number of positions in the book
+        
+    Returns:
+        OpeningBook: The new book
+    """
+    book = OpeningBook(board_size, plies)
+    game = TicTacToe(board_size, candidate_radius=candidate_radius)
+    seen = set()
+    queue = deque([()])
+    
+    while queue and len(book) < max_positions:
+        moves = queue.popleft()
+        game.reset()
+        state = game.apply_moves(moves)
+        if game.is_terminal():
+            continue
+        
+        stones = list(game.move_history)
+        key, _ = canonical_hash(stones, board_size)
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        agent = agents[game.current_player]
+        epsilon = agent.epsilon
+        agent.epsilon = 0.0
+        try:
+            move = tuple(agent.choose_action(state))
+        finally:
+            agent.epsilon = epsilon
+        book.add(stones, move)
+        
+        if len(moves) + 1 < plies:
+            for reply in state['valid_moves']:
+                queue.append(moves + (tuple(reply),))
+    
+    return book
+
+class BookAgent(Agent):
+    """Wraps an agent so it plays book moves while the position is in the book.
+    
+    Learning, saving and exploration settings are those of the wrapped agent.
+    """
+    
+    def __init__(self, agent, book):
+        """Initialize the wrapper.
+        
+        Args:
+            agent (Agent): Agent playing once the book runs out
+            book (OpeningBook): Opening book
+        """
+        self.agent = agent
+        self.book = book
+        epsilon, episode_count = agent.epsilon, agent.episode_count
+        super().__init__(agent.player_symbol)
+        agent.epsilon, agent.episode_count = epsilon, episode_count
+        self.book_moves = 0
+    
+    @property
+    def epsilon(self):
+        return self.agent.epsilon
+    
+    @epsilon.setter
+    def epsilon(self, value):
+        self.agent.epsilon = value
+    
+    @property
+    def episode_count(self):
+        return self.agent.episode_count
+    
+    @episode_count.setter
+    def episode_count(self, value):
+        self.agent.episode_count = value
+    
+    def choose_action(self, state):
+        """Play the book move if there is one, otherwise ask the wrapped agent.
+        
+        Args:
+            state (dict): Current game state
+            
+        Returns:
+            tuple: (row, col) position to play
+        """
+        move = self.book.lookup(state['board'])
+        if move is not None and move in state['valid_moves']:
+            self.book_moves += 1
+            return move
+        return self.agent.choose_action(state)
+    
+    def learn(self, state, action, reward, next_state):
+        """Let the wrapped agent learn."""
+        self.agent.learn(state, action, reward, next_state)
+    
+    def save(self, filepath):
+        """Save the wrapped agent."""
+        self.agent.save(filepath)
+    
+    def load(self, filepath):
+        """Load the wrapped agent."""
+        self.agent.load(filepath)
+    
+    def close(self):
+        """Release the wrapped agent's resources."""
+        self.agent.close()
+
+def main():
+    from learning.arena import parse_participant, build_agent
+    
+    parser = argparse.ArgumentParser(description='Build an opening book from a trained or search agent')
+    parser.add_argument('agents', nargs='+',
+                        help="Agent choosing the book moves as 'kind:path' (see learning.arena), "
+                             "or one for X and one for O")
+    parser.add_argument('--out', default='data/models/opening_book.bin', help='Book file to write')
+    parser.add_argument('--plies', type=int, default=4, help='Number of plies covered')
+    parser.add_argument('--board_size', type=int, default=50, help='Size of the board')
+    parser.add_argument('--radius', type=int, default=1, help='Radius of the replies explored')
+    parser.add_argument('--max_positions', type=int, default=2000, help='Maximum number of positions')
+    parser.add_argument('--search_time', type=float, default=0.5,
+                        help='Time budget per position for search agents (seconds)')
+    args = parser.parse_args()
+    
+    if len(args.agents) > 2:
+        parser.error("Give one agent for both sides, or one for X and one for O")
+    participants = [parse_participant(spec) for spec in args.agents]
+    settings = {'search_time': args.search_time}
+    try:
+        agents = {symbol: build_agent(participants[i % len(participants)], symbol, settings)
+                  for i, symbol in enumerate(('X', 'O'))}
+    except ValueError as e:
+        parser.error(str(e))
+    
+    start = time.perf_counter()
+    book = build_book(agents, args.plies, args.board_size, args.radius, args.max_positions)
+    book.save(args.out)
+    print(f"Wrote {len(book)} positions ({args.plies} plies) to {args.out} "
+          f"in {time.perf_counter() - start:.1f}s")
+    for agent in agents.values():
+        agent.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
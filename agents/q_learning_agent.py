@@ -2,12 +2,30 @@ import random
 import pickle
 import numpy as np
 from agents.agent import Agent
+from agents.q_table_tools import read_q_table, merge_symmetric
+from game.symmetry import canonical_state_key, relative_state_key, transform, INVERSE
+
+# Translation table exchanging the two players' marks in a state key
+_SWAP_PLAYERS = str.maketrans('XO', 'OX')
+
+def swap_players(state_key):
+    """Exchange X and O in a state key.
+    
+    Args:
+        state_key (str): State representation from Board.get_state_key
+        
+    Returns:
+        str: The same position with the colours swapped
+    """
+    return state_key.translate(_SWAP_PLAYERS)
 
 class QLearningAgent(Agent):
     """Q-learning agent for tic-tac-toe."""
     
     def __init__(self, player_symbol, learning_rate=0.1, discount_factor=0.9, 
-                 epsilon_start=1.0, epsilon_end=0.1, epsilon_decay=0.9995):
+                 epsilon_start=1.0, epsilon_end=0.1, epsilon_decay=0.9995,
+                 q_table=None, normalize_perspective=False, backend=None, greedy_cache=None,
+                 symmetric=False, relative=False):
         """Initialize the Q-learning agent.
         
         Args:
@@ -17,9 +35,40 @@ class QLearningAgent(Agent):
             epsilon_start (float): Initial exploration rate
             epsilon_end (float): Final exploration rate
             epsilon_decay (float): Rate of exploration decay
+            q_table (dict, optional): Q-table to use, e.g. one shared with the
+                opposing agent
+            normalize_perspective (bool): Key states as seen by X, swapping the
+                marks when playing O, so both sides can share one table. TD
+                targets are then taken negamax-style from the opponent's
+                entries, which the other side writes
+            backend (SharedQTable, optional): Store Q-values in this table
+                instead of q_table, e.g. one shared by several processes
+            greedy_cache (dict, optional): Greedy action cache belonging to q_table;
+                agents sharing a Q-table must share it too
+            symmetric (bool): Key states by their canonical symmetric variant,
+                with actions in that variant's frame (see agents.q_table_tools)
+            relative (bool): Key states by the bounding box of their stones, with
+                actions relative to it, so values carry over between positions
+                and board sizes (see game.symmetry.relative_state_key)
         """
+        if symmetric and relative:
+            raise ValueError("Symmetric and relative state keys cannot be combined")
         super().__init__(player_symbol)
-        self.q_table = {}  # State-action values
+        self.q_table = {} if q_table is None else q_table  # State-action values
+        self.normalize_perspective = normalize_perspective
+        self.symmetric = symmetric
+        self.relative = relative
+        self.backend = backend
+        
+        # Copy-on-write snapshot chain of q_table, told about every update
+        # (see agents.frozen_q_agent)
+        self.snapshots = None
+        
+        # Best value and best actions of every learned state scanned so far,
+        # kept up to date by learn so greedy choices and TD targets need no
+        # rescan. Only used with the in-process q_table, which no one else
+        # writes, and not with relative keys.
+        self.greedy = {} if greedy_cache is None else greedy_cache
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.epsilon = epsilon_start
@@ -27,9 +76,74 @@ class QLearningAgent(Agent):
         self.epsilon_decay = epsilon_decay
         self.episode_count = 0
     
+    def state_key(self, board, player=None):
+        """Get the Q-table key of a board for this agent.
+        
+        Args:
+            board (Board): Current board
+            player (str, optional): Side whose point of view is normalized;
+                this agent's by default
+            
+        Returns:
+            str: State representation, from X's point of view if perspective
+                normalization is enabled
+        """
+        key = board.get_state_key()
+        if self.normalize_perspective and (player or self.player_symbol) == 'O':
+            return swap_players(key)
+        return key
+    
+    def frame(self, board, moves, player=None):
+        """Get the Q-table key of a board together with moves in the key's frame.
+        
+        Args:
+            board (Board): Current board
+            moves (list): (row, col) positions on the board
+            player (str, optional): Side whose point of view is normalized;
+                this agent's by default
+            
+        Returns:
+            tuple: (state key, frame, moves in the key's frame); frame is None
+                and the moves are unchanged unless the agent is symmetric or
+                relative. Map moves back with from_frame.
+        """
+        state_key = self.state_key(board, player)
+        if self.relative:
+            state_key, top, left = relative_state_key(state_key, board.size)
+            return state_key, (0, top, left), [(row - top, col - left) for row, col in moves]
+        if not self.symmetric:
+            return state_key, None, moves
+        
+        state_key, symmetry = canonical_state_key(state_key, board.size)
+        if not symmetry:
+            return state_key, None, moves
+        moves = [transform(row, col, board.size, symmetry) for row, col in moves]
+        return state_key, (symmetry, 0, 0), moves
+    
+    def from_frame(self, board, move, frame):
+        """Map a move in a state key's frame back onto the board.
+        
+        Args:
+            board (Board): Board the key was taken from
+            move (tuple): (row, col) in the key's frame
+            frame (tuple): Frame returned by frame()
+            
+        Returns:
+            tuple: (row, col) on the board
+        """
+        row, col = move
+        if frame is None:
+            return row, col
+        symmetry, top, left = frame
+        if symmetry:
+            row, col = transform(row, col, board.size, INVERSE[symmetry])
+        return row + top, col + left
+    
     def get_q_value(self, state_key, action):
         """Get Q-value for a state-action pair.
         
+        Pairs that were never updated are worth 0.0 and are not stored.
+        
         Args:
             state_key (str): State representation
             action (tuple): (row, col) position
@@ -37,18 +151,14 @@ class QLearningAgent(Agent):
         Returns:
             float: Q-value
         """
-        # If state not in Q-table, initialize it with zeros for all actions
-        if state_key not in self.q_table:
-            # Initialize Q-values for all possible actions in this state
-            self.q_table[state_key] = {}
+        if self.backend is not None:
+            return self.backend.get(state_key, action)
         
-        # If action not in state's actions, initialize to 0
+        actions = self.q_table.get(state_key)
+        if actions is None:
+            return 0.0
         row, col = action
-        action_key = f"{row},{col}"
-        if action_key not in self.q_table[state_key]:
-            self.q_table[state_key][action_key] = 0.0
-            
-        return self.q_table[state_key][action_key]
+        return actions.get(f"{row},{col}", 0.0)
     
     def choose_action(self, state):
         """Choose an action using epsilon-greedy policy.
@@ -67,17 +177,74 @@ class QLearningAgent(Agent):
         if random.random() < self.epsilon:
             return random.choice(valid_moves)
         
-        # Exploitation: best known move
-        state_key = state['board'].get_state_key()
-        q_values = [self.get_q_value(state_key, move) for move in valid_moves]
+        # Exploitation: best known move, random among ties
+        board = state['board']
+        state_key, frame, moves = self.frame(board, valid_moves)
+        _, best_moves = self.best_actions(state_key, moves)
+        return self.from_frame(board, random.choice(best_moves), frame)
+    
+    def best_actions(self, state_key, valid_moves):
+        """Get the highest Q-value of a state and the actions reaching it.
         
-        # Find indices of moves with the highest Q-value
+        Args:
+            state_key (str): State representation
+            valid_moves (list): (row, col) positions available in the state
+            
+        Returns:
+            list: [best value, list of best (row, col) actions]; the cached entry,
+                do not modify
+        """
+        if self.backend is not None:
+            q_values = [self.backend.get(state_key, move) for move in valid_moves]
+            max_q = max(q_values)
+            return [max_q, [tuple(move) for move, q in zip(valid_moves, q_values) if q == max_q]]
+        
+        actions = self.q_table.get(state_key)
+        if actions is None:
+            # Never learned: every action is worth 0.0. Nothing is cached, so
+            # unvisited states cost no memory
+            return [0.0, [tuple(move) for move in valid_moves]]
+        
+        # A relative key stands for positions anywhere on boards of any size,
+        # whose valid moves differ, so its best actions cannot be cached
+        cache = not self.relative
+        if cache:
+            cached = self.greedy.get(state_key)
+            if cached is not None:
+                return cached
+        
+        q_values = [actions.get(f"{row},{col}", 0.0) for row, col in valid_moves]
         max_q = max(q_values)
-        best_indices = [i for i, q in enumerate(q_values) if q == max_q]
+        entry = [max_q, [tuple(move) for move, q in zip(valid_moves, q_values) if q == max_q]]
+        if cache:
+            self.greedy[state_key] = entry
+        return entry
+    
+    def _update_greedy(self, state_key, action, value):
+        """Keep the cached best actions of a state in step with a Q-value update.
+        
+        Args:
+            state_key (str): State representation
+            action (tuple): (row, col) position whose value changed
+            value (float): New Q-value
+        """
+        entry = self.greedy.get(state_key)
+        if entry is None:
+            return
         
-        # Randomly select among the best moves
-        best_idx = random.choice(best_indices)
-        return valid_moves[best_idx]
+        action = tuple(action)
+        if value > entry[0]:
+            entry[0] = value
+            entry[1] = [action]
+        elif value == entry[0]:
+            if action not in entry[1]:
+                entry[1].append(action)
+        elif action in entry[1]:
+            entry[1].remove(action)
+            if not entry[1]:
+                # The best value decreased. Unstored actions are worth 0.0 but
+                # are not known here, so the next lookup rescans the valid moves
+                del self.greedy[state_key]
     
     def learn(self, state, action, reward, next_state):
         """Update Q-values based on experience.
@@ -88,7 +255,7 @@ class QLearningAgent(Agent):
             reward (float): Reward received
             next_state (dict): State after action
         """
-        state_key = state['board'].get_state_key()
+        state_key, _, (action,) = self.frame(state['board'], [action])
         row, col = action
         action_key = f"{row},{col}"
         
@@ -96,22 +263,36 @@ class QLearningAgent(Agent):
         current_q = self.get_q_value(state_key, action)
         
         # Calculate max Q-value for next state
-        next_state_key = next_state['board'].get_state_key()
         next_valid_moves = next_state['valid_moves']
         
-        if next_valid_moves and not next_state['is_terminal']:
-            next_q_values = [self.get_q_value(next_state_key, move) for move in next_valid_moves]
-            max_next_q = max(next_q_values) if next_q_values else 0.0
+        if next_valid_moves and not next_state['is_terminal'] and self.normalize_perspective:
+            # Negamax: the opponent is to move, and in a shared table its
+            # values are kept under its own normalized key. Its best value
+            # is the negation of ours
+            opponent = 'O' if self.player_symbol == 'X' else 'X'
+            next_state_key, _, next_moves = self.frame(next_state['board'], next_valid_moves, opponent)
+            max_next_q = -self.best_actions(next_state_key, next_moves)[0]
+        elif next_valid_moves and not next_state['is_terminal']:
+            next_state_key, _, next_moves = self.frame(next_state['board'], next_valid_moves)
+            max_next_q = self.best_actions(next_state_key, next_moves)[0]
         else:
             max_next_q = 0.0
         
         # Q-learning update
         new_q = current_q + self.learning_rate * (reward + self.discount_factor * max_next_q - current_q)
         
-        # Update Q-table
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {}
-        self.q_table[state_key][action_key] = new_q
+        # Update Q-table. An action that was never stored is already worth
+        # 0.0, so a zero value is not stored for it
+        if self.backend is not None:
+            self.backend.set(state_key, action, new_q)
+        elif new_q != 0.0 or action_key in self.q_table.get(state_key, ()):
+            if self.snapshots is not None:
+                self.snapshots.before_write(state_key)
+            if state_key not in self.q_table:
+                self.q_table[state_key] = {action_key: new_q}
+            else:
+                self.q_table[state_key][action_key] = new_q
+                self._update_greedy(state_key, action, new_q)
         
         # Decay exploration rate
         self.epsilon = max(self.epsilon_end, self.epsilon * self.epsilon_decay)
@@ -123,11 +304,17 @@ class QLearningAgent(Agent):
             filepath (str): Path to save the file
         """
         with open(filepath, 'wb') as f:
-            pickle.dump({
+            data = {
                 'q_table': self.q_table,
                 'epsilon': self.epsilon,
-                'episode_count': self.episode_count
-            }, f)
+                'episode_count': self.episode_count,
+                'player_symbol': self.player_symbol,
+                'symmetric': self.symmetric,
+                'relative': self.relative
+            }
+            if self.backend is not None:
+                data['backend'] = self.backend.snapshot()
+            pickle.dump(data, f)
     
     def load(self, filepath):
         """Load the Q-table from a file.
@@ -138,13 +325,114 @@ class QLearningAgent(Agent):
         try:
             with open(filepath, 'rb') as f:
                 data = pickle.load(f)
-                self.q_table = data['q_table']
+                self.q_table = read_q_table(data)
+                self.symmetric = data.get('symmetric', False)
+                self.relative = data.get('relative', False)
+                self.greedy = {}
                 self.epsilon = data['epsilon']
                 self.episode_count = data['episode_count']
+                if self.backend is not None and 'backend' in data:
+                    self.backend.restore(data['backend'])
             print(f"Loaded agent {self.player_symbol} with {len(self.q_table)} states")
         except (FileNotFoundError, KeyError):
             print(f"No saved model found for agent {self.player_symbol} or invalid format")
+
+def save_shared(agents, filepath):
+    """Save agents sharing one perspective-normalized Q-table to a single file.
+    
+    Args:
+        agents (list): QLearningAgents sharing a Q-table, or a SharedQTable backend
+        filepath (str): Path to save the file
+    """
+    data = {
+        'q_table': agents[0].q_table,
+        'normalized': True,
+        'symmetric': agents[0].symmetric,
+        'relative': agents[0].relative,
+        'agents': {
+            agent.player_symbol: {
+                'epsilon': agent.epsilon,
+                'episode_count': agent.episode_count
+            }
+            for agent in agents
+        }
+    }
+    if agents[0].backend is not None:
+        data['backend'] = agents[0].backend.snapshot()
+    with open(filepath, 'wb') as f:
+        pickle.dump(data, f)
+
+def load_shared(agents, filepath, legacy_paths=None):
+    """Load a shared Q-table into agents.
+    
+    If the shared file does not exist, per-agent files saved by
+    QLearningAgent.save are merged instead: O's states are converted to X's
+    point of view, and values of state-action pairs present in both are
+    averaged. The two sides' states never coincide, since after the swap the
+    side to move has one stone fewer, so in practice the merge is a union.
+    
+    Agents with a SharedQTable backend get its saved contents restored.
+    
+    Args:
+        agents (list): QLearningAgents sharing a Q-table, or a SharedQTable backend
+        filepath (str): Shared Q-table file
+        legacy_paths (dict, optional): Maps player symbols to per-agent files
+    """
+    by_symbol = {agent.player_symbol: agent for agent in agents}
+    
+    try:
+        with open(filepath, 'rb') as f:
+            data = pickle.load(f)
+        q_table = read_q_table(data)
+        symmetric = data.get('symmetric', False)
+        relative = data.get('relative', False)
+        for symbol, settings in data['agents'].items():
+            if symbol in by_symbol:
+                by_symbol[symbol].epsilon = settings['epsilon']
+                by_symbol[symbol].episode_count = settings['episode_count']
+        backend = agents[0].backend
+        if backend is not None and 'backend' in data:
+            backend.restore(data['backend'])
+            print(f"Loaded shared-memory Q-table with {len(backend)} entries")
+        else:
+            print(f"Loaded shared Q-table with {len(q_table)} states")
+    except (FileNotFoundError, KeyError):
+        q_table = {}
+        symmetric = False
+        relative = False
+        counts = {}
+        for symbol, path in (legacy_paths or {}).items():
+            try:
+                with open(path, 'rb') as f:
+                    data = pickle.load(f)
+            except FileNotFoundError:
+                continue
+            symmetric = symmetric or data.get('symmetric', False)
+            relative = relative or data.get('relative', False)
+            
+            for state_key, actions in read_q_table(data).items():
+                if symbol == 'O':
+                    state_key = swap_players(state_key)
+                merged = q_table.setdefault(state_key, {})
+                for action_key, value in actions.items():
+                    n = counts.get((state_key, action_key), 0)
+                    merged[action_key] = (merged.get(action_key, 0.0) * n + value) / (n + 1)
+                    counts[(state_key, action_key)] = n + 1
             
-    def increment_episode(self):
-        """Increment the episode counter."""
-        self.episode_count += 1
\ No newline at end of file
+            if symbol in by_symbol:
+                by_symbol[symbol].epsilon = data['epsilon']
+                by_symbol[symbol].episode_count = data['episode_count']
+        if symmetric and relative:
+            raise ValueError("Cannot merge symmetric and relative Q-tables")
+        if symmetric:
+            # Swapping the marks of O's states can leave them non-canonical
+            q_table = merge_symmetric(q_table)
+        if q_table:
+            print(f"Merged per-agent Q-tables into a shared table with {len(q_table)} states")
+    
+    greedy_cache = {}
+    for agent in agents:
+        agent.q_table = q_table
+        agent.greedy = greedy_cache
+        agent.symmetric = symmetric
+        agent.relative = relative
@@ -0,0 +1,543 @@
+import os
+import re
+import sys
+import json
+import pickle
+import argparse
+import itertools
+import pickletools
+from collections import Counter
+import numpy as np
+from agents.q_learning_agent import QLearningAgent
+from agents.q_table_tools import QUANTIZATIONS
+
+# Size of a float object. Zero values inserted by the agents share one
+# object; values loaded from a file are separate objects.
+FLOAT_BYTES = sys.getsizeof(0.0)
+
+# Components of the estimated memory use, in report order
+COMPONENTS = ('table', 'state_keys', 'action_dicts', 'action_keys', 'values', 'greedy_cache')
+
+# Report entries exported as metrics, besides the byte counts and histograms
+SCALARS = ('episode', 'states', 'entries', 'mean_actions', 'zero_fraction', 'bytes_per_state',
+           'states_per_episode', 'entries_per_episode', 'bytes_per_episode')
+
+# Action keys, "row,col"; relative keys can be negative, like "-2,3"
+_ACTION_KEY = re.compile(r'-?\d+,-?\d+')
+
+# Sizes of dicts with string keys by number of entries, measured on first use
+_dict_sizes = {}
+
+def dict_bytes(entries):
+    """Estimate the size of a dict with string keys built by insertion.
+    
+    Args:
+        entries (int): Number of entries
+    
+    Returns:
+        int: Bytes of the dict itself, without its keys and values
+    """
+    if entries > 4096:
+        return dict_bytes(4096) * entries // 4096
+    if entries not in _dict_sizes:
+        d = {}
+        for i in range(entries):
+            d[str(i)] = None
+        _dict_sizes[entries] = sys.getsizeof(d)
+    return _dict_sizes[entries]
+
+def histogram_bucket(count):
+    """Get the power-of-two histogram bucket of a count: '0', '1', '2-3', '4-7', ...
+    
+    Args:
+        count (int): Count
+    
+    Returns:
+        str: Bucket label
+    """
+    if count < 2:
+        return str(count)
+    low = 1 << (count.bit_length() - 1)
+    return f"{low}-{2 * low - 1}"
+
+def _bucketed(counts):
+    """Group exact counts into histogram buckets, in increasing order."""
+    buckets = {}
+    for count in sorted(counts):
+        label = histogram_bucket(count)
+        buckets[label] = buckets.get(label, 0) + counts[count]
+    return {label: int(round(states)) for label, states in buckets.items()}
+
+class QTableStats:
+    """Statistics of a Q-table, accumulated one state at a time.
+    
+    Visits are not recorded in Q-tables. As in prune_q_table, the number
+    of non-zero action values of a state, a lower bound on its updates,
+    stands in for them.
+    """
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.states = 0
+        self.entries = 0
+        self.zeros = 0
+        self.actions = Counter()
+        self.visits = Counter()
+        self.bytes = Counter()
+        self.sampled = 0
+    
+    def add_state(self, actions, nonzero, sizes, weight=1):
+        """Add a state.
+        
+        Args:
+            actions (int): Number of action values of the state
+            nonzero (int): Number of them that are not zero
+            sizes (dict): Bytes of the state by component
+            weight (float): Number of states the state stands for when sampling
+        """
+        self.states += weight
+        self.entries += actions * weight
+        self.zeros += (actions - nonzero) * weight
+        self.actions[actions] += weight
+        self.visits[nonzero] += weight
+        for component, size in sizes.items():
+            self.bytes[component] += size * weight
+        self.sampled += 1
+    
+    def report(self):
+        """Summarize the statistics.
+        
+        Returns:
+            dict: 'states', 'entries', 'mean_actions', 'zero_fraction',
+                'actions_histogram' and 'visits_histogram' (states per bucket
+                of action values and of non-zero values), 'bytes' (estimated
+                bytes per component and 'total'), 'bytes_per_state' and
+                'sampled' (states examined)
+        """
+        states = int(round(self.states))
+        entries = int(round(self.entries))
+        sizes = {component: int(round(self.bytes[component])) for component in COMPONENTS
+                 if component in self.bytes}
+        sizes['total'] = sum(sizes.values())
+        return {
+            'states': states,
+            'entries': entries,
+            'mean_actions': entries / states if states else 0.0,
+            'zero_fraction': self.zeros / self.entries if self.entries else 0.0,
+            'actions_histogram': _bucketed(self.actions),
+            'visits_histogram': _bucketed(self.visits),
+            'bytes': sizes,
+            'bytes_per_state': sizes['total'] / states if states else 0.0,
+            'sampled': self.sampled
+        }
+
+def _table_stats(q_table, sample=None):
+    """Accumulate the statistics of an in-memory Q-table.
+    
+    Args:
+        q_table (dict): Q-table
+        sample (int, optional): Examine about this many evenly spaced states
+            and scale up; all states if not given
+    
+    Returns:
+        QTableStats: Statistics
+    """
+    stats = QTableStats()
+    total = len(q_table)
+    step = max(1, total // sample) if sample else 1
+    weight = total / -(-total // step) if total else 1
+    for state_key, actions in itertools.islice(q_table.items(), 0, None, step):
+        nonzero = sum(1 for value in actions.values() if value != 0.0)
+        stats.add_state(len(actions), nonzero, {
+            'state_keys': sys.getsizeof(state_key),
+            'action_dicts': sys.getsizeof(actions),
+            'action_keys': sum(map(sys.getsizeof, actions)),
+            'values': FLOAT_BYTES * nonzero
+        }, weight)
+    stats.bytes['table'] += sys.getsizeof(q_table)
+    return stats
+
+def inspect_table(q_table, sample=None):
+    """Report on an in-memory Q-table.
+    
+    Args:
+        q_table (dict): Q-table
+        sample (int, optional): Examine about this many evenly spaced states
+            and scale up; all states if not given
+    
+    Returns:
+        dict: See QTableStats.report
+    """
+    return _table_stats(q_table, sample).report()
+
+def inspect_agent(agent, sample=None):
+    """Report on a live Q-learning agent's table and greedy cache.
+    
+    Args:
+        agent (QLearningAgent): Agent with an in-process Q-table
+        sample (int, optional): Examine about this many evenly spaced states
+            (and cache entries) and scale up; all if not given
+    
+    Returns:
+        dict: See QTableStats.report, with 'episode' added
+    """
+    stats = _table_stats(agent.q_table, sample)
+    greedy = agent.greedy
+    if greedy:
+        step = max(1, len(greedy) // sample) if sample else 1
+        examined = list(itertools.islice(greedy.values(), 0, None, step))
+        entry_bytes = sum(sys.getsizeof(entry) + FLOAT_BYTES + sys.getsizeof(entry[1])
+                          + sum(map(sys.getsizeof, entry[1])) for entry in examined)
+        stats.bytes['greedy_cache'] += entry_bytes * len(greedy) / len(examined)
+    stats.bytes['greedy_cache'] += sys.getsizeof(greedy)
+    
+    report = stats.report()
+    report['episode'] = agent.episode_count
+    return report
+
+class _Dict:
+    """Stand-in for a dict built by a streamed pickle.
+    
+    Action values are counted instead of kept, and finished states are
+    handed to the statistics, so a Q-table is never built.
+    """
+    
+    __slots__ = ('items', 'actions', 'nonzero', 'key_bytes')
+    
+    def __init__(self):
+        self.items = {}
+        self.actions = 0
+        self.nonzero = 0
+        self.key_bytes = 0
+    
+    def set(self, key, value, stats):
+        """Apply one item of a SETITEM(S) opcode."""
+        if isinstance(value, float) and isinstance(key, str) and _ACTION_KEY.fullmatch(key):
+            self.actions += 1
+            self.nonzero += value != 0.0
+            self.key_bytes += sys.getsizeof(key)
+        elif (isinstance(value, _Dict) and not value.items and isinstance(key, str)
+              and not key.isidentifier()):
+            stats.add_state(value.actions, value.nonzero, {
+                'state_keys': sys.getsizeof(key),
+                'action_dicts': dict_bytes(value.actions),
+                'action_keys': value.key_bytes,
+                'values': FLOAT_BYTES * value.actions
+            })
+        else:
+            self.items[key] = value
+    
+    def plain(self):
+        """Get the kept items as a dict."""
+        return {key: value.plain() if isinstance(value, _Dict) else value
+                for key, value in self.items.items()}
+
+# Opcodes pushing their argument
+_PUSH_ARGUMENT = {
+    'SHORT_BINUNICODE', 'BINUNICODE', 'BINUNICODE8', 'UNICODE', 'SHORT_BINBYTES', 'BINBYTES',
+    'BINBYTES8', 'BINFLOAT', 'FLOAT', 'BININT', 'BININT1', 'BININT2', 'LONG1', 'LONG4', 'INT', 'LONG'
+}
+
+# Opcodes pushing a constant
+_PUSH_CONSTANT = {'NONE': None, 'NEWTRUE': True, 'NEWFALSE': False}
+
+def _stream_checkpoint(path, stats):
+    """Run a pickled checkpoint's opcodes, adding its Q-table states to statistics.
+    
+    A first pass finds the memo entries the pickle reads back, so that only
+    those are kept. Memory use is bounded by a batch of states, not by the
+    size of the table.
+    
+    Args:
+        path (str): Checkpoint file
+        stats (QTableStats): Statistics to add the states to
+    
+    Returns:
+        dict: The checkpoint's other items, e.g. 'epsilon' or 'compact_q_table'
+    
+    Raises:
+        ValueError: If the pickle holds objects other than dicts, lists,
+            tuples, strings, bytes and numbers
+    """
+    with open(path, 'rb') as f:
+        referenced = {arg for opcode, arg, _ in pickletools.genops(f)
+                      if opcode.name in ('BINGET', 'LONG_BINGET', 'GET')}
+        f.seek(0)
+        
+        stack = []
+        marks = []
+        memo = {}
+        memo_size = 0
+        for opcode, arg, _ in pickletools.genops(f):
+            name = opcode.name
+            if name in _PUSH_ARGUMENT:
+                stack.append(arg)
+            elif name in _PUSH_CONSTANT:
+                stack.append(_PUSH_CONSTANT[name])
+            elif name == 'EMPTY_DICT':
+                stack.append(_Dict())
+            elif name == 'MARK':
+                marks.append(len(stack))
+            elif name == 'SETITEMS':
+                start = marks.pop()
+                target = stack[start - 1]
+                for i in range(start, len(stack), 2):
+                    target.set(stack[i], stack[i + 1], stats)
+                del stack[start:]
+            elif name == 'SETITEM':
+                value = stack.pop()
+                key = stack.pop()
+                stack[-1].set(key, value, stats)
+            elif name in ('MEMOIZE', 'BINPUT', 'LONG_BINPUT', 'PUT'):
+                index = memo_size if name == 'MEMOIZE' else arg
+                memo_size = max(memo_size, index + 1)
+                if index in referenced:
+                    memo[index] = stack[-1]
+            elif name in ('BINGET', 'LONG_BINGET', 'GET'):
+                stack.append(memo[arg])
+            elif name == 'EMPTY_LIST':
+                stack.append([])
+            elif name == 'APPEND':
+                value = stack.pop()
+                stack[-1].append(value)
+            elif name == 'APPENDS':
+                start = marks.pop()
+                stack[start - 1].extend(stack[start:])
+                del stack[start:]
+            elif name == 'EMPTY_TUPLE':
+                stack.append(())
+            elif name in ('TUPLE1', 'TUPLE2', 'TUPLE3'):
+                count = int(name[-1])
+                values = tuple(stack[-count:])
+                del stack[-count:]
+                stack.append(values)
+            elif name == 'TUPLE':
+                start = marks.pop()
+                values = tuple(stack[start:])
+                del stack[start:]
+                stack.append(values)
+            elif name == 'STOP':
+                top = stack.pop()
+                return top.plain() if isinstance(top, _Dict) else {}
+            elif name not in ('PROTO', 'FRAME'):
+                raise ValueError(f"Cannot stream pickle opcode {name}")
+    return {}
+
+def _compact_stats(compact, stats):
+    """Add the states of a compact Q-table (see encode_q_table) to statistics.
+    
+    The packed arrays are read as they are, without decoding the table.
+    Bytes are those of the table decode_q_table would build.
+    """
+    sizes = np.frombuffer(compact['sizes'], dtype=np.uint16).astype(np.int64)
+    action_offsets = np.frombuffer(compact['action_offsets'], dtype=np.uint32).astype(np.int64)
+    cells = np.frombuffer(compact['cells'], dtype=np.uint16)
+    values = np.frombuffer(compact['values'], dtype=QUANTIZATIONS[compact['quantization']])
+    if not len(sizes):
+        return
+    
+    actions = np.diff(action_offsets)
+    nonzero_total = np.concatenate([[0], np.cumsum(values != 0)])
+    nonzero = nonzero_total[action_offsets[1:]] - nonzero_total[action_offsets[:-1]]
+    rows, cols = cells >> 8, cells & 0xFF
+    key_lengths = 3 + (rows >= 10) + (rows >= 100) + (cols >= 10) + (cols >= 100)
+    
+    stats.states += len(sizes)
+    stats.entries += int(actions.sum())
+    stats.zeros += int(actions.sum() - nonzero.sum())
+    stats.actions.update({int(k): int(v) for k, v in zip(*np.unique(actions, return_counts=True))})
+    stats.visits.update({int(k): int(v) for k, v in zip(*np.unique(nonzero, return_counts=True))})
+    stats.bytes['state_keys'] += int((sys.getsizeof('') + sizes * sizes).sum())
+    stats.bytes['action_dicts'] += sum(dict_bytes(int(k)) * int(v)
+                                       for k, v in zip(*np.unique(actions, return_counts=True)))
+    stats.bytes['action_keys'] += int((sys.getsizeof('') + key_lengths).sum())
+    stats.bytes['values'] += FLOAT_BYTES * len(values)
+    stats.sampled += len(sizes)
+
+def inspect_file(path, stream=True):
+    """Report on a saved Q-table, by default streaming over the file.
+    
+    Works on the checkpoints of QLearningAgent.save, save_shared and
+    compact_file. Streamed plain checkpoints are read opcode by opcode
+    without building the table, which takes little memory but is several
+    times slower than loading. Compact ones are summarized from their
+    packed arrays.
+    
+    Args:
+        path (str): Checkpoint file
+        stream (bool): Stream over plain checkpoints instead of loading them
+    
+    Returns:
+        dict: See QTableStats.report, with 'episode' (if saved), 'format'
+            ('plain' or 'compact') and 'file_bytes' added; bytes are those
+            of the table once loaded
+    """
+    stats = QTableStats()
+    data = None
+    if stream:
+        try:
+            data = _stream_checkpoint(path, stats)
+        except ValueError:
+            # Objects the stream reader does not know; load the file after all
+            stats = QTableStats()
+    if data is None:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        q_table = data.pop('q_table', None)
+        if q_table is not None:
+            stats = _table_stats(q_table)
+            del stats.bytes['table']
+            stats.bytes['values'] = FLOAT_BYTES * stats.entries
+    
+    compact = data.get('compact_q_table')
+    if compact is not None:
+        _compact_stats(compact, stats)
+    stats.bytes['table'] += dict_bytes(int(stats.states))
+    
+    report = stats.report()
+    report['format'] = 'compact' if compact is not None else 'plain'
+    report['file_bytes'] = os.path.getsize(path)
+    if 'episode_count' in data:
+        report['episode'] = data['episode_count']
+    return report
+
+def growth(previous, current):
+    """Get the growth of a Q-table per episode between two reports.
+    
+    Args:
+        previous (dict, optional): Earlier report; an empty table at episode 0
+            if not given
+        current (dict): Later report
+    
+    Returns:
+        dict: 'states_per_episode', 'entries_per_episode' and
+            'bytes_per_episode'; empty if the episodes are unknown or equal
+    """
+    previous = previous or {'episode': 0, 'states': 0, 'entries': 0, 'bytes': {'total': 0}}
+    if current.get('episode') is None or previous.get('episode') is None:
+        return {}
+    episodes = current['episode'] - previous['episode']
+    if episodes <= 0:
+        return {}
+    return {
+        'states_per_episode': (current['states'] - previous['states']) / episodes,
+        'entries_per_episode': (current['entries'] - previous['entries']) / episodes,
+        'bytes_per_episode': (current['bytes']['total'] - previous['bytes']['total']) / episodes
+    }
+
+def flatten_report(report, prefix):
+    """Turn a report into flat metrics, e.g. for StatsStore.record_metrics.
+    
+    Args:
+        report (dict): Report of inspect_agent or inspect_file
+        prefix (str): Prefix of the metric names, e.g. the table's label
+    
+    Returns:
+        dict: {name: value}, e.g. 'X.states', 'X.bytes.values' or
+            'X.actions_histogram.4-7'
+    """
+    metrics = {f"{prefix}.{name}": report[name] for name in SCALARS if name in report}
+    for group in ('bytes', 'actions_histogram', 'visits_histogram'):
+        for key, value in report[group].items():
+            metrics[f"{prefix}.{group}.{key}"] = value
+    return metrics
+
+class QTableMonitor:
+    """Periodic, sampled reports on the Q-tables being trained.
+    
+    Agents sharing a table are reported once, labelled with all their
+    symbols. Each report also has the table's growth since the last one.
+    """
+    
+    def __init__(self, interval=1000, sample=2000):
+        """Initialize the monitor.
+        
+        Args:
+            interval (int): Episodes between reports
+            sample (int, optional): States examined per report; all if not given
+        """
+        self.interval = interval
+        self.sample = sample
+        self.previous = {}
+    
+    def observe(self, agents):
+        """Report on the agents' in-process Q-tables.
+        
+        Args:
+            agents (list): Agents; those without an in-process Q-table are skipped
+        
+        Returns:
+            dict: Report (see inspect_agent and growth) per table label
+        """
+        tables = {}
+        for agent in agents:
+            if isinstance(agent, QLearningAgent) and agent.backend is None:
+                tables.setdefault(id(agent.q_table), []).append(agent)
+        
+        reports = {}
+        for group in tables.values():
+            label = ''.join(agent.player_symbol for agent in group)
+            report = inspect_agent(group[0], self.sample)
+            report.update(growth(self.previous.get(label), report))
+            self.previous[label] = report
+            reports[label] = report
+        return reports
+
+def format_bytes(size):
+    """Format a byte count with a binary unit, e.g. '12.3 MB'."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size:.0f} B"
+        size /= 1024
+
+def format_report(report):
+    """Format a report as indented text lines.
+    
+    Args:
+        report (dict): Report of inspect_agent or inspect_file
+    
+    Returns:
+        str: Report text
+    """
+    sizes = report['bytes']
+    lines = [
+        f"  states         {report['states']:,}",
+        f"  entries        {report['entries']:,} ({report['mean_actions']:.1f} per state, "
+        f"{report['zero_fraction']:.1%} zero)",
+        "  actions/state  " + "  ".join(f"{k}: {v:,}" for k, v in report['actions_histogram'].items()),
+        "  non-zero/state " + "  ".join(f"{k}: {v:,}" for k, v in report['visits_histogram'].items()),
+        f"  memory         {format_bytes(sizes['total'])} ({format_bytes(report['bytes_per_state'])} per state): "
+        + ", ".join(f"{component.replace('_', ' ')} {format_bytes(sizes[component])}"
+                    for component in COMPONENTS if component in sizes)
+    ]
+    if 'states_per_episode' in report:
+        lines.append(f"  growth         {report['states_per_episode']:.2f} states, "
+                     f"{format_bytes(report['bytes_per_episode'])} per episode")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Report what saved Q-tables hold and the memory they take')
+    parser.add_argument('files', nargs='+',
+                        help='Checkpoints of QLearningAgent.save, save_shared or compact_file; '
+                             'several checkpoints of one run give the growth between them')
+    parser.add_argument('--json', action='store_true', help='Print one JSON report per line')
+    parser.add_argument('--load', action='store_true',
+                        help='Load plain checkpoints instead of streaming over them: faster, '
+                             'but needs the memory of the whole table')
+    args = parser.parse_args()
+    
+    reports = [(path, inspect_file(path, stream=not args.load)) for path in args.files]
+    reports.sort(key=lambda item: item[1].get('episode', 0))
+    previous = None
+    for path, report in reports:
+        report.update(growth(previous, report))
+        previous = report
+        if args.json:
+            print(json.dumps(dict(report, file=path)))
+        else:
+            episode = f", episode {report['episode']:,}" if 'episode' in report else ''
+            print(f"{path} ({report['format']}, {format_bytes(report['file_bytes'])} on disk{episode})")
+            print(format_report(report))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,364 @@
+import os
+import time
+import random
+import pickle
+import argparse
+from array import array
+import numpy as np
+from game.symmetry import canonical_state_key, transform, INVERSE
+
+# Value encodings of compact Q-table files; int8 values are multiplied by a per-table scale.
+# They only shrink the file: loading decodes every value back to a Python float.
+QUANTIZATIONS = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+# Stones of a compact state are 16-bit cell indices, with this bit set for O
+_O_BIT = 0x8000
+_EMPTY = ord(' ')
+
+def read_q_table(data):
+    """Get the Q-table of a loaded checkpoint, plain or compact.
+    
+    Args:
+        data (dict): Unpickled checkpoint of QLearningAgent.save, save_shared
+            or compact_file
+    
+    Returns:
+        dict: Q-table mapping state keys to {"row,col": value} dicts
+    
+    Raises:
+        KeyError: If the checkpoint has no Q-table
+    """
+    if 'q_table' in data:
+        return data['q_table']
+    return decode_q_table(data['compact_q_table'])
+
+def prune_q_table(q_table, min_abs=0.0, min_visits=0):
+    """Drop Q-table entries that carry little information.
+    
+    Dropped entries read as 0.0 again, so pruning zeros changes nothing, and
+    since lookups do not insert entries, pruned zeros stay out of a live table.
+    Visits are not recorded in the table; the number of non-zero action
+    values of a state, a lower bound on its updates, stands in for them.
+    
+    Args:
+        q_table (dict): Q-table to prune; not modified
+        min_abs (float): Keep only values with a larger magnitude
+        min_visits (int): Drop states with fewer non-zero action values
+    
+    Returns:
+        dict: Pruned Q-table, without empty states
+    """
+    pruned = {}
+    for state_key, actions in q_table.items():
+        kept = {action_key: value for action_key, value in actions.items() if abs(value) > min_abs}
+        if kept and sum(1 for value in kept.values() if value != 0.0) >= min_visits:
+            pruned[state_key] = kept
+    return pruned
+
+def merge_symmetric(q_table):
+    """Merge the entries of rotated and mirrored variants of each state.
+    
+    States are keyed by their canonical variant (see
+    game.symmetry.canonical_state_key) and actions are mapped into its frame,
+    the layout QLearningAgent(symmetric=True) looks up. Values of the same
+    canonical state-action pair are averaged.
+    
+    Args:
+        q_table (dict): Q-table to merge; not modified
+    
+    Returns:
+        dict: Symmetric Q-table
+    """
+    merged = {}
+    counts = {}
+    for state_key, actions in q_table.items():
+        size = int(round(len(state_key) ** 0.5))
+        canonical, symmetry = canonical_state_key(state_key, size)
+        target = merged.setdefault(canonical, {})
+        for action_key, value in actions.items():
+            if symmetry:
+                row, col = map(int, action_key.split(','))
+                row, col = transform(row, col, size, symmetry)
+                action_key = f"{row},{col}"
+            n = counts.get((canonical, action_key), 0)
+            target[action_key] = (target.get(action_key, 0.0) * n + value) / (n + 1)
+            counts[(canonical, action_key)] = n + 1
+    return merged
+
+def encode_q_table(q_table, quantization='float32'):
+    """Pack a Q-table into flat arrays for saving.
+    
+    Each state is stored as its stones (16-bit cells) instead of the full
+    state key, each action as a 16-bit (row, col) pair, and the values in
+    the chosen encoding. The packing only compacts the file; decode_q_table
+    rebuilds the dicts of floats the agents look values up in.
+    
+    Args:
+        q_table (dict): Q-table to pack
+        quantization (str): One of QUANTIZATIONS
+    
+    Returns:
+        dict: Compact Q-table for decode_q_table
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+    
+    sizes = array('H')
+    stone_offsets = array('I', [0])
+    stones = array('H')
+    action_offsets = array('I', [0])
+    cells = array('H')
+    values = array('f')
+    for state_key, actions in q_table.items():
+        cells_of_state = np.frombuffer(state_key.encode(), dtype=np.uint8)
+        occupied = np.flatnonzero(cells_of_state != _EMPTY)
+        marks = np.where(cells_of_state[occupied] == ord('O'), _O_BIT, 0)
+        sizes.append(int(round(len(state_key) ** 0.5)))
+        stones.extend((occupied | marks).tolist())
+        stone_offsets.append(len(stones))
+        
+        for action_key, value in actions.items():
+            row, col = map(int, action_key.split(','))
+            cells.append(row << 8 | col)
+            values.append(value)
+        action_offsets.append(len(cells))
+    
+    values = np.asarray(values, dtype=np.float32)
+    scale = 1.0
+    if quantization == 'int8':
+        largest = float(np.abs(values).max()) if len(values) else 0.0
+        scale = largest / 127 if largest > 0 else 1.0
+        values = np.round(values / scale)
+    
+    return {
+        'quantization': quantization,
+        'scale': scale,
+        'sizes': sizes.tobytes(),
+        'stone_offsets': stone_offsets.tobytes(),
+        'stones': stones.tobytes(),
+        'action_offsets': action_offsets.tobytes(),
+        'cells': cells.tobytes(),
+        'values': values.astype(QUANTIZATIONS[quantization]).tobytes()
+    }
+
+def decode_q_table(compact):
+    """Unpack a Q-table packed by encode_q_table.
+    
+    Args:
+        compact (dict): Result of encode_q_table
+    
+    Returns:
+        dict: Q-table mapping state keys to {"row,col": value} dicts
+    """
+    sizes = array('H', compact['sizes'])
+    stone_offsets = array('I', compact['stone_offsets'])
+    stones = array('H', compact['stones'])
+    action_offsets = array('I', compact['action_offsets'])
+    cells = array('H', compact['cells'])
+    values = np.frombuffer(compact['values'], dtype=QUANTIZATIONS[compact['quantization']])
+    values = (values.astype(np.float64) * compact['scale']).tolist()
+    
+    q_table = {}
+    for i, size in enumerate(sizes):
+        board = bytearray(b' ' * (size * size))
+        for stone in stones[stone_offsets[i]:stone_offsets[i + 1]]:
+            board[stone & ~_O_BIT] = ord('O') if stone & _O_BIT else ord('X')
+        start, end = action_offsets[i], action_offsets[i + 1]
+        q_table[board.decode()] = {
+            f"{cell >> 8},{cell & 0xFF}": value for cell, value in zip(cells[start:end], values[start:end])
+        }
+    return q_table
+
+def _best_moves(q_table, symmetric, state_key):
+    """Get the greedy moves of a table in a state, over all empty cells.
+    
+    Args:
+        q_table (dict): Q-table
+        symmetric (bool): Whether the table is keyed by canonical variants
+        state_key (str): State key in the plain layout
+    
+    Returns:
+        set: Best (row, col) moves in the state's own frame
+    """
+    size = int(round(len(state_key) ** 0.5))
+    symmetry = 0
+    if symmetric:
+        state_key, symmetry = canonical_state_key(state_key, size)
+    actions = q_table.get(state_key, {})
+    
+    moves = [(i // size, i % size) for i, cell in enumerate(state_key) if cell == ' ']
+    values = [actions.get(f"{row},{col}", 0.0) for row, col in moves]
+    if not values:
+        return set()
+    best = max(values)
+    return {
+        transform(row, col, size, INVERSE[symmetry]) if symmetry else (row, col)
+        for (row, col), value in zip(moves, values) if value == best
+    }
+
+def evaluate_compaction(original, compacted, symmetric=False, positions=200, seed=0):
+    """Measure how much a compacted Q-table differs from the original.
+    
+    A fixed, seeded sample of the original's states is the evaluation set.
+    The greedy choice agrees in a state if a best move of the compacted table
+    is also a best move of the original.
+    
+    Args:
+        original (dict): Original Q-table, in the plain layout
+        compacted (dict): Compacted Q-table
+        symmetric (bool): Whether compacted is keyed by canonical variants
+        positions (int): Number of states sampled
+        seed (int): Random seed of the sample
+    
+    Returns:
+        dict: 'positions', 'agreement' (fraction of states whose greedy choice
+            agrees) and 'value_error' (mean absolute change of the sampled
+            states' stored values)
+    """
+    state_keys = sorted(original)
+    sample = random.Random(seed).sample(state_keys, min(positions, len(state_keys)))
+    
+    agree = 0
+    errors = []
+    for state_key in sample:
+        if _best_moves(compacted, symmetric, state_key) & _best_moves(original, False, state_key):
+            agree += 1
+        
+        size = int(round(len(state_key) ** 0.5))
+        canonical, symmetry = canonical_state_key(state_key, size) if symmetric else (state_key, 0)
+        actions = compacted.get(canonical, {})
+        for action_key, value in original[state_key].items():
+            if symmetry:
+                row, col = transform(*map(int, action_key.split(',')), size, symmetry)
+                action_key = f"{row},{col}"
+            errors.append(abs(actions.get(action_key, 0.0) - value))
+    
+    return {
+        'positions': len(sample),
+        'agreement': agree / len(sample) if sample else 1.0,
+        'value_error': sum(errors) / len(errors) if errors else 0.0
+    }
+
+def compact_agent(agent, min_abs=0.0, min_visits=0, symmetric=False):
+    """Prune, and optionally symmetry-merge, a live agent's Q-table in place.
+    
+    The greedy action cache is cleared, also for agents sharing it.
+    
+    Args:
+        agent (QLearningAgent): Agent whose Q-table is compacted
+        min_abs (float): See prune_q_table
+        min_visits (int): See prune_q_table
+        symmetric (bool): Merge symmetric variants and switch the agent to
+            symmetric lookups
+    
+    Raises:
+        ValueError: If the agent uses relative state keys
+    """
+    if agent.relative:
+        raise ValueError("Relative Q-tables cannot be compacted")
+    
+    q_table = agent.q_table
+    if symmetric and not agent.symmetric:
+        q_table = merge_symmetric(q_table)
+        agent.symmetric = True
+    compacted = prune_q_table(q_table, min_abs, min_visits)
+    
+    # Replace the contents so agents sharing the table see the change
+    agent.q_table.clear()
+    agent.q_table.update(compacted)
+    agent.greedy.clear()
+
+def _load(path):
+    """Load a checkpoint and time it, including decoding its Q-table.
+    
+    Returns:
+        tuple: (checkpoint dict, Q-table, seconds)
+    """
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    q_table = read_q_table(data)
+    return data, q_table, time.perf_counter() - start
+
+def compact_file(in_path, out_path, min_abs=0.0, min_visits=0, symmetric=False,
+                 quantization='float32', positions=200):
+    """Compact a saved Q-table checkpoint into a new file.
+    
+    The output keeps the checkpoint's other fields, so QLearningAgent.load,
+    load_shared and the arena read it like the original. Pruning and merging
+    also shrink the loaded table; quantization only shrinks the file, since
+    the values are decoded back to floats on loading.
+    
+    Args:
+        in_path (str): Checkpoint saved by QLearningAgent.save or save_shared
+        out_path (str): Path of the compacted checkpoint
+        min_abs (float): See prune_q_table
+        min_visits (int): See prune_q_table
+        symmetric (bool): Merge symmetric variants of states
+        quantization (str): One of QUANTIZATIONS
+        positions (int): Size of the evaluation set
+    
+    Returns:
+        dict: Sizes, load times and evaluation results before and after
+    
+    Raises:
+        ValueError: If the checkpoint has relative state keys
+    """
+    data, q_table, load_before = _load(in_path)
+    was_symmetric = data.get('symmetric', False)
+    if data.get('relative'):
+        raise ValueError("Relative Q-tables cannot be compacted")
+    
+    compacted = q_table
+    if symmetric and not was_symmetric:
+        compacted = merge_symmetric(compacted)
+    compacted = prune_q_table(compacted, min_abs, min_visits)
+    
+    output = {key: value for key, value in data.items() if key not in ('q_table', 'compact_q_table')}
+    output['symmetric'] = symmetric or was_symmetric
+    output['compact_q_table'] = encode_q_table(compacted, quantization)
+    with open(out_path, 'wb') as f:
+        pickle.dump(output, f)
+    
+    _, loaded, load_after = _load(out_path)
+    report = {
+        'states_before': len(q_table),
+        'states_after': len(loaded),
+        'entries_before': sum(len(actions) for actions in q_table.values()),
+        'entries_after': sum(len(actions) for actions in loaded.values()),
+        'bytes_before': os.path.getsize(in_path),
+        'bytes_after': os.path.getsize(out_path),
+        'load_seconds_before': load_before,
+        'load_seconds_after': load_after
+    }
+    if not was_symmetric:
+        report.update(evaluate_compaction(q_table, loaded, output['symmetric'], positions))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune, merge and quantize a saved Q-table')
+    parser.add_argument('input', help='Checkpoint saved by the Q-learning agent or --shared_q training')
+    parser.add_argument('output', help='Path of the compacted checkpoint')
+    parser.add_argument('--min_abs', type=float, default=0.0,
+                        help='Drop values with at most this magnitude (default drops zeros)')
+    parser.add_argument('--min_visits', type=int, default=0,
+                        help='Drop states with fewer non-zero action values')
+    parser.add_argument('--symmetric', action='store_true',
+                        help='Merge rotated and mirrored variants of states')
+    parser.add_argument('--quantization', choices=list(QUANTIZATIONS), default='float32',
+                        help='Value encoding in the file (values are floats again once loaded)')
+    parser.add_argument('--positions', type=int, default=200, help='Size of the evaluation set')
+    args = parser.parse_args()
+    
+    report = compact_file(args.input, args.output, args.min_abs, args.min_visits,
+                          args.symmetric, args.quantization, args.positions)
+    print(f"States:  {report['states_before']:,} -> {report['states_after']:,}")
+    print(f"Entries: {report['entries_before']:,} -> {report['entries_after']:,}")
+    print(f"File:    {report['bytes_before']:,} -> {report['bytes_after']:,} bytes")
+    print(f"Load:    {report['load_seconds_before']:.3f}s -> {report['load_seconds_after']:.3f}s")
+    if 'agreement' in report:
+        print(f"Greedy agreement on {report['positions']} positions: {report['agreement']:.1%}, "
+              f"mean value error {report['value_error']:.4f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,45 @@
+import random
+from agents.agent import Agent
+
+class RandomAgent(Agent):
+    """Agent playing uniformly random valid moves, as a baseline opponent."""
+    
+    def choose_action(self, state):
+        """Choose a random valid move.
+        
+        Args:
+            state (dict): Current game state
+            
+        Returns:
+            tuple: (row, col) position to play
+        """
+        if not state['valid_moves']:
+            raise ValueError("No valid moves available")
+        return random.choice(state['valid_moves'])
+    
+    def learn(self, state, action, reward, next_state):
+        """Random agents do not learn from experience.
+        
+        Args:
+            state (dict): State before action
+            action (tuple): (row, col) position played
+            reward (float): Reward received
+            next_state (dict): State after action
+        """
+        pass
+    
+    def save(self, filepath):
+        """Random agents have nothing to save.
+        
+        Args:
+            filepath (str): Path to save the file
+        """
+        pass
+    
+    def load(self, filepath):
+        """Random agents have nothing to load.
+        
+        Args:
+            filepath (str): Path to the file
+        """
+        pass
\ No newline at end of file
@@ -0,0 +1,299 @@
+import time
+import random
+import hashlib
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Multiplier used to mix an action into a state fingerprint (64-bit golden ratio)
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+# What set() does with a new entry when its probe window is full:
+# 'drop' leaves the table unchanged, 'evict' replaces the entry with the
+# smallest absolute value in the window
+OVERFLOW_POLICIES = ('drop', 'evict')
+
+# Table header: entry count and overflow count as two 64-bit ints.
+# Each entry then takes 12 bytes, a 64-bit key and a float32 value.
+_HEADER_BYTES = 16
+
+class SharedQTable:
+    """Q-value store in shared memory that several processes update without locks.
+    
+    Entries live in an open-addressed hash table: an array of 64-bit keys
+    (fingerprints of the state and action, 0 marks an empty slot) and an array
+    of float32 values, probed linearly from the key's home slot. Like Hogwild
+    SGD, concurrent writers are not synchronized: an update racing with another
+    update of the same entry, or two inserts racing for the same empty slot,
+    can be lost. Q-learning tolerates such occasional lost updates.
+    
+    The table has a fixed capacity. An insert that finds no free slot within
+    max_probes slots is handled by the overflow policy.
+    
+    Instances pickle by name, so a table passed to a worker process attaches
+    to the same memory block.
+    """
+    
+    def __init__(self, capacity=1 << 20, name=None, overflow='drop', max_probes=32):
+        """Create a new table, or attach to an existing one.
+        
+        Args:
+            capacity (int): Number of entries
+            name (str, optional): Name of an existing table to attach to
+            overflow (str): 'drop' or 'evict', see OVERFLOW_POLICIES
+            max_probes (int): Number of slots searched for a key
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        
+        self.capacity = capacity
+        self.overflow = overflow
+        self.max_probes = min(max_probes, capacity)
+        self.owner = name is None
+        
+        size = _HEADER_BYTES + capacity * 12
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.memory.buf[:size] = bytes(size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        
+        buf = self.memory.buf
+        keys_end = _HEADER_BYTES + capacity * 8
+        self.header = buf[:_HEADER_BYTES].cast('q')  # [entry count, dropped inserts]
+        self.keys = buf[_HEADER_BYTES:keys_end].cast('Q')
+        self.values = buf[keys_end:keys_end + capacity * 4].cast('f')
+        
+        # Fingerprint of the last state looked up; agents query many actions per state
+        self._last_state = None
+        self._last_hash = 0
+    
+    def __getstate__(self):
+        return {
+            'capacity': self.capacity,
+            'name': self.name,
+            'overflow': self.overflow,
+            'max_probes': self.max_probes
+        }
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    def __len__(self):
+        """Approximate number of stored entries (the counter is not synchronized)."""
+        return self.header[0]
+    
+    @property
+    def dropped(self):
+        """Approximate number of inserts rejected or evicted because of overflow."""
+        return self.header[1]
+    
+    def _key(self, state_key, action):
+        """Fingerprint a state-action pair.
+        
+        The state is hashed with a fixed hash function so every process
+        computes the same fingerprint.
+        
+        Args:
+            state_key (str): State representation
+            action (tuple): (row, col) position
+        
+        Returns:
+            int: Non-zero 64-bit key
+        """
+        if state_key is not self._last_state:
+            digest = hashlib.blake2b(state_key.encode(), digest_size=8).digest()
+            self._last_hash = int.from_bytes(digest, 'little')
+            self._last_state = state_key
+        
+        key = (self._last_hash ^ (((action[0] << 16) | action[1]) + 1) * _MIX) & _MASK
+        return key or 1
+    
+    def get(self, state_key, action, default=0.0):
+        """Look up a Q-value.
+        
+        Args:
+            state_key (str): State representation
+            action (tuple): (row, col) position
+            default (float): Value returned for unknown pairs
+        
+        Returns:
+            float: Stored Q-value, or default
+        """
+        key = self._key(state_key, action)
+        keys = self.keys
+        capacity = self.capacity
+        slot = key % capacity
+        for _ in range(self.max_probes):
+            stored = keys[slot]
+            if stored == key:
+                return self.values[slot]
+            if stored == 0:
+                break
+            slot += 1
+            if slot == capacity:
+                slot = 0
+        return default
+    
+    def set(self, state_key, action, value):
+        """Store a Q-value.
+        
+        Args:
+            state_key (str): State representation
+            action (tuple): (row, col) position
+            value (float): Q-value
+        
+        Returns:
+            bool: False if the entry was dropped because the table is full
+        """
+        key = self._key(state_key, action)
+        keys = self.keys
+        capacity = self.capacity
+        slot = key % capacity
+        victim = slot
+        for _ in range(self.max_probes):
+            stored = keys[slot]
+            if stored == key:
+                self.values[slot] = value
+                return True
+            if stored == 0:
+                keys[slot] = key
+                self.values[slot] = value
+                self.header[0] += 1
+                return True
+            if abs(self.values[slot]) < abs(self.values[victim]):
+                victim = slot
+            slot += 1
+            if slot == capacity:
+                slot = 0
+        
+        self.header[1] += 1
+        if self.overflow == 'evict':
+            keys[victim] = key
+            self.values[victim] = value
+            return True
+        return False
+    
+    def snapshot(self):
+        """Copy the table contents.
+        
+        Returns:
+            dict: 'capacity', 'keys' and 'values' (raw bytes), for saving
+        """
+        return {
+            'capacity': self.capacity,
+            'keys': self.keys.tobytes(),
+            'values': self.values.tobytes()
+        }
+    
+    def restore(self, snapshot):
+        """Replace the table contents with a snapshot of a table of equal capacity.
+        
+        Args:
+            snapshot (dict): Result of snapshot()
+        """
+        if snapshot['capacity'] != self.capacity:
+            raise ValueError(f"Snapshot capacity {snapshot['capacity']} does not match {self.capacity}")
+        
+        keys_end = _HEADER_BYTES + self.capacity * 8
+        self.memory.buf[_HEADER_BYTES:keys_end] = snapshot['keys']
+        self.memory.buf[keys_end:keys_end + self.capacity * 4] = snapshot['values']
+        self.header[0] = self.capacity - self.keys.tolist().count(0)
+        self.header[1] = 0
+    
+    def close(self):
+        """Detach from the shared memory; the owner also frees it."""
+        if self.memory is None:
+            return
+        self.header.release()
+        self.keys.release()
+        self.values.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+def _random_updates(get, set_, num_updates, num_states, seed):
+    """Run Q-learning-like read-modify-write updates on random state-action pairs.
+    
+    Args:
+        get (callable): get(state_key, action) -> value
+        set_ (callable): set(state_key, action, value)
+        num_updates (int): Number of updates
+        num_states (int): Number of distinct states
+        seed (int): Random seed
+    """
+    rng = random.Random(seed)
+    states = [f"state-{i:06d}" * 8 for i in range(num_states)]
+    for _ in range(num_updates):
+        state_key = states[rng.randrange(num_states)]
+        action = (rng.randrange(50), rng.randrange(50))
+        value = get(state_key, action)
+        set_(state_key, action, value + 0.1 * (1.0 - value))
+
+def _shared_worker(args):
+    """Process pool entry point: updates on the shared table."""
+    table, num_updates, num_states, seed = args
+    _random_updates(table.get, table.set, num_updates, num_states, seed)
+    table.close()
+
+def _dict_worker(args):
+    """Process pool entry point: updates on a table private to the worker."""
+    num_updates, num_states, seed = args
+    q_table = {}
+    
+    def get(state_key, action):
+        return q_table.get(state_key, {}).get(f"{action[0]},{action[1]}", 0.0)
+    
+    def set_(state_key, action, value):
+        q_table.setdefault(state_key, {})[f"{action[0]},{action[1]}"] = value
+    
+    _random_updates(get, set_, num_updates, num_states, seed)
+
+def benchmark(workers=4, updates=200000, states=10000, capacity=1 << 21):
+    """Compare update throughput of one shared table with per-worker tables.
+    
+    Args:
+        workers (int): Number of worker processes
+        updates (int): Updates per worker
+        states (int): Distinct states per worker
+        capacity (int): Shared table capacity
+    
+    Returns:
+        dict: Updates per second for 'shared' and 'per_worker' tables
+    """
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    with context.Pool(workers) as pool:
+        pool.map(abs, range(workers))  # Start the workers before timing
+        
+        table = SharedQTable(capacity)
+        try:
+            start = time.perf_counter()
+            pool.map(_shared_worker, [(table, updates, states, seed) for seed in range(workers)])
+            results['shared'] = workers * updates / (time.perf_counter() - start)
+            results['shared_entries'] = len(table)
+        finally:
+            table.close()
+        
+        start = time.perf_counter()
+        pool.map(_dict_worker, [(updates, states, seed) for seed in range(workers)])
+        results['per_worker'] = workers * updates / (time.perf_counter() - start)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared-memory Q-table')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--updates', type=int, default=200000, help='Updates per worker')
+    parser.add_argument('--states', type=int, default=10000, help='Distinct states per worker')
+    parser.add_argument('--capacity', type=int, default=1 << 21, help='Shared table capacity')
+    args = parser.parse_args()
+    
+    results = benchmark(args.workers, args.updates, args.states, args.capacity)
+    print(f"Shared table:      {results['shared']:,.0f} updates/s ({results['shared_entries']:,} entries)")
+    print(f"Per-worker tables: {results['per_worker']:,.0f} updates/s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,328 @@
+import random
+from itertools import compress
+from game.board import zobrist_keys
+
+# Maps the digits of bin() to bytes 0 and 1, for itertools.compress
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+class BitBoard:
+    """Gomoku board storing each player's stones as one Python int.
+    
+    Cell (row, col) maps to bit row * (size + 1) + col. The extra padding
+    column is always empty, so shifting a bitboard by 1, size, size + 1 or
+    size + 2 moves every stone one step along a line without wrapping into
+    the next row. Five in a row is then found with a few shifts and ANDs over
+    the whole board at once.
+    
+    The interface mirrors Board (make_move, unmake_move, get_valid_moves,
+    get_candidate_moves, check_winner, can_win, is_full, get_state_key, grid), but the
+    threat index used by search agents is not available.
+    """
+    
+    def __init__(self, size=50, candidate_radius=2):
+        """Initialize an empty board.
+        
+        Args:
+            size (int): Size of the board (default is 50x50)
+            candidate_radius (int): Empty cells within this many rows and columns
+                of a stone are candidate moves
+        """
+        self.size = size
+        self.candidate_radius = candidate_radius
+        self.stride = size + 1
+        self.zobrist = zobrist_keys(size)
+        
+        # Shift amounts for horizontal, vertical, diagonal and anti-diagonal lines
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        
+        # All playable bits, without the padding column
+        row_mask = (1 << size) - 1
+        self.full_mask = 0
+        for row in range(size):
+            self.full_mask |= row_mask << (row * self.stride)
+        
+        # (row, col) of every bit index, padding included
+        self.bit_cells = [(index // self.stride, index % self.stride) for index in range(size * self.stride)]
+        
+        self.reset()
+    
+    def reset(self):
+        """Reset the board to empty state."""
+        self.stones = {'X': 0, 'O': 0}
+        self.move_count = 0
+        self.winner = ' '
+        self.hash = 0
+        self.history = []
+    
+    def _has_five(self, bits):
+        """Check a bitboard for five stones in a row.
+        
+        Args:
+            bits (int): Bitboard of one player
+        
+        Returns:
+            bool: True if any line holds five consecutive stones
+        """
+        for shift in self.shifts:
+            pairs = bits & (bits >> shift)
+            fours = pairs & (pairs >> (2 * shift))
+            if fours & (bits >> (4 * shift)):
+                return True
+        return False
+    
+    def make_move(self, row, col, player):
+        """Place a player's mark on the board.
+        
+        Args:
+            row (int): Row index
+            col (int): Column index
+            player (str): Player symbol ('X' or 'O')
+        
+        Returns:
+            bool: True if move was valid and made, False otherwise
+        """
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        bit = 1 << (row * self.stride + col)
+        if (self.stones['X'] | self.stones['O']) & bit:
+            return False
+        
+        self.history.append((row, col, player, self.winner))
+        self.stones[player] |= bit
+        self.move_count += 1
+        self.hash ^= self.zobrist[player][row * self.size + col]
+        if self.winner == ' ' and self._has_five(self.stones[player]):
+            self.winner = player
+        return True
+    
+    def unmake_move(self):
+        """Take back the most recent move.
+        
+        Returns:
+            tuple: (row, col, player) of the removed move
+        
+        Raises:
+            IndexError: If no moves have been made
+        """
+        row, col, player, previous_winner = self.history.pop()
+        self.stones[player] &= ~(1 << (row * self.stride + col))
+        self.move_count -= 1
+        self.hash ^= self.zobrist[player][row * self.size + col]
+        self.winner = previous_winner
+        return row, col, player
+    
+    def apply_moves(self, moves):
+        """Place a sequence of stones.
+        
+        Args:
+            moves (list): (row, col, player) tuples
+            
+        Raises:
+            ValueError: If a move is invalid
+        """
+        for row, col, player in moves:
+            if not self.make_move(row, col, player):
+                raise ValueError(f"Invalid move: {row},{col}")
+    
+    def _five_starts(self, bits):
+        """Count the five-cell lines fully contained in a bitboard.
+        
+        Args:
+            bits (int): Bitboard
+        
+        Returns:
+            int: Number of lines of five set bits, over all directions
+        """
+        total = 0
+        for shift in self.shifts:
+            pairs = bits & (bits >> shift)
+            total += bin(pairs & (pairs >> (2 * shift)) & (bits >> (4 * shift))).count('1')
+        return total
+    
+    def open_window_count(self, player):
+        """Get the number of five-cell windows a player could still complete.
+        
+        Computed with shifts over the whole board rather than kept incrementally,
+        which is cheap for integer bitboards.
+        
+        Args:
+            player (str): 'X' or 'O'
+        
+        Returns:
+            int: Windows holding no opposing stone
+        """
+        return self._five_starts(self.full_mask & ~self.stones['O' if player == 'X' else 'X'])
+    
+    def can_win(self, player):
+        """Check whether a player can still get five in a row.
+        
+        Args:
+            player (str): 'X' or 'O'
+        
+        Returns:
+            bool: True if some window holds no opposing stone
+        """
+        return self._has_five(self.full_mask & ~self.stones['O' if player == 'X' else 'X'])
+    
+    def _cells(self, bits):
+        """Convert a bitboard to board positions.
+        
+        Args:
+            bits (int): Bitboard
+        
+        Returns:
+            list: List of (row, col) tuples for the set bits
+        """
+        # bin() writes the bits in linear time, lowest last; reversed and
+        # turned into 0/1 bytes they select the cells in a single C-level pass
+        digits = bin(bits)[:1:-1].encode('ascii').translate(_BINARY_DIGITS)
+        return list(compress(self.bit_cells, digits))
+    
+    def empty_bits(self):
+        """Get the bitboard of empty cells.
+        
+        Returns:
+            int: Bitboard with a bit set for every empty cell
+        """
+        return self.full_mask & ~(self.stones['X'] | self.stones['O'])
+    
+    def get_valid_moves(self):
+        """Get all valid move positions on the board.
+        
+        Returns:
+            list: List of (row, col) tuples for all empty spaces
+        """
+        return self._cells(self.empty_bits())
+    
+    def get_candidate_moves(self):
+        """Get the empty positions close to existing stones.
+        
+        Same rules as Board.get_candidate_moves: the center on an empty board,
+        all empty cells if every cell near the stones is taken.
+        
+        Returns:
+            list: List of (row, col) tuples
+        """
+        if self.move_count == 0:
+            return [(self.size // 2, self.size // 2)]
+        
+        occupied = self.stones['X'] | self.stones['O']
+        near = occupied
+        for _ in range(self.candidate_radius):
+            # Grow by one cell in all eight directions; masking drops the padding
+            wide = near | (near << 1) | (near >> 1)
+            near = (wide | (wide << self.stride) | (wide >> self.stride)) & self.full_mask
+        
+        candidates = near & ~occupied
+        if not candidates:
+            return self.get_valid_moves()
+        return self._cells(candidates)
+    
+    def check_winner(self):
+        """Check if there is a winner (5 in a row).
+        
+        Returns:
+            str: 'X' or 'O' if there's a winner, ' ' if no winner yet
+        """
+        for player in ('X', 'O'):
+            if self._has_five(self.stones[player]):
+                return player
+        return ' '
+    
+    def is_full(self):
+        """Check if the board is full.
+        
+        Returns:
+            bool: True if no empty spaces left, False otherwise
+        """
+        return self.move_count == self.size * self.size
+    
+    @property
+    def grid(self):
+        """List-of-lists view of the board, built on demand (for display)."""
+        grid = [[' '] * self.size for _ in range(self.size)]
+        for player in ('X', 'O'):
+            for row, col in self._cells(self.stones[player]):
+                grid[row][col] = player
+        return grid
+    
+    def get_state_key(self):
+        """Get a string representation of the board state for Q-learning.
+        
+        Returns:
+            str: String representation of the board, identical to Board's
+        """
+        return ''.join(''.join(row) for row in self.grid)
+    
+    def random_playout(self, player, max_plies=None, rng=random, local=True):
+        """Play random moves until the game ends, without changing the board.
+        
+        Args:
+            player (str): Side to move
+            max_plies (int, optional): Number of moves after which the playout
+                stops undecided
+            rng (random.Random): Source of randomness
+            local (bool): Prefer moves within candidate_radius of a random stone
+                over moves anywhere on the board
+        
+        Returns:
+            str: 'X' or 'O' for the winner, None for a draw or an undecided playout
+        """
+        if self.winner != ' ':
+            return self.winner
+        
+        size = self.size
+        stride = self.stride
+        radius = self.candidate_radius
+        shifts = self.shifts
+        span = 2 * radius + 1
+        
+        empty = self.get_valid_moves()
+        rng.shuffle(empty)
+        placed = self._cells(self.stones['X'] | self.stones['O'])
+        
+        # The side to move and the side waiting, as plain ints
+        mover, waiting = player, 'O' if player == 'X' else 'X'
+        own, other = self.stones[mover], self.stones[waiting]
+        occupied = own | other
+        
+        limit = len(empty) if max_plies is None else min(max_plies, len(empty))
+        for _ in range(limit):
+            bit = 0
+            if local and placed:
+                # Rejection-sample a cell near a random stone
+                for _ in range(4):
+                    row, col = placed[int(rng.random() * len(placed))]
+                    row += int(rng.random() * span) - radius
+                    col += int(rng.random() * span) - radius
+                    if 0 <= row < size and 0 <= col < size and not occupied >> (row * stride + col) & 1:
+                        bit = 1 << (row * stride + col)
+                        break
+            while not bit and empty:
+                # Fall back to the next unused cell of the shuffled move list
+                row, col = empty.pop()
+                if not occupied >> (row * stride + col) & 1:
+                    bit = 1 << (row * stride + col)
+            if not bit:
+                break
+            
+            own |= bit
+            occupied |= bit
+            placed.append((row, col))
+            
+            for shift in shifts:
+                pairs = own & (own >> shift)
+                if pairs & (pairs >> (2 * shift)) & (own >> (4 * shift)):
+                    return mover
+            
+            mover, waiting = waiting, mover
+            own, other = other, own
+        
+        return None
+    
+    def __str__(self):
+        """String representation of the board for printing."""
+        grid = self.grid
+        rows = [' | '.join(row) for row in grid]
+        divider = '-' * (4 * self.size - 1)
+        return '\n'.join([rows[0]] + [divider + '\n' + row for row in rows[1:]])
\ No newline at end of file
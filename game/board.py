@@ -1,18 +1,111 @@
+import random
+
+# Line directions as (row step, column step): horizontal, vertical, diagonal, anti-diagonal
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Threat levels reported by Board.threat_level, weakest to strongest
+THREAT_NONE = 0
+THREAT_OPEN_TWO = 1
+THREAT_THREE = 2
+THREAT_OPEN_THREE = 3
+THREAT_FOUR = 4
+THREAT_OPEN_FOUR = 5
+THREAT_FIVE = 6
+
+# Zobrist keys per board size, shared by all boards of that size
+_zobrist_keys = {}
+
+def zobrist_keys(size):
+    """Get the Zobrist hashing keys for a board size.
+    
+    Args:
+        size (int): Size of the board
+        
+    Returns:
+        dict: Maps 'X' and 'O' to a list of 64-bit keys, one per cell
+    """
+    if size not in _zobrist_keys:
+        rng = random.Random(size)  # Fixed seed so hashes are stable across runs
+        _zobrist_keys[size] = {
+            'X': [rng.getrandbits(64) for _ in range(size * size)],
+            'O': [rng.getrandbits(64) for _ in range(size * size)]
+        }
+    return _zobrist_keys[size]
+
+# Five-cell windows per board size, shared by all boards of that size
+_line_windows = {}
+
+def line_windows(size):
+    """Get the five-cell windows a line can be completed in for a board size.
+    
+    Args:
+        size (int): Size of the board
+        
+    Returns:
+        tuple: (cell_windows, count), where cell_windows holds for every cell
+            index (row * size + col) the indices of the windows containing it
+    """
+    if size not in _line_windows:
+        cell_windows = [[] for _ in range(size * size)]
+        count = 0
+        for dr, dc in DIRECTIONS:
+            for row in range(size):
+                for col in range(size):
+                    if 0 <= row + 4 * dr < size and 0 <= col + 4 * dc < size:
+                        for k in range(5):
+                            cell_windows[(row + k * dr) * size + col + k * dc].append(count)
+                        count += 1
+        _line_windows[size] = ([tuple(windows) for windows in cell_windows], count)
+    return _line_windows[size]
+
 class Board:
     """Represents a tic-tac-toe board."""
     
-    def __init__(self, size=50):
+    def __init__(self, size=50, candidate_radius=2):
         """Initialize an empty board.
         
         Args:
             size (int): Size of the board (default is 50x50)
+            candidate_radius (int): Empty cells within this many rows and columns
+                of a stone are candidate moves
         """
         self.size = size
+        self.candidate_radius = candidate_radius
+        self.zobrist = zobrist_keys(size)
+        self.cell_windows, self.num_windows = line_windows(size)
         self.reset()
     
     def reset(self):
         """Reset the board to empty state."""
         self.grid = [[' ' for _ in range(self.size)] for _ in range(self.size)]
+        self.move_count = 0
+        
+        # Number of stones within candidate_radius of each cell, and the empty
+        # cells among them with a non-zero count
+        self.neighbour_counts = [[0] * self.size for _ in range(self.size)]
+        self.candidates = set()
+        
+        # Threat index: for every cell, direction and side, the number of the
+        # player's stones directly adjacent in that direction. Only entries of
+        # empty cells are kept up to date. Layout: ((row * size + col) * 4 + direction) * 2 + side,
+        # where side 0 looks towards -direction and side 1 towards +direction.
+        self.runs = {
+            'X': [0] * (self.size * self.size * 8),
+            'O': [0] * (self.size * self.size * 8)
+        }
+        self.winner = ' '
+        
+        # Number of each player's stones in every five-cell window, and the
+        # number of windows each player could still complete (no opposing stone)
+        self.window_stones = {
+            'X': [0] * self.num_windows,
+            'O': [0] * self.num_windows
+        }
+        self.open_windows = {'X': self.num_windows, 'O': self.num_windows}
+        
+        # Zobrist hash of the position and the undo log used by unmake_move
+        self.hash = 0
+        self.history = []
         
     def make_move(self, row, col, player):
         """Place a player's mark on the board.
@@ -26,10 +119,334 @@ class Board:
             bool: True if move was valid and made, False otherwise
         """
         if 0 <= row < self.size and 0 <= col < self.size and self.grid[row][col] == ' ':
+            previous_winner = self.winner
+            if self.makes_five(row, col, player):
+                self.winner = player
             self.grid[row][col] = player
+            self.move_count += 1
+            self.hash ^= self.zobrist[player][row * self.size + col]
+            self._add_neighbour(row, col)
+            self._add_to_windows(row, col, player)
+            changes = self._update_runs(row, col, player)
+            self.history.append((row, col, player, previous_winner, changes))
             return True
         return False
     
+    def unmake_move(self):
+        """Take back the most recent move.
+        
+        Restores the grid, the candidate moves, the threat index, the hash and
+        the winner, in time independent of the board size.
+        
+        Returns:
+            tuple: (row, col, player) of the removed move
+            
+        Raises:
+            IndexError: If no moves have been made
+        """
+        row, col, player, previous_winner, changes = self.history.pop()
+        
+        runs = self.runs[player]
+        for i in range(len(changes) - 2, -1, -2):
+            runs[changes[i]] = changes[i + 1]
+        
+        self.grid[row][col] = ' '
+        self.move_count -= 1
+        self.hash ^= self.zobrist[player][row * self.size + col]
+        self.winner = previous_winner
+        self._remove_neighbour(row, col)
+        self._remove_from_windows(row, col, player)
+        return row, col, player
+    
+    def apply_moves(self, moves):
+        """Place a sequence of stones.
+        
+        Args:
+            moves (list): (row, col, player) tuples
+            
+        Raises:
+            ValueError: If a move is invalid
+        """
+        for row, col, player in moves:
+            if not self.make_move(row, col, player):
+                raise ValueError(f"Invalid move: {row},{col}")
+    
+    def _add_to_windows(self, row, col, player):
+        """Count a new stone in its windows; windows it enters are closed to the opponent.
+        
+        Args:
+            row (int): Row index
+            col (int): Column index
+            player (str): Player symbol
+        """
+        counts = self.window_stones[player]
+        closed = 0
+        for window in self.cell_windows[row * self.size + col]:
+            if counts[window] == 0:
+                closed += 1
+            counts[window] += 1
+        self.open_windows['O' if player == 'X' else 'X'] -= closed
+    
+    def _remove_from_windows(self, row, col, player):
+        """Undo _add_to_windows for a removed stone.
+        
+        Args:
+            row (int): Row index
+            col (int): Column index
+            player (str): Player symbol
+        """
+        counts = self.window_stones[player]
+        opened = 0
+        for window in self.cell_windows[row * self.size + col]:
+            counts[window] -= 1
+            if counts[window] == 0:
+                opened += 1
+        self.open_windows['O' if player == 'X' else 'X'] += opened
+    
+    def open_window_count(self, player):
+        """Get the number of five-cell windows a player could still complete.
+        
+        Args:
+            player (str): 'X' or 'O'
+            
+        Returns:
+            int: Windows holding no opposing stone
+        """
+        return self.open_windows[player]
+    
+    def can_win(self, player):
+        """Check whether a player can still get five in a row.
+        
+        Args:
+            player (str): 'X' or 'O'
+            
+        Returns:
+            bool: True if some window holds no opposing stone
+        """
+        return self.open_windows[player] > 0
+    
+    def _update_runs(self, row, col, player):
+        """Update the threat index after a stone is placed.
+        
+        The new stone joins the runs on both of its sides into one line. Only
+        the empty cells just beyond the two ends of that line see a change.
+        
+        Args:
+            row (int): Row index of the stone
+            col (int): Column index of the stone
+            player (str): Player symbol ('X' or 'O')
+            
+        Returns:
+            list: Flat (index, old value) pairs of the changed entries, for undo
+        """
+        runs = self.runs[player]
+        size = self.size
+        base = (row * size + col) * 8
+        changes = []
+        
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            neg = runs[base + d * 2]
+            pos = runs[base + d * 2 + 1]
+            total = neg + pos + 1
+            
+            # Cell beyond the positive end now sees the whole line on its negative side
+            r = row + (pos + 1) * dr
+            c = col + (pos + 1) * dc
+            if 0 <= r < size and 0 <= c < size:
+                index = ((r * size + c) * 4 + d) * 2
+                changes.append(index)
+                changes.append(runs[index])
+                runs[index] = total
+            
+            # Cell beyond the negative end sees it on its positive side
+            r = row - (neg + 1) * dr
+            c = col - (neg + 1) * dc
+            if 0 <= r < size and 0 <= c < size:
+                index = ((r * size + c) * 4 + d) * 2 + 1
+                changes.append(index)
+                changes.append(runs[index])
+                runs[index] = total
+        
+        return changes
+    
+    def _add_neighbour(self, row, col):
+        """Update the candidate moves around a newly placed stone.
+        
+        Args:
+            row (int): Row index of the stone
+            col (int): Column index of the stone
+        """
+        radius = self.candidate_radius
+        col_start = max(0, col - radius)
+        col_end = min(self.size, col + radius + 1)
+        
+        for r in range(max(0, row - radius), min(self.size, row + radius + 1)):
+            counts = self.neighbour_counts[r]
+            cells = self.grid[r]
+            for c in range(col_start, col_end):
+                counts[c] += 1
+                if cells[c] == ' ':
+                    self.candidates.add((r, c))
+        
+        self.candidates.discard((row, col))
+    
+    def _remove_neighbour(self, row, col):
+        """Update the candidate moves around a removed stone.
+        
+        Args:
+            row (int): Row index of the (now empty) cell
+            col (int): Column index of the (now empty) cell
+        """
+        radius = self.candidate_radius
+        col_start = max(0, col - radius)
+        col_end = min(self.size, col + radius + 1)
+        
+        for r in range(max(0, row - radius), min(self.size, row + radius + 1)):
+            counts = self.neighbour_counts[r]
+            cells = self.grid[r]
+            for c in range(col_start, col_end):
+                counts[c] -= 1
+                if cells[c] == ' ':
+                    if counts[c]:
+                        self.candidates.add((r, c))
+                    else:
+                        self.candidates.discard((r, c))
+    
+    def get_candidate_moves(self):
+        """Get the empty positions close to existing stones.
+        
+        On an empty board the only candidate is the center. If every cell near
+        the stones is taken, all empty cells are returned instead.
+        
+        Returns:
+            list: List of (row, col) tuples
+        """
+        if self.move_count == 0:
+            return [(self.size // 2, self.size // 2)]
+        if not self.candidates:
+            return self.get_valid_moves()
+        return list(self.candidates)
+    
+    def line_length(self, row, col, player, direction):
+        """Get the length of the line a stone at an empty cell would complete.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            direction (int): Index into DIRECTIONS
+            
+        Returns:
+            int: Number of consecutive stones including the new one
+        """
+        index = ((row * self.size + col) * 4 + direction) * 2
+        runs = self.runs[player]
+        return runs[index] + runs[index + 1] + 1
+    
+    def open_ends(self, row, col, player, direction):
+        """Count the empty cells bounding the line a stone at an empty cell would complete.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            direction (int): Index into DIRECTIONS
+            
+        Returns:
+            int: 0, 1 or 2 open ends
+        """
+        index = ((row * self.size + col) * 4 + direction) * 2
+        runs = self.runs[player]
+        dr, dc = DIRECTIONS[direction]
+        
+        open_count = 0
+        r = row - (runs[index] + 1) * dr
+        c = col - (runs[index] + 1) * dc
+        if 0 <= r < self.size and 0 <= c < self.size and self.grid[r][c] == ' ':
+            open_count += 1
+        r = row + (runs[index + 1] + 1) * dr
+        c = col + (runs[index + 1] + 1) * dc
+        if 0 <= r < self.size and 0 <= c < self.size and self.grid[r][c] == ' ':
+            open_count += 1
+        return open_count
+    
+    def makes_five(self, row, col, player):
+        """Check whether playing at an empty cell wins the game.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            
+        Returns:
+            bool: True if the move completes five or more in a row
+        """
+        index = (row * self.size + col) * 8
+        runs = self.runs[player]
+        for side in range(0, 8, 2):
+            if runs[index + side] + runs[index + side + 1] >= 4:
+                return True
+        return False
+    
+    def makes_open_four(self, row, col, player):
+        """Check whether playing at an empty cell makes a straight four open at both ends.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            
+        Returns:
+            bool: True if the move makes an open four
+        """
+        return any(self.line_length(row, col, player, d) == 4 and self.open_ends(row, col, player, d) == 2
+                   for d in range(len(DIRECTIONS)))
+    
+    def makes_open_three(self, row, col, player):
+        """Check whether playing at an empty cell makes a straight three open at both ends.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            
+        Returns:
+            bool: True if the move makes an open three
+        """
+        return any(self.line_length(row, col, player, d) == 3 and self.open_ends(row, col, player, d) == 2
+                   for d in range(len(DIRECTIONS)))
+    
+    def threat_level(self, row, col, player):
+        """Get the strongest straight line a stone at an empty cell would make.
+        
+        Only unbroken runs are considered; split patterns like X_XX are not.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            player (str): Player symbol ('X' or 'O')
+            
+        Returns:
+            int: One of the THREAT_* levels
+        """
+        best = THREAT_NONE
+        for d in range(len(DIRECTIONS)):
+            length = self.line_length(row, col, player, d)
+            if length >= 5:
+                return THREAT_FIVE
+            if length < 2:
+                continue
+            
+            open_count = self.open_ends(row, col, player, d)
+            if length == 4:
+                level = THREAT_OPEN_FOUR if open_count == 2 else THREAT_FOUR if open_count == 1 else THREAT_NONE
+            elif length == 3:
+                level = THREAT_OPEN_THREE if open_count == 2 else THREAT_THREE if open_count == 1 else THREAT_NONE
+            else:
+                level = THREAT_OPEN_TWO if open_count == 2 else THREAT_NONE
+            best = max(best, level)
+        return best
+    
     def get_valid_moves(self):
         """Get all valid move positions on the board.
         
@@ -87,7 +504,7 @@ class Board:
         Returns:
             bool: True if no empty spaces left, False otherwise
         """
-        return all(self.grid[r][c] != ' ' for r in range(self.size) for c in range(self.size))
+        return self.move_count == self.size * self.size
     
     def get_state_key(self):
         """Get a string representation of the board state for Q-learning.
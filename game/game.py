@@ -1,15 +1,42 @@
 from game.board import Board
+from game.bitboard import BitBoard
+
+# Board implementations selectable with TicTacToe(engine=...)
+ENGINES = {'board': Board, 'bitboard': BitBoard}
+
+# Ways to decide a game stopped by max_plies: 'draw' always draws, 'open_lines'
+# awards the game to the player with more five-cell windows still open
+ADJUDICATIONS = ('draw', 'open_lines')
 
 class TicTacToe:
     """The game of Tic-Tac-Toe."""
     
-    def __init__(self, board_size=50):
+    def __init__(self, board_size=50, candidate_radius=None, engine='board',
+                 max_plies=None, adjudication='draw'):
         """Initialize the game.
         
         Args:
             board_size (int): Size of the board (default is 50x50)
+            candidate_radius (int, optional): If given, only empty cells within this
+                distance of a stone are offered as valid moves
+            engine (str): 'board' for the list-based Board with threat index, or
+                'bitboard' for the faster BitBoard
+            max_plies (int, optional): Stop the game after this many moves
+            adjudication (str): How a game stopped by max_plies is decided,
+                one of ADJUDICATIONS
         """
-        self.board = Board(board_size)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown board engine: {engine}")
+        if adjudication not in ADJUDICATIONS:
+            raise ValueError(f"Unknown adjudication: {adjudication}")
+        
+        if candidate_radius is None:
+            self.board = ENGINES[engine](board_size)
+        else:
+            self.board = ENGINES[engine](board_size, candidate_radius)
+        self.restrict_to_candidates = candidate_radius is not None
+        self.max_plies = max_plies
+        self.adjudication = adjudication
         self.current_player = 'X'  # X goes first
         self.winner = None
         self.is_draw = False
@@ -37,12 +64,22 @@ class TicTacToe:
         return {
             'board': self.board,
             'current_player': self.current_player,
-            'valid_moves': self.board.get_valid_moves(),
+            'valid_moves': self.get_valid_moves(),
             'is_terminal': self.is_terminal(),
             'winner': self.winner,
             'is_draw': self.is_draw
         }
     
+    def get_valid_moves(self):
+        """Get the moves offered to the agents.
+        
+        Returns:
+            list: (row, col) tuples, restricted to candidate moves if enabled
+        """
+        if self.restrict_to_candidates:
+            return self.board.get_candidate_moves()
+        return self.board.get_valid_moves()
+    
     def make_move(self, row, col):
         """Make a move at the specified position.
         
@@ -53,6 +90,19 @@ class TicTacToe:
         Returns:
             dict: Updated game state
             
+        Raises:
+            ValueError: If the move is invalid
+        """
+        self.play(row, col)
+        return self.get_state()
+    
+    def play(self, row, col):
+        """Make a move without building the state dictionary.
+        
+        Args:
+            row (int): Row index
+            col (int): Column index
+            
         Raises:
             ValueError: If the move is invalid
         """
@@ -65,15 +115,67 @@ class TicTacToe:
         # Record move
         self.move_history.append((row, col, self.current_player))
         
-        # Check for winner
-        winner = self.board.check_winner()
+        # Check for winner (tracked incrementally by the board)
+        winner = self.board.winner
         if winner != ' ':
             self.winner = winner
-        elif self.board.is_full():
+        elif self.board.is_full() or not (self.board.can_win('X') or self.board.can_win('O')):
+            # Nobody can complete a line any more
             self.is_draw = True
+        elif self.max_plies is not None and len(self.move_history) >= self.max_plies:
+            self._adjudicate()
         else:
             self.switch_player()
+    
+    def _adjudicate(self):
+        """Decide a game stopped by max_plies."""
+        if self.adjudication == 'open_lines':
+            x_open = self.board.open_window_count('X')
+            o_open = self.board.open_window_count('O')
+            if x_open != o_open:
+                self.winner = 'X' if x_open > o_open else 'O'
+                return
+        self.is_draw = True
+    
+    def unmake_move(self):
+        """Take back the most recent move.
+        
+        Restores the board, the player to move and the winner and draw flags
+        without copying or rescanning the board.
+        
+        Returns:
+            tuple: (row, col, player) of the removed move
+            
+        Raises:
+            ValueError: If no moves have been made
+        """
+        if not self.move_history:
+            raise ValueError("No moves to take back")
+        
+        row, col, player = self.move_history.pop()
+        self.board.unmake_move()
+        self.current_player = player
+        self.winner = None
+        self.is_draw = False
+        return row, col, player
+    
+    def apply_moves(self, moves):
+        """Play a sequence of moves, e.g. to replay a recorded game.
         
+        Args:
+            moves (list): (row, col) or (row, col, player) tuples; if a player is
+                given it must be the player to move
+            
+        Returns:
+            dict: Game state after the last move
+            
+        Raises:
+            ValueError: If a move is invalid or out of turn
+        """
+        for move in moves:
+            if len(move) > 2 and move[2] != self.current_player:
+                raise ValueError(f"It's {self.current_player}'s turn, not {move[2]}'s")
+            self.play(move[0], move[1])
         return self.get_state()
     
     def is_terminal(self):
@@ -0,0 +1,110 @@
+from game.board import zobrist_keys
+
+# The eight symmetries of a square board: four rotations, each optionally mirrored
+NUM_SYMMETRIES = 8
+
+# Index of the symmetry undoing each symmetry
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+def transform(row, col, size, symmetry):
+    """Map a cell through one of the board symmetries.
+    
+    Args:
+        row (int): Row index
+        col (int): Column index
+        size (int): Size of the board
+        symmetry (int): 0-3 rotate by that many quarter turns, 4-7 mirror
+            and then rotate
+        
+    Returns:
+        tuple: (row, col) of the mapped cell
+    """
+    last = size - 1
+    if symmetry == 0:
+        return row, col
+    if symmetry == 1:
+        return col, last - row
+    if symmetry == 2:
+        return last - row, last - col
+    if symmetry == 3:
+        return last - col, row
+    if symmetry == 4:
+        return row, last - col
+    if symmetry == 5:
+        return col, row
+    if symmetry == 6:
+        return last - row, col
+    return last - col, last - row
+
+def canonical_hash(stones, size):
+    """Get a hash shared by all symmetric variants of a position.
+    
+    Args:
+        stones (iterable): (row, col, player) tuples
+        size (int): Size of the board
+        
+    Returns:
+        tuple: (hash, symmetry), where symmetry maps the position to the
+            variant whose Zobrist hash is the smallest
+    """
+    keys = zobrist_keys(size)
+    hashes = [0] * NUM_SYMMETRIES
+    for row, col, player in stones:
+        player_keys = keys[player]
+        for symmetry in range(NUM_SYMMETRIES):
+            r, c = transform(row, col, size, symmetry)
+            hashes[symmetry] ^= player_keys[r * size + c]
+    best = min(range(NUM_SYMMETRIES), key=hashes.__getitem__)
+    return hashes[best], best
+
+def canonical_state_key(state_key, size):
+    """Get the smallest of the eight symmetric variants of a state key.
+    
+    Args:
+        state_key (str): State representation from Board.get_state_key
+        size (int): Size of the board
+        
+    Returns:
+        tuple: (canonical state key, symmetry mapping the state onto it)
+    """
+    rows = [state_key[i:i + size] for i in range(0, size * size, size)]
+    columns = [''.join(column) for column in zip(*rows)]
+    variants = [
+        ''.join(rows),                                           # identity
+        ''.join(column[::-1] for column in columns),             # quarter turn
+        state_key[::-1],                                         # half turn
+        ''.join(columns[::-1]),                                  # three quarter turns
+        ''.join(row[::-1] for row in rows),                      # mirror
+        ''.join(columns),                                        # transpose
+        ''.join(rows[::-1]),                                     # flip
+        ''.join(column[::-1] for column in columns[::-1])        # anti-transpose
+    ]
+    best = min(range(NUM_SYMMETRIES), key=variants.__getitem__)
+    return variants[best], best
+
+def relative_state_key(state_key, size):
+    """Get a key of the stones that does not depend on where they are on the board.
+    
+    The key is the bounding box of the stones, so translated positions and
+    the same shape on boards of different sizes share it. Distance to the
+    edges of the board is not part of the key.
+    
+    Args:
+        state_key (str): State representation from Board.get_state_key
+        size (int): Size of the board
+        
+    Returns:
+        tuple: (relative key, top, left), where (top, left) is the board cell
+            of the box's corner; subtract it from a cell to get the cell
+            relative to the box. The empty board's box is at the center.
+    """
+    rows = [state_key[i:i + size] for i in range(0, size * size, size)]
+    occupied = [i for i, row in enumerate(rows) if not row.isspace()]
+    if not occupied:
+        return '0,0:', size // 2, size // 2
+    
+    top, bottom = occupied[0], occupied[-1] + 1
+    left = min(len(rows[i]) - len(rows[i].lstrip()) for i in occupied)
+    right = max(len(rows[i].rstrip()) for i in occupied)
+    box = ''.join(row[left:right] for row in rows[top:bottom])
+    return f"{bottom - top},{right - left}:{box}", top, left
\ No newline at end of file
@@ -0,0 +1,429 @@
+import os
+import json
+import math
+import time
+import pickle
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from game.game import TicTacToe
+from agents.q_learning_agent import QLearningAgent
+from agents.linear_agent import LinearAgent
+from agents.random_agent import RandomAgent
+from agents.heuristic_agent import HeuristicAgent
+from agents.alpha_beta_agent import AlphaBetaAgent
+from agents.mcts_agent import MCTSAgent
+from agents.opening_book import OpeningBook, BookAgent
+from agents.q_table_tools import read_q_table
+
+# Agent kinds understood by parse_participant
+AGENT_KINDS = ('q', 'linear', 'random', 'heuristic', 'alphabeta', 'mcts')
+
+# Settings of the games played in the arena
+DEFAULT_SETTINGS = {
+    'board_size': 50,
+    'candidate_radius': 2,
+    'engine': 'board',
+    'max_plies': None,
+    'search_time': 0.1,
+    'opening_book': None
+}
+
+# Agents built in this worker process, keyed by (participant name, player symbol)
+_participants = {}
+_settings = {}
+_agents = {}
+_book = []
+
+def parse_participant(spec):
+    """Parse a participant given as 'name=kind:path', 'kind:path' or 'kind'.
+    
+    Args:
+        spec (str): Participant specification
+    
+    Returns:
+        dict: 'name', 'kind' and 'path' (None for agents without a model file)
+    """
+    name, _, rest = spec.rpartition('=')
+    kind, _, path = rest.partition(':')
+    if kind not in AGENT_KINDS:
+        raise ValueError(f"Unknown agent kind: {kind}")
+    if kind in ('q', 'linear') and not path:
+        raise ValueError(f"Agent kind {kind} needs a model file: {spec}")
+    return {'name': name or rest, 'kind': kind, 'path': path or None}
+
+def _checkpoint_sides(data):
+    """Get the sides a loaded Q-learning checkpoint has learned to play.
+    
+    A shared checkpoint holds both sides' positions. A per-agent checkpoint
+    only knows its own side: the other side's positions have a different
+    number of stones of each colour, so even with the marks swapped none of
+    its keys would match.
+    """
+    if data.get('normalized'):
+        return ('X', 'O')
+    return (data.get('player_symbol', 'X'),)
+
+def participant_sides(participant):
+    """Get the sides a participant can play.
+    
+    Args:
+        participant (dict): Result of parse_participant
+    
+    Returns:
+        tuple: 'X' and/or 'O'
+    """
+    if participant['kind'] != 'q':
+        return ('X', 'O')
+    with open(participant['path'], 'rb') as f:
+        return _checkpoint_sides(pickle.load(f))
+
+def _load_q_agent(path, player_symbol):
+    """Load a Q-learning checkpoint to play one side.
+    
+    Args:
+        path (str): Checkpoint saved by QLearningAgent.save or save_shared
+        player_symbol (str): Side the agent plays
+    
+    Returns:
+        QLearningAgent: Greedy agent
+    
+    Raises:
+        ValueError: If a per-agent checkpoint was trained on the other side,
+            or the checkpoint holds a shared-memory Q-table
+    """
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    
+    if 'backend' in data:
+        raise ValueError(f"{path} holds a shared-memory Q-table from --train_workers, which only resumes training")
+    if player_symbol not in _checkpoint_sides(data):
+        raise ValueError(f"{path} was trained as {data.get('player_symbol', 'X')} and cannot play {player_symbol}")
+    return QLearningAgent(player_symbol, epsilon_start=0.0, epsilon_end=0.0,
+                          q_table=read_q_table(data), normalize_perspective=data.get('normalized', False),
+                          symmetric=data.get('symmetric', False), relative=data.get('relative', False))
+
+def build_agent(participant, player_symbol, settings):
+    """Create a participant's agent for one side, playing greedily.
+    
+    Args:
+        participant (dict): Result of parse_participant
+        player_symbol (str): 'X' or 'O'
+        settings (dict): Arena settings
+    
+    Returns:
+        Agent: The agent, with epsilon 0
+    """
+    kind = participant['kind']
+    if kind == 'q':
+        agent = _load_q_agent(participant['path'], player_symbol)
+    elif kind == 'linear':
+        agent = LinearAgent(player_symbol)
+        agent.load(participant['path'])
+    elif kind == 'alphabeta':
+        agent = AlphaBetaAgent(player_symbol, time_limit=settings['search_time'])
+    elif kind == 'mcts':
+        agent = MCTSAgent(player_symbol, num_playouts=None, time_limit=settings['search_time'],
+                          selection='puct')
+    elif kind == 'heuristic':
+        agent = HeuristicAgent(player_symbol)
+    else:
+        agent = RandomAgent(player_symbol)
+    
+    agent.epsilon = 0.0
+    agent.epsilon_end = 0.0
+    return agent
+
+def _init_worker(participants, settings):
+    """Prepare a worker process to play arena games.
+    
+    Args:
+        participants (list): Participant dicts
+        settings (dict): Arena settings
+    """
+    _participants.clear()
+    _participants.update({participant['name']: participant for participant in participants})
+    _settings.clear()
+    _settings.update(settings)
+    _agents.clear()
+    _book.clear()
+    if settings.get('opening_book'):
+        _book.append(OpeningBook.load(settings['opening_book']))
+
+def _get_agent(name, player_symbol):
+    """Get a worker's cached agent, building it on first use."""
+    key = (name, player_symbol)
+    if key not in _agents:
+        agent = build_agent(_participants[name], player_symbol, _settings)
+        if _book and _book[0].board_size == _settings['board_size']:
+            agent = BookAgent(agent, _book[0])
+        _agents[key] = agent
+    return _agents[key]
+
+def play_game(job):
+    """Play one arena game in a worker process.
+    
+    Args:
+        job (tuple): (game index, name playing X, name playing O, seed)
+    
+    Returns:
+        dict: Game result with 'game', 'x', 'o', 'winner' ('X', 'O' or None),
+            'plies', 'seconds' and 'forfeit' (True if the loser played an
+            invalid move)
+    """
+    index, x_name, o_name, seed = job
+    random.seed(seed)
+    agents = {'X': _get_agent(x_name, 'X'), 'O': _get_agent(o_name, 'O')}
+    
+    game = TicTacToe(_settings['board_size'], candidate_radius=_settings['candidate_radius'],
+                     engine=_settings['engine'], max_plies=_settings['max_plies'])
+    start = time.perf_counter()
+    state = game.reset()
+    winner = None
+    forfeit = False
+    while not game.is_terminal():
+        player = state['current_player']
+        action = agents[player].choose_action(state)
+        try:
+            state = game.make_move(action[0], action[1])
+        except (ValueError, TypeError, IndexError):
+            # An invalid move loses the game instead of ending the tournament
+            winner = 'O' if player == 'X' else 'X'
+            forfeit = True
+            break
+    
+    return {
+        'game': index,
+        'x': x_name,
+        'o': o_name,
+        'winner': winner if forfeit else game.winner,
+        'plies': len(game.move_history),
+        'seconds': round(time.perf_counter() - start, 3),
+        'forfeit': forfeit
+    }
+
+def schedule(names, mode='round_robin', games_per_pair=10, seed=0, sides=None):
+    """List the games of a tournament, alternating colours within each pairing.
+    
+    A participant restricted to one side always plays it, and pairings in
+    which no assignment of colours is possible are left out.
+    
+    Args:
+        names (list): Participant names; in a gauntlet the first one plays all others
+        mode (str): 'round_robin' or 'gauntlet'
+        games_per_pair (int): Games per pairing
+        seed (int): Base random seed
+        sides (dict, optional): Sides each name can play (default: both)
+    
+    Returns:
+        list: (game index, name playing X, name playing O, seed) tuples
+    """
+    sides = sides or {}
+    
+    def allowed(x_name, o_name):
+        return 'X' in sides.get(x_name, 'XO') and 'O' in sides.get(o_name, 'XO')
+    
+    if mode == 'gauntlet':
+        pairs = [(names[0], other) for other in names[1:]]
+    else:
+        pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    
+    jobs = []
+    for a, b in pairs:
+        colourings = [(x_name, o_name) for x_name, o_name in ((a, b), (b, a)) if allowed(x_name, o_name)]
+        if not colourings:
+            continue
+        for k in range(games_per_pair):
+            x_name, o_name = colourings[k % len(colourings)]
+            jobs.append((len(jobs), x_name, o_name, seed * 1000003 + len(jobs)))
+    return jobs
+
+def run_tournament(participants, mode='round_robin', games_per_pair=10, workers=None,
+                   out=None, settings=None, seed=0):
+    """Play a tournament across a process pool.
+    
+    Args:
+        participants (list): Participant dicts from parse_participant
+        mode (str): 'round_robin' or 'gauntlet'
+        games_per_pair (int): Games per pairing
+        workers (int, optional): Number of worker processes (default: CPU
+            count, 0 plays in this process)
+        out (str, optional): JSON lines file every result is appended to as
+            soon as its game finishes
+        settings (dict, optional): Overrides of DEFAULT_SETTINGS
+        seed (int): Base random seed
+    
+    Returns:
+        list: Game results
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    names = [participant['name'] for participant in participants]
+    if len(set(names)) != len(names):
+        raise ValueError("Participant names must be unique")
+    sides = {participant['name']: participant_sides(participant) for participant in participants}
+    jobs = schedule(names, mode, games_per_pair, seed, sides)
+    
+    results = []
+    log = open(out, 'a') if out else None
+    pool = None
+    try:
+        if workers == 0:
+            _init_worker(participants, settings)
+            finished = map(play_game, jobs)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(participants, settings))
+            finished = pool.map(play_game, jobs, chunksize=max(1, len(jobs) // (64 * (workers or 8))))
+        
+        for result in finished:
+            results.append(result)
+            if log:
+                log.write(json.dumps(dict(result, type='game')) + '\n')
+                log.flush()
+    finally:
+        # Also on errors and interrupts, so no worker processes are left behind
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if log:
+            log.close()
+    return results
+
+def _fit_ratings(names, results, prior_draws):
+    """Fit Bradley-Terry strengths by minorization-maximization.
+    
+    Every pairing that was played gets prior_draws virtual draws, which keeps
+    ratings finite when one side wins every game (as in BayesElo).
+    
+    Args:
+        names (list): Participant names
+        results (list): Game results
+        prior_draws (float): Virtual draws per pairing
+    
+    Returns:
+        dict: Elo rating per name, with mean 0
+    """
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    games = [[0.0] * n for _ in range(n)]
+    score = [0.0] * n
+    for result in results:
+        i, j = index[result['x']], index[result['o']]
+        games[i][j] += 1
+        games[j][i] += 1
+        if result['winner'] == 'X':
+            score[i] += 1
+        elif result['winner'] == 'O':
+            score[j] += 1
+        else:
+            score[i] += 0.5
+            score[j] += 0.5
+    
+    for i in range(n):
+        for j in range(i + 1, n):
+            if games[i][j]:
+                games[i][j] += prior_draws
+                games[j][i] += prior_draws
+                score[i] += prior_draws / 2
+                score[j] += prior_draws / 2
+    
+    strength = [1.0] * n
+    for _ in range(1000):
+        new = []
+        for i in range(n):
+            denominator = sum(games[i][j] / (strength[i] + strength[j]) for j in range(n) if games[i][j])
+            new.append(max(score[i], 1e-9) / denominator if denominator else strength[i])
+        mean_log = sum(math.log(s) for s in new) / n
+        new = [s / math.exp(mean_log) for s in new]
+        converged = max(abs(a - b) for a, b in zip(new, strength)) < 1e-9
+        strength = new
+        if converged:
+            break
+    
+    return {name: 400 * math.log10(strength[index[name]]) for name in names}
+
+def elo_ratings(names, results, prior_draws=2.0, bootstrap=200, confidence=0.95, seed=0):
+    """Compute Elo ratings with bootstrap confidence intervals.
+    
+    Args:
+        names (list): Participant names
+        results (list): Game results
+        prior_draws (float): Virtual draws per pairing
+        bootstrap (int): Number of bootstrap resamples of the games
+        confidence (float): Width of the confidence interval
+        seed (int): Random seed of the resampling
+    
+    Returns:
+        dict: Maps every name to (rating, lower bound, upper bound)
+    """
+    ratings = _fit_ratings(names, results, prior_draws)
+    if not results or bootstrap <= 0:
+        return {name: (ratings[name], ratings[name], ratings[name]) for name in names}
+    
+    rng = random.Random(seed)
+    samples = {name: [] for name in names}
+    for _ in range(bootstrap):
+        resampled = [results[rng.randrange(len(results))] for _ in results]
+        for name, rating in _fit_ratings(names, resampled, prior_draws).items():
+            samples[name].append(rating)
+    
+    tail = (1 - confidence) / 2
+    intervals = {}
+    for name in names:
+        values = sorted(samples[name])
+        low = values[int(tail * (len(values) - 1))]
+        high = values[int(math.ceil((1 - tail) * (len(values) - 1)))]
+        intervals[name] = (ratings[name], low, high)
+    return intervals
+
+def main():
+    parser = argparse.ArgumentParser(description='Play a tournament between agents and rate them')
+    parser.add_argument('participants', nargs='+',
+                        help="Agents as 'name=kind:path', e.g. x=q:data/models/agent_x.pkl or rnd=random "
+                             f"(kinds: {', '.join(AGENT_KINDS)})")
+    parser.add_argument('--mode', choices=['round_robin', 'gauntlet'], default='round_robin',
+                        help='All pairings, or the first agent against each of the others')
+    parser.add_argument('--games', type=int, default=10, help='Games per pairing')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--out', default='data/stats/arena.jsonl', help='JSON lines file for the results')
+    parser.add_argument('--board_size', type=int, default=DEFAULT_SETTINGS['board_size'])
+    parser.add_argument('--candidate_radius', type=int, default=DEFAULT_SETTINGS['candidate_radius'])
+    parser.add_argument('--max_plies', type=int, default=None, help='Stop games after this many moves')
+    parser.add_argument('--search_time', type=float, default=DEFAULT_SETTINGS['search_time'],
+                        help='Time budget per move for search agents (seconds)')
+    parser.add_argument('--opening_book', default='data/models/opening_book.bin',
+                        help='Opening book all agents play from, if the file exists')
+    parser.add_argument('--no_book', action='store_true', help='Do not use an opening book')
+    parser.add_argument('--seed', type=int, default=0, help='Base random seed')
+    args = parser.parse_args()
+    
+    participants = [parse_participant(spec) for spec in args.participants]
+    settings = {
+        'board_size': args.board_size,
+        'candidate_radius': args.candidate_radius,
+        'max_plies': args.max_plies,
+        'search_time': args.search_time,
+        'opening_book': None if args.no_book or not os.path.exists(args.opening_book) else args.opening_book
+    }
+    
+    start = time.perf_counter()
+    results = run_tournament(participants, args.mode, args.games, args.workers, args.out, settings, args.seed)
+    names = [participant['name'] for participant in participants]
+    ratings = elo_ratings(names, results)
+    
+    with open(args.out, 'a') as f:
+        f.write(json.dumps({
+            'type': 'ratings',
+            'ratings': {name: {'elo': round(r, 1), 'low': round(lo, 1), 'high': round(hi, 1)}
+                        for name, (r, lo, hi) in ratings.items()}
+        }) + '\n')
+    
+    print(f"{len(results)} games in {time.perf_counter() - start:.1f}s")
+    for name, (rating, low, high) in sorted(ratings.items(), key=lambda item: -item[1][0]):
+        record = [r for r in results if name in (r['x'], r['o'])]
+        wins = sum(1 for r in record if (r['winner'] == 'X' and r['x'] == name) or (r['winner'] == 'O' and r['o'] == name))
+        draws = sum(1 for r in record if r['winner'] is None)
+        print(f"{name:>20}  {rating:7.1f}  [{low:7.1f}, {high:7.1f}]  "
+              f"+{wins} ={draws} -{len(record) - wins - draws}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
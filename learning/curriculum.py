@@ -0,0 +1,98 @@
+class Curriculum:
+    """Promotion rule for training on a sequence of growing boards.
+    
+    A stage ends once its agents have played at least min_episodes and
+    either the win rate has settled (it moved by at most tolerance over the
+    last patience block summaries) or the Q-tables have stopped growing
+    quickly (fewer than max_growth new states per episode). A stage never
+    runs longer than max_episodes.
+    
+    Values only carry over between board sizes if the agents' keys do not
+    depend on the board, i.e. linear agents or Q-learning agents with
+    relative state keys.
+    """
+    
+    def __init__(self, sizes=(9, 15, 25), min_episodes=1000, max_episodes=20000,
+                 patience=5, tolerance=0.05, max_growth=None):
+        """Initialize the curriculum.
+        
+        Args:
+            sizes (tuple): Board sizes of the stages before the final board
+            min_episodes (int): Episodes played on every board before promotion
+            max_episodes (int): Episodes after which a stage ends regardless
+            patience (int): Number of block summaries the win rate must be stable for
+            tolerance (float): Largest change of the win rate counted as stable
+            max_growth (float, optional): New Q-table states per episode below
+                which a stage has converged; not checked if not given
+        """
+        self.sizes = tuple(sizes)
+        self.min_episodes = min_episodes
+        self.max_episodes = max_episodes
+        self.patience = patience
+        self.tolerance = tolerance
+        self.max_growth = max_growth
+        self.start_stage(0)
+    
+    def start_stage(self, episode):
+        """Begin a new stage.
+        
+        Args:
+            episode (int): Number of episodes played before the stage
+        """
+        self.stage_start = episode
+        self.history = []
+        self.reason = None
+    
+    def should_promote(self, block):
+        """Decide after a block summary whether to move to the next board.
+        
+        Args:
+            block (dict): Block summary from the stats store
+        
+        Returns:
+            bool: True to end the stage
+        """
+        self.history.append((block['episode'], block['x_wins'] / max(1, block['games']), block.get('q_states')))
+        self.history = self.history[-(self.patience + 1):]
+        
+        played = block['episode'] - self.stage_start
+        if played >= self.max_episodes:
+            self.reason = 'episode budget reached'
+            return True
+        if played < self.min_episodes or len(self.history) <= self.patience:
+            return False
+        
+        rates = [rate for _, rate, _ in self.history]
+        if max(rates) - min(rates) <= self.tolerance:
+            self.reason = 'win rate settled'
+            return True
+        
+        (first_episode, _, first_states), (last_episode, _, last_states) = self.history[0], self.history[-1]
+        if self.max_growth is not None and first_states is not None and last_states is not None:
+            growth = (last_states - first_states) / (last_episode - first_episode)
+            if growth < self.max_growth:
+                self.reason = 'Q-table converged'
+                return True
+        return False
+
+def train_curriculum(trainer, curriculum, make_game, final_size, final_episodes, display_interval=100):
+    """Train on each board of a curriculum in turn, then on the final board.
+    
+    Args:
+        trainer (Trainer): Trainer whose agents are trained
+        curriculum (Curriculum): Board sizes and promotion rule
+        make_game (callable): Creates a TicTacToe instance for a board size
+        final_size (int): Size of the final board
+        final_episodes (int): Number of episodes on the final board
+        display_interval (int): Interval for visualization and stats
+    """
+    for size in curriculum.sizes:
+        print(f"Curriculum stage: {size}x{size} board")
+        trainer.set_game(make_game(size))
+        curriculum.start_stage(trainer.episodes_done)
+        played = trainer.train(curriculum.max_episodes, display_interval, stop=curriculum.should_promote)
+        print(f"Promoted after {played} episodes on {size}x{size} ({curriculum.reason or 'stopped'})")
+    
+    print(f"Curriculum stage: {final_size}x{final_size} board")
+    trainer.set_game(make_game(final_size))
+    trainer.train(final_episodes, display_interval)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import numpy as np
+
 class Environment:
     """Reinforcement learning environment for tic-tac-toe."""
     
@@ -17,6 +19,14 @@ class Environment:
         """
         return self.game.reset()
     
+    def valid_actions(self):
+        """Get the current action space.
+        
+        Returns:
+            list: (row, col) positions; candidate moves only if the game restricts them
+        """
+        return self.game.get_valid_moves()
+    
     def step(self, action, player):
         """Take an action in the environment.
         
@@ -47,4 +57,127 @@ class Environment:
         # Calculate reward
         reward = self.game.get_reward(player)
         
-        return next_state, reward, done
\ No newline at end of file
+        return next_state, reward, done
+
+class ArrayEnvironment:
+    """Gym-style environment with NumPy observations and flat integer actions.
+    
+    Both players act through the same environment, alternately. An action
+    is the cell index row * size + col. Observations are three planes from
+    the point of view of the player to move: own stones, opponent stones and
+    a plane of ones if X is to move (zeros for O). Observations and the
+    action mask are views into buffers allocated once and updated in place
+    with each move, so a step allocates no arrays; copy them to keep them
+    past the next step.
+    """
+    
+    def __init__(self, game, dtype=np.float32):
+        """Initialize the environment.
+        
+        Args:
+            game (TicTacToe): The game instance
+            dtype (numpy.dtype): Element type of the observation planes
+        """
+        self.game = game
+        self.dtype = dtype
+        self.size = None
+        self.info = {'player': None, 'winner': None, 'is_draw': False}
+    
+    def _allocate(self, size):
+        """Allocate the buffers for a board size.
+        
+        Args:
+            size (int): Size of the board
+        """
+        self.size = size
+        self.num_actions = size * size
+        
+        # Planes: zeros, X stones, O stones, ones. X to move sees planes 1-3,
+        # O to move sees planes 2, 1, 0 (a reversed view, not a copy).
+        self.planes = np.zeros((4, size, size), dtype=self.dtype)
+        self.planes[3] = 1
+        self.observations = {'X': self.planes[1:4], 'O': self.planes[2::-1]}
+        
+        self.action_mask = np.zeros(self.num_actions, dtype=bool)
+        self._mask = self.action_mask.reshape(size, size)
+        self._empty = np.ones((size, size), dtype=bool)
+        self._near = np.zeros((size, size), dtype=bool)
+    
+    def observation(self):
+        """Get the observation of the player to move.
+        
+        Returns:
+            numpy.ndarray: View of shape (3, size, size) into the plane buffer
+        """
+        return self.observations[self.game.current_player]
+    
+    def reset(self, seed=None):
+        """Reset the environment.
+        
+        Args:
+            seed (int, optional): Ignored; the game itself is deterministic
+            
+        Returns:
+            tuple: (observation, info)
+        """
+        self.game.reset()
+        size = self.game.board.size
+        if size != self.size:
+            self._allocate(size)
+        
+        self.planes[1:3] = 0
+        self._empty.fill(True)
+        self._near.fill(False)
+        if self.game.restrict_to_candidates:
+            self._mask.fill(False)
+            self._mask[size // 2, size // 2] = True
+        else:
+            self._mask.fill(True)
+        
+        self.info.update(player=None, winner=None, is_draw=False)
+        return self.observation(), self.info
+    
+    def step(self, action):
+        """Play a move for the player to move.
+        
+        Args:
+            action (int): Cell index row * size + col
+            
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info). The reward
+                is the moving player's; an action outside the mask leaves the
+                game unchanged and is rewarded -1. Games stopped by max_plies
+                are adjudicated, so truncated is always False.
+                
+        Raises:
+            ValueError: If the game is already over
+        """
+        game = self.game
+        if game.is_terminal():
+            raise ValueError("Game is already over")
+        
+        player = game.current_player
+        self.info['player'] = player
+        action = int(action)
+        if not 0 <= action < self.num_actions or not self.action_mask[action]:
+            return self.observation(), -1.0, False, False, self.info
+        
+        row, col = divmod(action, self.size)
+        game.play(row, col)
+        self.planes[1 if player == 'X' else 2, row, col] = 1
+        self._empty[row, col] = False
+        
+        terminated = game.is_terminal()
+        if terminated:
+            self.action_mask.fill(False)
+            self.info.update(winner=game.winner, is_draw=game.is_draw)
+        elif game.restrict_to_candidates:
+            radius = game.board.candidate_radius
+            self._near[max(0, row - radius):row + radius + 1, max(0, col - radius):col + radius + 1] = True
+            np.logical_and(self._near, self._empty, out=self._mask)
+            if not self.action_mask.any():
+                np.copyto(self._mask, self._empty)
+        else:
+            self._mask[row, col] = False
+        
+        return self.observation(), game.get_reward(player), terminated, False, self.info
\ No newline at end of file
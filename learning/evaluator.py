@@ -0,0 +1,313 @@
+import time
+import random
+import multiprocessing
+from game.game import TicTacToe
+from agents.q_learning_agent import QLearningAgent
+from agents.linear_agent import LinearAgent
+from agents.random_agent import RandomAgent
+from agents.heuristic_agent import HeuristicAgent
+
+# Evaluation suites, in the order they are reported
+SUITES = ('vs_random', 'vs_heuristic', 'benchmark')
+
+# Tactical positions as (name, own stones, opponent stones, correct moves),
+# in cells relative to the board center. The evaluated agent is to move.
+BENCHMARKS = (
+    ('win_row',
+     ((0, -2), (0, -1), (0, 0), (0, 1)),
+     ((0, -3), (1, 0), (-1, 1), (2, 2)),
+     ((0, 2),)),
+    ('win_diagonal',
+     ((-2, -2), (-1, -1), (0, 0), (1, 1)),
+     ((2, 2), (-2, 1), (1, -2), (3, 0)),
+     ((-3, -3),)),
+    ('block_four',
+     ((0, -3), (2, -2), (-2, 2), (3, 3)),
+     ((0, -2), (0, -1), (0, 0), (0, 1)),
+     ((0, 2),)),
+    ('block_open_three',
+     ((2, -2), (-2, 2), (3, 3)),
+     ((0, -1), (0, 0), (0, 1)),
+     ((0, -2), (0, 2))),
+    ('make_open_four',
+     ((0, -1), (0, 0), (0, 1)),
+     ((2, -2), (-2, 2), (3, 3)),
+     ((0, -2), (0, 2))),
+    ('win_before_blocking',
+     ((0, -2), (0, -1), (0, 0), (0, 1), (-3, 3)),
+     ((0, -3), (-2, 3), (-1, 3), (0, 3), (1, 3)),
+     ((0, 2),))
+)
+
+# Opponent stone added when the agent plays O, so that X has one stone more
+FILLER = (4, -4)
+
+def benchmark_moves(own, opponent, player, size):
+    """Get the moves setting up a benchmark position for one side.
+    
+    Args:
+        own (tuple): Stones of the side to move, relative to the center
+        opponent (tuple): Opponent stones, relative to the center
+        player (str): Side to move, 'X' or 'O'
+        size (int): Size of the board
+    
+    Returns:
+        list: (row, col) moves in playing order, X first
+    """
+    center = size // 2
+    own = [(center + row, center + col) for row, col in own]
+    opponent = [(center + row, center + col) for row, col in opponent]
+    if player == 'O':
+        opponent.append((center + FILLER[0], center + FILLER[1]))
+        x_stones, o_stones = opponent, own
+    else:
+        x_stones, o_stones = own, opponent
+    
+    moves = []
+    for i, move in enumerate(x_stones):
+        moves.append(move)
+        if i < len(o_stones):
+            moves.append(o_stones[i])
+    return moves
+
+def _make_game(settings):
+    """Create an evaluation game; the heuristic opponent needs the list-based board."""
+    return TicTacToe(settings['board_size'], candidate_radius=settings['candidate_radius'],
+                     engine='board', max_plies=settings['max_plies'],
+                     adjudication=settings['adjudication'])
+
+def play_match(agent, opponent, settings, games):
+    """Play games between an agent and an opponent taking the other side.
+    
+    Args:
+        agent (Agent): Evaluated agent, playing its own side
+        opponent (Agent): Opponent agent
+        settings (dict): Game settings, see Evaluator.settings
+        games (int): Number of games
+    
+    Returns:
+        float: Agent's score, wins plus half the draws over the games; an
+            invalid move loses the game for the side playing it
+    """
+    game = _make_game(settings)
+    agents = {agent.player_symbol: agent, opponent.player_symbol: opponent}
+    score = 0.0
+    for _ in range(games):
+        state = game.reset()
+        forfeit = None
+        while not game.is_terminal():
+            player = state['current_player']
+            action = agents[player].choose_action(state)
+            try:
+                state = game.make_move(action[0], action[1])
+            except (ValueError, TypeError, IndexError):
+                forfeit = player
+                break
+        winner = game.winner if forfeit is None else ('O' if forfeit == 'X' else 'X')
+        if winner == agent.player_symbol:
+            score += 1.0
+        elif winner is None:
+            score += 0.5
+    return score / games
+
+def solve_benchmarks(agent, settings):
+    """Count the benchmark positions in which an agent finds a correct move.
+    
+    Args:
+        agent (Agent): Evaluated agent
+        settings (dict): Game settings, see Evaluator.settings
+    
+    Returns:
+        float: Fraction of positions solved
+    """
+    game = _make_game(settings)
+    size = settings['board_size']
+    solved = 0
+    for _, own, opponent, answers in BENCHMARKS:
+        game.reset()
+        state = game.apply_moves(benchmark_moves(own, opponent, agent.player_symbol, size))
+        center = size // 2
+        if tuple(agent.choose_action(state)) in {(center + row, center + col) for row, col in answers}:
+            solved += 1
+    return solved / len(BENCHMARKS)
+
+def evaluate_agents(agents, settings, games=20, seed=0):
+    """Run every evaluation suite for each agent, playing greedily.
+    
+    Agents are changed (their exploration is switched off), so pass copies.
+    
+    Args:
+        agents (dict): Agents to evaluate, keyed by the side they play
+        settings (dict): Game settings, see Evaluator.settings
+        games (int): Games per match
+        seed (int): Random seed, the same for every evaluation so that their
+            scores are comparable
+    
+    Returns:
+        dict: {side: {suite: score}} with scores between 0 and 1
+    """
+    scores = {}
+    for symbol, agent in agents.items():
+        random.seed(seed)
+        agent.epsilon = 0.0
+        opponent_symbol = 'O' if symbol == 'X' else 'X'
+        scores[symbol] = {
+            'vs_random': play_match(agent, RandomAgent(opponent_symbol), settings, games),
+            'vs_heuristic': play_match(agent, HeuristicAgent(opponent_symbol), settings, games),
+            'benchmark': solve_benchmarks(agent, settings)
+        }
+    return scores
+
+def _evaluation_process(connection, episode, agents, settings, games, seed):
+    """Evaluate agents in a child process and send the result, or the error, back."""
+    start = time.perf_counter()
+    try:
+        scores = evaluate_agents(agents, settings, games, seed)
+        connection.send({'episode': episode, 'scores': scores, 'seconds': time.perf_counter() - start})
+    except Exception as e:
+        connection.send({'episode': episode, 'error': f"{type(e).__name__}: {e}",
+                         'seconds': time.perf_counter() - start})
+    connection.close()
+
+class Evaluator:
+    """Evaluation of the learning agents in a background process.
+    
+    Every `interval` episodes the Trainer submits its agents. A child process
+    plays the evaluation suites with a read-only copy of them while training
+    goes on: games against a random and a heuristic agent, and the benchmark
+    positions. Where processes are forked the copy is made by the operating
+    system, page by page as the parent changes its tables; elsewhere the
+    agents are pickled. One evaluation runs at a time, and a submission
+    while one is running is skipped.
+    
+    Training has plateaued when the mean score has not improved by more
+    than min_delta for `patience` evaluations in a row.
+    """
+    
+    def __init__(self, interval=1000, games=20, patience=None, min_delta=0.01, seed=0):
+        """Initialize the evaluator.
+        
+        Args:
+            interval (int): Episodes between evaluations
+            games (int): Games per match
+            patience (int, optional): Evaluations without improvement after
+                which training has plateaued; never if not given
+            min_delta (float): Smallest increase of the mean score counted as improvement
+            seed (int): Random seed of the evaluation games
+        """
+        self.interval = interval
+        self.games = games
+        self.patience = patience
+        self.min_delta = min_delta
+        self.seed = seed
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self.process = None
+        self.connection = None
+        self.episode = None
+        self.skipped = 0
+        self.best = None
+        self.stale = 0
+        self.plateaued = False
+    
+    @staticmethod
+    def settings(game):
+        """Get the settings of evaluation games like those of a training game.
+        
+        Args:
+            game (TicTacToe): Training game
+        
+        Returns:
+            dict: 'board_size', 'candidate_radius', 'max_plies' and 'adjudication'
+        """
+        return {
+            'board_size': game.board.size,
+            'candidate_radius': game.board.candidate_radius if game.restrict_to_candidates else None,
+            'max_plies': game.max_plies,
+            'adjudication': game.adjudication
+        }
+    
+    def submit(self, episode, agents, game):
+        """Start evaluating the agents unless an evaluation is running.
+        
+        Only agents that learn a table or weights are evaluated; search
+        agents would make evaluations slow and do not change.
+        
+        Args:
+            episode (int): Episode number the evaluation is for
+            agents (dict): Agents keyed by the side they play
+            game (TicTacToe): Training game, whose settings the evaluation uses
+        
+        Returns:
+            bool: True if an evaluation was started
+        """
+        if self.process is not None:
+            self.skipped += 1
+            return False
+        agents = {symbol: agent for symbol, agent in agents.items()
+                  if isinstance(agent, (QLearningAgent, LinearAgent))}
+        if not agents:
+            return False
+        
+        receiver, sender = self.context.Pipe(duplex=False)
+        self.process = self.context.Process(
+            target=_evaluation_process,
+            args=(sender, episode, agents, self.settings(game), self.games, self.seed),
+            daemon=True)
+        self.process.start()
+        sender.close()
+        self.connection = receiver
+        self.episode = episode
+        return True
+    
+    def poll(self, wait=False):
+        """Collect the result of the running evaluation if it has finished.
+        
+        Args:
+            wait (bool): Wait for the evaluation to finish
+        
+        Returns:
+            dict: 'episode', 'scores' ({side: {suite: score}}), 'score' (mean
+                of all scores) and 'seconds'; 'episode' and 'error' if the
+                evaluation failed; None if no evaluation has finished
+        """
+        if self.process is None or not (wait or self.connection.poll()):
+            return None
+        try:
+            result = self.connection.recv()
+        except EOFError:
+            result = None  # The process died without a result
+        self.process.join()
+        if result is None:
+            result = {'episode': self.episode,
+                      'error': f"evaluation process exited with code {self.process.exitcode}"}
+        self.connection.close()
+        self.process = self.connection = None
+        if 'error' not in result:
+            values = [score for scores in result['scores'].values() for score in scores.values()]
+            result['score'] = sum(values) / len(values)
+            self._update_plateau(result['score'])
+        return result
+    
+    def reset(self):
+        """Forget the best score, e.g. when training moves to another board."""
+        self.best = None
+        self.stale = 0
+        self.plateaued = False
+    
+    def _update_plateau(self, score):
+        """Track the best mean score and the evaluations since it improved."""
+        if self.best is None or score > self.best + self.min_delta:
+            self.best = score
+            self.stale = 0
+        else:
+            self.stale += 1
+        self.plateaued = self.patience is not None and self.stale >= self.patience
+    
+    def close(self):
+        """Stop a running evaluation."""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.connection.close()
+            self.process = self.connection = None
\ No newline at end of file
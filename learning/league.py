@@ -0,0 +1,109 @@
+import random
+import numpy as np
+from agents.q_learning_agent import QLearningAgent
+from agents.linear_agent import LinearAgent
+from agents.frozen_q_agent import SnapshotChain, FrozenQAgent
+
+class League:
+    """Pool of frozen past versions of the learning agents to train against.
+    
+    Every snapshot_interval episodes each learning agent is frozen into its
+    side's pool. Q-learning agents are frozen as copy-on-write snapshots of
+    their table (see agents.frozen_q_agent), so dozens of them cost memory in
+    proportion to the states changed since, not to the table size. Linear
+    agents are frozen as a copy of their weights. In an episode with a
+    frozen opponent only the live agent learns.
+    """
+    
+    def __init__(self, pool_size=20, snapshot_interval=1000, opponent_rate=0.5, seed=None):
+        """Initialize an empty league.
+        
+        Args:
+            pool_size (int): Frozen agents kept per side; the oldest is dropped
+            snapshot_interval (int): Episodes between snapshots
+            opponent_rate (float): Probability that an episode pits one live
+                agent against a frozen one
+            seed (int, optional): Random seed for opponent sampling
+        """
+        self.pool_size = pool_size
+        self.snapshot_interval = snapshot_interval
+        self.opponent_rate = opponent_rate
+        self.random = random.Random(seed)
+        self.pools = {'X': [], 'O': []}
+        self.chains = {}
+    
+    def _chain(self, agent):
+        """Get the snapshot chain of a Q-learning agent's table, creating it on first use.
+        
+        Agents sharing a Q-table share its chain.
+        """
+        if agent.backend is not None:
+            raise ValueError("Q-tables with a shared-memory backend cannot be snapshotted")
+        key = id(agent.q_table)
+        if key not in self.chains:
+            self.chains[key] = SnapshotChain(agent.q_table)
+        agent.snapshots = self.chains[key]
+        return self.chains[key]
+    
+    def freeze(self, agent):
+        """Make a frozen copy of an agent's current policy.
+        
+        Args:
+            agent (Agent): Learning agent
+        
+        Returns:
+            Agent: Frozen agent, or None if the agent does not learn from a
+                table or weights
+        """
+        if isinstance(agent, QLearningAgent):
+            return FrozenQAgent(self._chain(agent).snapshot(), agent)
+        if isinstance(agent, LinearAgent):
+            frozen = LinearAgent(agent.player_symbol, learning_rate=0.0, epsilon_start=0.0, epsilon_end=0.0)
+            frozen.weights = np.array(agent.weights)
+            return frozen
+        return None
+    
+    def snapshot(self, agents):
+        """Add frozen copies of the learning agents to their sides' pools.
+        
+        Args:
+            agents (list): Live agents
+        """
+        for agent in agents:
+            frozen = self.freeze(agent)
+            if frozen is None:
+                continue
+            pool = self.pools[agent.player_symbol]
+            pool.append(frozen)
+            if len(pool) > self.pool_size:
+                dropped = pool.pop(0)
+                if isinstance(dropped, FrozenQAgent):
+                    dropped.snapshot.release()
+    
+    def pairing(self, agent_x, agent_o):
+        """Choose the agents playing an episode.
+        
+        Args:
+            agent_x (Agent): Live agent playing X
+            agent_o (Agent): Live agent playing O
+        
+        Returns:
+            tuple: (agent playing X, agent playing O)
+        """
+        if self.random.random() >= self.opponent_rate:
+            return agent_x, agent_o
+        sides = [side for side in ('X', 'O') if self.pools[side]]
+        if not sides:
+            return agent_x, agent_o
+        side = self.random.choice(sides)
+        opponent = self.random.choice(self.pools[side])
+        return (opponent, agent_o) if side == 'X' else (agent_x, opponent)
+    
+    def preimage_count(self):
+        """Get the number of state pre-images held by all snapshots.
+        
+        Returns:
+            int: Total count, a measure of the league's memory use
+        """
+        return sum(len(frozen.snapshot) for pool in self.pools.values()
+                   for frozen in pool if isinstance(frozen, FrozenQAgent))
\ No newline at end of file
@@ -0,0 +1,74 @@
+import random
+import multiprocessing
+from learning.trainer import Trainer
+from learning.stats_store import StatsStore
+
+def _self_play_worker(job):
+    """Process pool entry point: self-play episodes on the shared Q-table.
+    
+    The agents arrive pickled; their SharedQTable backend attaches to the
+    parent's shared memory, so every update lands in the one table.
+    """
+    agent_x, agent_o, game, episodes, seed = job
+    random.seed(seed)
+    
+    # One block summary covering all of the worker's episodes
+    stats_store = StatsStore(interval=episodes, window=episodes)
+    trainer = Trainer(game, agent_x, agent_o, stats_store=stats_store)
+    trainer.train(episodes, display_interval=episodes + 1)
+    result = {
+        'episodes': episodes,
+        'outcomes': stats_store.rolling(),
+        'epsilon': {'X': agent_x.epsilon, 'O': agent_o.epsilon}
+    }
+    stats_store.close()
+    agent_x.backend.close()
+    agent_o.backend.close()
+    return result
+
+def train_parallel(agent_x, agent_o, game, episodes, workers, seed=0):
+    """Train two Q-learning agents by self-play in several processes at once.
+    
+    Both agents must store their values in the same SharedQTable (their
+    `backend`). Each worker plays an equal share of the episodes with its own
+    copy of the agents and the game, and all of them read and update the
+    shared table directly, without locks. Afterwards the agents' exploration
+    rates are the mean of the workers' and their episode counts grow by the
+    episodes played.
+    
+    Args:
+        agent_x (QLearningAgent): Agent playing X, with a SharedQTable backend
+        agent_o (QLearningAgent): Agent playing O, with the same backend
+        game (TicTacToe): Game each worker plays a copy of
+        episodes (int): Total number of episodes
+        workers (int): Number of worker processes
+        seed (int): Base random seed of the workers
+    
+    Returns:
+        dict: 'games', 'x_wins', 'o_wins', 'draws' and 'game_lengths' (mean
+            plies) over all workers
+    """
+    if agent_x.backend is None or agent_x.backend is not agent_o.backend:
+        raise ValueError("Parallel training needs both agents on one SharedQTable backend")
+    
+    shares = [episodes // workers + (1 if i < episodes % workers else 0) for i in range(workers)]
+    jobs = [(agent_x, agent_o, game, share, seed * 1000003 + i) for i, share in enumerate(shares) if share]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    with context.Pool(len(jobs)) as pool:
+        results = pool.map(_self_play_worker, jobs)
+    
+    played = sum(result['episodes'] for result in results)
+    for agent in (agent_x, agent_o):
+        agent.epsilon = sum(result['epsilon'][agent.player_symbol] for result in results) / len(results)
+        agent.episode_count += played
+    
+    totals = {'games': 0, 'x_wins': 0, 'o_wins': 0, 'draws': 0}
+    plies = 0.0
+    for result in results:
+        outcomes = result['outcomes']
+        for key in totals:
+            totals[key] += outcomes[key]
+        plies += outcomes['game_lengths'] * outcomes['games']
+    totals['game_lengths'] = plies / totals['games'] if totals['games'] else 0.0
+    return totals
\ No newline at end of file
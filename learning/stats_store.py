@@ -0,0 +1,252 @@
+import time
+import sqlite3
+from collections import deque
+
+class RollingWindow:
+    """Outcome counts and mean game length over the last episodes.
+    
+    Sums are updated as episodes enter and leave the window, so each
+    episode costs O(1) whatever the window size.
+    """
+    
+    def __init__(self, size=100):
+        """Initialize an empty window.
+        
+        Args:
+            size (int): Number of episodes covered
+        """
+        self.size = size
+        self.episodes = deque()
+        self.counts = {'X': 0, 'O': 0, None: 0}
+        self.total_plies = 0
+    
+    def add(self, winner, plies):
+        """Add an episode, dropping the oldest one if the window is full.
+        
+        Args:
+            winner (str): 'X', 'O' or None for a draw
+            plies (int): Length of the game
+        """
+        self.episodes.append((winner, plies))
+        self.counts[winner] += 1
+        self.total_plies += plies
+        if len(self.episodes) > self.size:
+            old_winner, old_plies = self.episodes.popleft()
+            self.counts[old_winner] -= 1
+            self.total_plies -= old_plies
+    
+    def summary(self):
+        """Get the window's aggregates.
+        
+        Returns:
+            dict: 'games', 'x_wins', 'o_wins', 'draws' and 'game_lengths'
+                (mean plies)
+        """
+        games = len(self.episodes)
+        return {
+            'games': games,
+            'x_wins': self.counts['X'],
+            'o_wins': self.counts['O'],
+            'draws': self.counts[None],
+            'game_lengths': self.total_plies / games if games else 0.0
+        }
+
+class StatsStore:
+    """Training statistics streamed to an SQLite database.
+    
+    Every episode is one row of the episodes table. Rows are buffered and
+    committed in batches, so a crash loses at most one batch. Each block of
+    `interval` episodes is also summarized into a row of the blocks table,
+    which is what the stats display and the CSV export show. Results of the
+    background evaluations go to the evaluations table, one row per agent and
+    suite, and other measurements such as Q-table sizes to the metrics table,
+    one row per name. Memory use does not grow with the number of episodes.
+    
+    Each Trainer run gets a new run number, so several runs can share a
+    database.
+    """
+    
+    def __init__(self, path=None, interval=100, window=1000, batch_size=1000, flush_interval=5.0):
+        """Open or create a statistics database.
+        
+        Args:
+            path (str, optional): Database file; in memory if not given
+            interval (int): Episodes per block summary
+            window (int): Episodes covered by the rolling window
+            batch_size (int): Commit after this many buffered episodes
+            flush_interval (float): Commit buffered episodes at least this often, in seconds
+        """
+        self.path = path
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connection = sqlite3.connect(path or ':memory:')
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS episodes (
+                run INTEGER, episode INTEGER, winner TEXT, plies INTEGER, duration REAL,
+                x_epsilon REAL, o_epsilon REAL, q_states INTEGER,
+                PRIMARY KEY (run, episode));
+            CREATE TABLE IF NOT EXISTS blocks (
+                run INTEGER, episode INTEGER, games INTEGER, x_wins INTEGER, o_wins INTEGER,
+                draws INTEGER, game_length REAL, x_epsilon REAL, o_epsilon REAL, q_states INTEGER,
+                PRIMARY KEY (run, episode));
+            CREATE TABLE IF NOT EXISTS evaluations (
+                run INTEGER, episode INTEGER, agent TEXT, suite TEXT, score REAL,
+                PRIMARY KEY (run, episode, agent, suite));
+            CREATE TABLE IF NOT EXISTS metrics (
+                run INTEGER, episode INTEGER, name TEXT, value REAL,
+                PRIMARY KEY (run, episode, name));
+        ''')
+        last_run = self.connection.execute(
+            'SELECT MAX(run) FROM (SELECT run FROM episodes UNION ALL SELECT run FROM blocks)').fetchone()[0]
+        self.run = (last_run or 0) + 1
+        
+        self.window = RollingWindow(window)
+        self.pending = []
+        self.last_flush = time.time()
+        self._reset_block()
+    
+    def _reset_block(self):
+        """Start a new block summary."""
+        self.block = {'games': 0, 'X': 0, 'O': 0, None: 0, 'plies': 0}
+    
+    def record(self, episode, winner, plies, duration, x_epsilon, o_epsilon, q_states=None):
+        """Record a finished episode.
+        
+        Args:
+            episode (int): Episode number
+            winner (str): 'X', 'O' or None for a draw
+            plies (int): Length of the game
+            duration (float): Time taken by the episode, in seconds
+            x_epsilon (float): X's exploration rate after the episode
+            o_epsilon (float): O's exploration rate after the episode
+            q_states (int, optional): Number of states in the agents' Q-tables
+        
+        Returns:
+            dict: Summary of the block the episode completes, with the keys of
+                StatsDisplay.add_point and 'rolling' (see rolling), or None
+        """
+        self.pending.append((self.run, episode, winner, plies, duration, x_epsilon, o_epsilon, q_states))
+        self.window.add(winner, plies)
+        
+        block = self.block
+        block['games'] += 1
+        block[winner] += 1
+        block['plies'] += plies
+        
+        summary = None
+        if episode % self.interval == 0:
+            summary = {
+                'episode': episode,
+                'games': block['games'],
+                'x_wins': block['X'],
+                'o_wins': block['O'],
+                'draws': block[None],
+                'game_lengths': block['plies'] / block['games'],
+                'x_epsilon': x_epsilon,
+                'o_epsilon': o_epsilon,
+                'q_states': q_states,
+                'rolling': self.window.summary()
+            }
+            self.connection.execute(
+                'INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.run, episode, summary['games'], summary['x_wins'], summary['o_wins'],
+                 summary['draws'], summary['game_lengths'], x_epsilon, o_epsilon, q_states))
+            self._reset_block()
+        
+        if len(self.pending) >= self.batch_size or time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return summary
+    
+    def record_evaluation(self, result):
+        """Record the scores of a background evaluation.
+        
+        Args:
+            result (dict): Evaluation result from Evaluator.poll
+        """
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?)',
+            [(self.run, result['episode'], agent, suite, score)
+             for agent, scores in result['scores'].items() for suite, score in scores.items()])
+    
+    def evaluations(self, run=None):
+        """Iterate over the evaluation scores of a run.
+        
+        Args:
+            run (int, optional): Run number; the current run if not given
+        
+        Yields:
+            dict: 'episode', 'agent', 'suite' and 'score'
+        """
+        cursor = self.connection.execute(
+            'SELECT episode, agent, suite, score FROM evaluations WHERE run = ? ORDER BY episode, agent, suite',
+            (self.run if run is None else run,))
+        for row in cursor:
+            yield dict(zip(('episode', 'agent', 'suite', 'score'), row))
+    
+    def record_metrics(self, episode, metrics):
+        """Record named measurements taken at an episode.
+        
+        Args:
+            episode (int): Episode number
+            metrics (dict): {name: value}
+        """
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)',
+            [(self.run, episode, name, value) for name, value in metrics.items()])
+    
+    def metrics(self, run=None, prefix=''):
+        """Iterate over the measurements of a run.
+        
+        Args:
+            run (int, optional): Run number; the current run if not given
+            prefix (str): Only measurements whose names start with it
+        
+        Yields:
+            dict: 'episode', 'name' and 'value'
+        """
+        cursor = self.connection.execute(
+            'SELECT episode, name, value FROM metrics WHERE run = ? AND substr(name, 1, ?) = ? '
+            'ORDER BY episode, name', (self.run if run is None else run, len(prefix), prefix))
+        for row in cursor:
+            yield dict(zip(('episode', 'name', 'value'), row))
+    
+    def rolling(self):
+        """Get the aggregates of the rolling window.
+        
+        Returns:
+            dict: See RollingWindow.summary
+        """
+        return self.window.summary()
+    
+    def flush(self):
+        """Commit all buffered episodes."""
+        if self.pending:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self.pending)
+            self.pending = []
+        self.connection.commit()
+        self.last_flush = time.time()
+    
+    def blocks(self, run=None):
+        """Iterate over the block summaries of a run, without loading them all.
+        
+        Args:
+            run (int, optional): Run number; the current run if not given
+        
+        Yields:
+            dict: Block summary, as returned by record
+        """
+        cursor = self.connection.execute(
+            'SELECT episode, games, x_wins, o_wins, draws, game_length, x_epsilon, o_epsilon, q_states '
+            'FROM blocks WHERE run = ? ORDER BY episode', (self.run if run is None else run,))
+        for row in cursor:
+            yield dict(zip(('episode', 'games', 'x_wins', 'o_wins', 'draws', 'game_lengths',
+                            'x_epsilon', 'o_epsilon', 'q_states'), row))
+    
+    def close(self):
+        """Commit buffered episodes and close the database."""
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
\ No newline at end of file
@@ -1,14 +1,21 @@
+import copy
 import time
 import pygame
 import csv
+import json
 import random
 import numpy as np
 from learning.environment import Environment
+from learning.trajectory import Trajectory
+from learning.stats_store import StatsStore
+from agents.q_table_stats import flatten_report
 
 class Trainer:
     """Manages the training process for the tic-tac-toe agents."""
     
-    def __init__(self, game, agent_x, agent_o, renderer=None, stats_display=None):
+    def __init__(self, game, agent_x, agent_o, renderer=None, stats_display=None, viewer=None,
+                 game_log=None, opening_book=None, stats_store=None, league=None,
+                 evaluator=None, table_monitor=None):
         """Initialize the trainer.
         
         Args:
@@ -17,6 +24,20 @@ class Trainer:
             agent_o (Agent): Agent playing as O
             renderer (GameRenderer, optional): Game renderer for visualization
             stats_display (StatsDisplay, optional): Stats display for visualization
+            viewer (ViewerProcess, optional): Out-of-process viewer; when given, the
+                training loop only publishes events and never draws itself
+            game_log (str, optional): JSON lines file that every displayed game's
+                move history is appended to, for offline replay
+            opening_book (OpeningBook, optional): Book consulted before the agents
+                in demo games
+            stats_store (StatsStore, optional): Store receiving per-episode
+                statistics; an in-memory store if not given
+            league (League, optional): Pool of frozen past agents that the live
+                agents are sometimes paired against
+            evaluator (Evaluator, optional): Background evaluation of the agents,
+                whose results go to the stats store
+            table_monitor (QTableMonitor, optional): Periodic reports on the
+                Q-tables, whose metrics go to the stats store
         """
         self.game = game
         self.environment = Environment(game)
@@ -24,27 +45,48 @@ class Trainer:
         self.agent_o = agent_o
         self.renderer = renderer
         self.stats_display = stats_display
+        self.viewer = viewer
+        self.game_log = game_log
+        self.opening_book = opening_book
+        self.league = league
+        self.evaluator = evaluator
+        self.table_monitor = table_monitor
         
-        # Statistics
-        self.stats = {
-            'episode': [],
-            'x_wins': [],
-            'o_wins': [],
-            'draws': [],
-            'game_lengths': [],
-            'x_epsilon': [],
-            'o_epsilon': []
-        }
-        self.running_x_wins = 0
-        self.running_o_wins = 0
-        self.running_draws = 0
+        # Moves of the current episode, and the scratch games its states are rebuilt on
+        self.trajectory = Trajectory()
+        self._replay_games = None
+        
+        # Statistics; episodes are numbered across train() calls
+        self.stats_store = StatsStore() if stats_store is None else stats_store
+        self.episodes_done = 0
     
-    def train(self, num_episodes, display_interval=100):
+    def set_game(self, game):
+        """Continue training on another game, e.g. one with a larger board.
+        
+        Args:
+            game (TicTacToe): The new game instance
+        """
+        self.game = game
+        self.environment = Environment(game)
+        self._replay_games = None
+        
+        # Scores on the old game are not comparable with those to come
+        if self.evaluator is not None:
+            self._collect_evaluation(wait=True)
+            self.evaluator.reset()
+    
+    def train(self, num_episodes, display_interval=100, stop=None):
         """Train agents through self-play.
         
         Args:
             num_episodes (int): Number of episodes to train
             display_interval (int): Interval for visualization and stats
+            stop (callable, optional): Called with every block summary of the
+                stats store; training ends early when it returns True. It also
+                ends early when the evaluator reports a plateau.
+            
+        Returns:
+            int: Number of episodes played
         """
         print(f"Starting training for {num_episodes} episodes...")
         
@@ -55,35 +97,42 @@ class Trainer:
             # Reset the environment
             state = self.environment.reset()
             
+            # Stream displayed games to the viewer process
+            publish = episode % display_interval == 0 and self.viewer is not None
+            if publish:
+                if self.viewer.is_alive():
+                    self.viewer.begin_game(self.game.board.size)
+                else:
+                    print("Viewer closed, continuing training without visualization")
+                    self.viewer = None
+                    publish = False
+            
             # Game step counter
             steps = 0
             
-            # Remember states and actions for delayed learning
-            x_states = []
-            x_actions = []
-            o_states = []
-            o_actions = []
+            # Remember the moves for delayed learning
+            self.trajectory.clear()
+            
+            # Pick this episode's players; frozen league opponents do not learn
+            agents = {'X': self.agent_x, 'O': self.agent_o}
+            if self.league is not None:
+                agents['X'], agents['O'] = self.league.pairing(self.agent_x, self.agent_o)
             
             # Play the game
             done = False
             while not done:
                 # Current player acts
                 current_player = state['current_player']
-                agent = self.agent_x if current_player == 'X' else self.agent_o
+                agent = agents[current_player]
                 
                 # Choose action
                 action = agent.choose_action(state)
-                
-                # Remember state and action
-                if current_player == 'X':
-                    x_states.append(state.copy())
-                    x_actions.append(action)
-                else:
-                    o_states.append(state.copy())
-                    o_actions.append(action)
+                position_hash = self.game.board.hash
                 
                 # Take action
                 next_state, reward, done = self.environment.step(action, current_player)
+                if len(self.game.move_history) > len(self.trajectory):
+                    self.trajectory.record(current_player, action, position_hash)
                 
                 # Increment step counter
                 steps += 1
@@ -91,13 +140,17 @@ class Trainer:
                 # Update state
                 state = next_state
                 
+                if publish:
+                    self.viewer.move(action[0], action[1], current_player)
+                
                 # Visualization for certain episodes
-                if episode % display_interval == 0 and self.renderer:
+                elif episode % display_interval == 0 and self.renderer:
                     # Process any Pygame events
                     for event in pygame.event.get():
                         if event.type == pygame.QUIT:
                             pygame.quit()
-                            return
+                            self.stats_store.flush()
+                            return episode - 1
                     
                     # Render the game
                     self.renderer.render(self.game)
@@ -105,83 +158,155 @@ class Trainer:
                     # Add a small delay to make the visualization visible
                     pygame.time.delay(100)
             
+            if publish:
+                self.viewer.end_game(self.game.winner, self.game.is_draw)
+            
+            number = self.episodes_done + 1
+            if episode % display_interval == 0 and self.game_log:
+                self._log_game(number)
+            
             # Game over - determine outcome
             if self.game.winner == 'X':
-                self.running_x_wins += 1
                 x_reward = 1.0
                 o_reward = -1.0
             elif self.game.winner == 'O':
-                self.running_o_wins += 1
                 x_reward = -1.0
                 o_reward = 1.0
             else:  # Draw
-                self.running_draws += 1
                 x_reward = 0.5
                 o_reward = 0.5
             
-            # Learning for X
-            for i in range(len(x_states)):
-                state_i = x_states[i]
-                action_i = x_actions[i]
-                
-                # Terminal state for the last action, intermediate for others
-                if i == len(x_states) - 1:
-                    next_state_i = self.game.get_state()
-                    reward_i = x_reward
-                else:
-                    next_state_i = o_states[i]
-                    reward_i = 0  # Intermediate steps have zero reward
-                
-                self.agent_x.learn(state_i, action_i, reward_i, next_state_i)
-            
-            # Learning for O
-            for i in range(len(o_states)):
-                state_i = o_states[i]
-                action_i = o_actions[i]
-                
-                # Terminal state for the last action, intermediate for others
-                if i == len(o_states) - 1:
-                    next_state_i = self.game.get_state()
-                    reward_i = o_reward
-                else:
-                    next_state_i = x_states[i+1]
-                    reward_i = 0  # Intermediate steps have zero reward
-                
-                self.agent_o.learn(state_i, action_i, reward_i, next_state_i)
+            # Learning, on states rebuilt from the recorded moves
+            learners = {'X': self.agent_x, 'O': self.agent_o}
+            rewards = {'X': x_reward, 'O': o_reward}
+            first, second = self._scratch_games()
+            for player, state_i, action_i, reward_i, next_state_i in self.trajectory.transitions(
+                    first, second, self.game.get_state(), rewards):
+                if agents[player] is learners[player]:
+                    learners[player].learn(state_i, action_i, reward_i, next_state_i)
             
             # Increment episode counters
             self.agent_x.increment_episode()
             self.agent_o.increment_episode()
             
-            # Record statistics periodically
-            if episode % 100 == 0:
-                self.stats['episode'].append(episode)
-                self.stats['x_wins'].append(self.running_x_wins)
-                self.stats['o_wins'].append(self.running_o_wins)
-                self.stats['draws'].append(self.running_draws)
-                self.stats['game_lengths'].append(steps)
-                self.stats['x_epsilon'].append(self.agent_x.epsilon)
-                self.stats['o_epsilon'].append(self.agent_o.epsilon)
-                
-                # Reset running counters
-                self.running_x_wins = 0
-                self.running_o_wins = 0
-                self.running_draws = 0
-                
+            # Record statistics; the store summarizes them in blocks of episodes
+            elapsed = time.time() - start_time
+            self.episodes_done = number
+            if self.league is not None and number % self.league.snapshot_interval == 0:
+                self.league.snapshot([self.agent_x, self.agent_o])
+            if self.table_monitor is not None and number % self.table_monitor.interval == 0:
+                self._record_table_stats(number)
+            block = self.stats_store.record(number, self.game.winner, steps, elapsed,
+                                            self.agent_x.epsilon, self.agent_o.epsilon,
+                                            self._q_states())
+            if block is not None:
                 # Display progress and statistics
-                end_time = time.time()
-                elapsed = end_time - start_time
                 print(f"Episode {episode}/{num_episodes} ({episode/num_episodes*100:.1f}%) - " +
-                      f"X: {self.stats['x_wins'][-1]}, O: {self.stats['o_wins'][-1]}, " +
-                      f"Draw: {self.stats['draws'][-1]}, Steps: {steps}, " +
+                      f"X: {block['x_wins']}, O: {block['o_wins']}, " +
+                      f"Draw: {block['draws']}, Avg. steps: {block['game_lengths']:.1f}, " +
                       f"X ε: {self.agent_x.epsilon:.3f}, O ε: {self.agent_o.epsilon:.3f}, " +
                       f"Time: {elapsed:.3f}s")
                 
                 # Update stats display
-                if self.stats_display:
-                    self.stats_display.update(self.stats)
+                if self.viewer is not None:
+                    self.viewer.stats(block)
+                elif self.stats_display:
+                    self.stats_display.add_point(block)
                     self.stats_display.render()
                     pygame.display.flip()
+                
+                if stop is not None and stop(block):
+                    self.stats_store.flush()
+                    return episode
+            
+            # Hand the agents to the background evaluation, and collect its results
+            if self.evaluator is not None:
+                if number % self.evaluator.interval == 0:
+                    self.evaluator.submit(number, {'X': self.agent_x, 'O': self.agent_o}, self.game)
+                if self._collect_evaluation():
+                    print(f"Stopping: evaluation scores have not improved for "
+                          f"{self.evaluator.patience} evaluations")
+                    self.stats_store.flush()
+                    return episode
+        
+        if self.evaluator is not None:
+            self._collect_evaluation(wait=True)
+        self.stats_store.flush()
+        return num_episodes
+    
+    def _record_table_stats(self, number):
+        """Report on the Q-tables and record the report's metrics.
+        
+        Args:
+            number (int): Episode number
+        """
+        metrics = {}
+        for label, report in self.table_monitor.observe([self.agent_x, self.agent_o]).items():
+            metrics.update(flatten_report(report, label))
+            print(f"Q-table {label} at episode {number}: {report['states']} states, "
+                  f"{report['entries']} entries ({report['zero_fraction']:.1%} zero), "
+                  f"{report['bytes']['total'] / 2**20:.1f} MB, "
+                  f"{report.get('states_per_episode', 0.0):.1f} new states per episode")
+        self.stats_store.record_metrics(number, metrics)
+    
+    def _collect_evaluation(self, wait=False):
+        """Record the result of a finished background evaluation.
+        
+        Args:
+            wait (bool): Wait for a running evaluation to finish
+        
+        Returns:
+            bool: True if the evaluation scores have plateaued
+        """
+        result = self.evaluator.poll(wait)
+        if result is None:
+            return False
+        if 'error' in result:
+            print(f"Evaluation at episode {result['episode']} failed: {result['error']}")
+            return False
+        self.stats_store.record_evaluation(result)
+        print(f"Evaluation at episode {result['episode']} ({result['seconds']:.1f}s): " +
+              ", ".join(f"{agent} " + " ".join(f"{suite} {score:.2f}" for suite, score in scores.items())
+                        for agent, scores in result['scores'].items()))
+        return self.evaluator.plateaued
+    
+    def _q_states(self):
+        """Count the states in the agents' Q-tables, each table once.
+        
+        Returns:
+            int: Number of states, or None if neither agent has a Q-table
+        """
+        tables = {id(agent.q_table): agent.q_table for agent in (self.agent_x, self.agent_o)
+                  if isinstance(getattr(agent, 'q_table', None), dict)}
+        if not tables:
+            return None
+        return sum(len(q_table) for q_table in tables.values())
+    
+    def _scratch_games(self):
+        """Get two games with the training game's settings for rebuilding states.
+        
+        Returns:
+            tuple: Two TicTacToe instances
+        """
+        if self._replay_games is None or self._replay_games[0].board.size != self.game.board.size:
+            self._replay_games = (copy.deepcopy(self.game), copy.deepcopy(self.game))
+        return self._replay_games
+    
+    def _log_game(self, episode):
+        """Append the finished game's move history to the game log.
+        
+        Args:
+            episode (int): Episode number of the game
+        """
+        record = {
+            'episode': episode,
+            'board_size': self.game.board.size,
+            'moves': [list(move) for move in self.game.move_history],
+            'winner': self.game.winner,
+            'is_draw': self.game.is_draw
+        }
+        with open(self.game_log, 'a') as f:
+            f.write(json.dumps(record) + '\n')
     
     def play_demo_game(self, delay=500):
         """Play a demonstration game between the trained agents.
@@ -189,6 +314,10 @@ class Trainer:
         Args:
             delay (int): Delay between moves in milliseconds for visualization
         """
+        if self.viewer is not None:
+            self._play_viewer_demo_game(delay)
+            return
+        
         if not self.renderer:
             print("Renderer is required for demo game")
             return
@@ -216,12 +345,8 @@ class Trainer:
             current_player = state['current_player']
             agent = self.agent_x if current_player == 'X' else self.agent_o
             
-            # Choose action (always exploit during demo)
-            # Save and restore epsilon to ensure exploitation
-            original_epsilon = agent.epsilon
-            agent.epsilon = 0
-            action = agent.choose_action(state)
-            agent.epsilon = original_epsilon
+            # Choose action (book move, or always exploit during demo)
+            action = self._demo_action(agent, state)
             
             # Take action
             next_state, reward, done = self.environment.step(action, current_player)
@@ -243,24 +368,101 @@ class Trainer:
         # Keep rendering the final state for a while
         pygame.time.delay(delay * 2)
     
+    def _play_viewer_demo_game(self, delay):
+        """Play a demonstration game, streaming the moves to the viewer process.
+        
+        Args:
+            delay (int): Delay between moves in milliseconds
+        """
+        print("Playing demo game...")
+        
+        # Reset the environment
+        state = self.environment.reset()
+        self.viewer.begin_game(self.game.board.size)
+        time.sleep(delay / 1000)
+        
+        # Play the game
+        done = False
+        while not done and self.viewer.is_alive():
+            # Current player acts
+            current_player = state['current_player']
+            agent = self.agent_x if current_player == 'X' else self.agent_o
+            
+            # Choose action (book move, or always exploit during demo)
+            action = self._demo_action(agent, state)
+            
+            # Take action
+            state, reward, done = self.environment.step(action, current_player)
+            self.viewer.move(action[0], action[1], current_player)
+            time.sleep(delay / 1000)
+        
+        self.viewer.end_game(self.game.winner, self.game.is_draw)
+        
+        # Display final result
+        if self.game.winner:
+            print(f"Game over! {self.game.winner} wins!")
+        else:
+            print("Game over! It's a draw!")
+    
+    def _demo_action(self, agent, state):
+        """Choose a demo game move: from the opening book if possible, else greedily.
+        
+        Args:
+            agent (Agent): Agent to move
+            state (dict): Current game state
+            
+        Returns:
+            tuple: (row, col) position to play
+        """
+        if self.opening_book is not None:
+            move = self.opening_book.lookup(state['board'])
+            if move is not None and move in state['valid_moves']:
+                return move
+        
+        # Save and restore epsilon to ensure exploitation
+        original_epsilon = agent.epsilon
+        agent.epsilon = 0
+        action = agent.choose_action(state)
+        agent.epsilon = original_epsilon
+        return action
+    
+    @property
+    def stats(self):
+        """The run's block summaries as lists, the layout trainers used to keep.
+        
+        Read-only: the lists are rebuilt from the stats store on every access.
+        Each 'game_lengths' entry is the mean over its block of episodes.
+        
+        Returns:
+            dict: 'episode', 'x_wins', 'o_wins', 'draws', 'game_lengths',
+                'x_epsilon' and 'o_epsilon', one entry per block
+        """
+        stats = {key: [] for key in ('episode', 'x_wins', 'o_wins', 'draws', 'game_lengths',
+                                     'x_epsilon', 'o_epsilon')}
+        for block in self.stats_store.blocks():
+            for key, values in stats.items():
+                values.append(block[key])
+        return stats
+    
     def save_stats(self, filepath):
-        """Save training statistics to a CSV file.
+        """Save the run's statistics, one row per 100 episodes, to a CSV file.
         
         Args:
             filepath (str): Path to save the file
         """
+        self.stats_store.flush()
         with open(filepath, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['Episode', 'X Wins', 'O Wins', 'Draws', 'Game Length', 'X Epsilon', 'O Epsilon'])
-            for i in range(len(self.stats['episode'])):
+            for block in self.stats_store.blocks():
                 writer.writerow([
-                    self.stats['episode'][i],
-                    self.stats['x_wins'][i],
-                    self.stats['o_wins'][i],
-                    self.stats['draws'][i],
-                    self.stats['game_lengths'][i],
-                    self.stats['x_epsilon'][i],
-                    self.stats['o_epsilon'][i]
+                    block['episode'],
+                    block['x_wins'],
+                    block['o_wins'],
+                    block['draws'],
+                    block['game_lengths'],
+                    block['x_epsilon'],
+                    block['o_epsilon']
                 ])
         
         print(f"Statistics saved to {filepath}")
\ No newline at end of file
@@ -0,0 +1,91 @@
+class Trajectory:
+    """Compact record of one game for the learning pass.
+    
+    Only the moves and the Zobrist hash of the position before each move are
+    kept. States are rebuilt afterwards by replaying the moves, so memory per
+    episode does not grow with the board size, and every rebuilt state shows
+    the board as it was when the move was made.
+    """
+    
+    def __init__(self):
+        """Initialize an empty trajectory."""
+        self.players = []
+        self.actions = []
+        self.hashes = []
+    
+    def __len__(self):
+        """Get the number of recorded moves."""
+        return len(self.actions)
+    
+    def clear(self):
+        """Forget all recorded moves."""
+        self.players.clear()
+        self.actions.clear()
+        self.hashes.clear()
+    
+    def record(self, player, action, position_hash):
+        """Record a move.
+        
+        Args:
+            player (str): Player who moved
+            action (tuple): (row, col) position played
+            position_hash (int): Zobrist hash of the board before the move
+        """
+        self.players.append(player)
+        self.actions.append(action)
+        self.hashes.append(position_hash)
+    
+    def transitions(self, first, second, final_state, rewards):
+        """Rebuild the transitions of the game, one move at a time.
+        
+        Two scratch games leapfrog through the moves, one at the position
+        before the current move and one a move ahead, so every state dict is
+        built once. Each player's last move leads to the final state with the
+        game's reward; earlier moves lead to the position after them with
+        reward 0. The yielded states are only valid until the next one is
+        requested.
+        
+        Args:
+            first (TicTacToe): Scratch game with the same settings as the recorded one
+            second (TicTacToe): Second scratch game with the same settings
+            final_state (dict): State at the end of the recorded game
+            rewards (dict): Final reward of each player
+            
+        Yields:
+            tuple: (player, state, action, reward, next_state)
+            
+        Raises:
+            RuntimeError: If the replay does not reproduce the recorded positions
+        """
+        count = len(self.actions)
+        if not count:
+            return
+        
+        last = {player: t for t, player in enumerate(self.players)}
+        games = (first, second)
+        first.reset()
+        second.reset()
+        second.play(*self.actions[0])
+        state = first.get_state()
+        
+        for t in range(count):
+            current, ahead = games[t % 2], games[(t + 1) % 2]
+            if current.board.hash != self.hashes[t]:
+                raise RuntimeError(f"Replay diverged from the recorded game at move {t}")
+            
+            player = self.players[t]
+            if t == last[player]:
+                next_state = final_state
+                reward = rewards[player]
+                ahead_state = None
+            else:
+                next_state = ahead_state = ahead.get_state()
+                reward = 0  # Intermediate steps have zero reward
+            
+            yield player, state, self.actions[t], reward, next_state
+            
+            if t + 1 < count:
+                # The game ahead becomes the current one; this one moves two ahead
+                state = ahead_state if ahead_state is not None else ahead.get_state()
+                current.play(*self.actions[t])
+                current.play(*self.actions[t + 1])
\ No newline at end of file
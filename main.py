@@ -2,10 +2,85 @@ import pygame
 import os
 import argparse
 from game.game import TicTacToe
-from agents.q_learning_agent import QLearningAgent
+from agents.q_learning_agent import QLearningAgent, save_shared, load_shared
+from agents.linear_agent import LinearAgent
+from agents.alpha_beta_agent import AlphaBetaAgent
+from agents.mcts_agent import MCTSAgent
+from agents.opening_book import OpeningBook
 from learning.trainer import Trainer
+from learning.stats_store import StatsStore
+from learning.curriculum import Curriculum, train_curriculum
+from learning.league import League
+from learning.evaluator import Evaluator
+from learning.parallel import train_parallel
+from agents.q_table_stats import QTableMonitor
+from agents.shared_q_table import SharedQTable
 from ui.renderer import GameRenderer
 from ui.stats_display import StatsDisplay
+from ui.viewer import ViewerProcess
+
+def create_agent(kind, player_symbol, args, q_table=None, greedy_cache=None, relative=False, backend=None):
+    """Create an agent of the kind selected on the command line.
+    
+    Args:
+        kind (str): 'q', 'linear', 'alphabeta' or 'mcts'
+        player_symbol (str): 'X' or 'O'
+        args (argparse.Namespace): Parsed command line arguments
+        q_table (dict, optional): Perspective-normalized Q-table shared by
+            the Q-learning agents
+        greedy_cache (dict, optional): Greedy action cache belonging to q_table
+        relative (bool): Give Q-learning agents board-independent state keys
+        backend (SharedQTable, optional): Shared-memory Q-table of both
+            Q-learning agents, for training in worker processes
+        
+    Returns:
+        Agent: The new agent
+    """
+    if kind == 'alphabeta':
+        return AlphaBetaAgent(player_symbol,
+                              time_limit=args.search_time,
+                              max_depth=args.search_depth)
+    if kind == 'mcts':
+        return MCTSAgent(player_symbol,
+                         num_playouts=args.playouts,
+                         time_limit=args.search_time if args.playouts is None else None,
+                         selection='puct',
+                         workers=args.search_workers)
+    if kind == 'linear':
+        return LinearAgent(player_symbol,
+                           learning_rate=args.linear_learning_rate,
+                           discount_factor=args.discount_factor,
+                           epsilon_start=args.epsilon_start,
+                           epsilon_end=args.epsilon_end,
+                           epsilon_decay=args.epsilon_decay)
+    
+    return QLearningAgent(player_symbol, 
+                          learning_rate=args.learning_rate,
+                          discount_factor=args.discount_factor,
+                          epsilon_start=args.epsilon_start,
+                          epsilon_end=args.epsilon_end,
+                          epsilon_decay=args.epsilon_decay,
+                          q_table=q_table,
+                          normalize_perspective=q_table is not None or backend is not None,
+                          backend=backend,
+                          greedy_cache=greedy_cache,
+                          relative=relative)
+
+def model_path(kind, player_symbol):
+    """Get the file a learning agent is saved to.
+    
+    Args:
+        kind (str): Agent kind
+        player_symbol (str): 'X' or 'O'
+        
+    Returns:
+        str: Model path, or None for agents that do not learn
+    """
+    if kind == 'q':
+        return f'data/models/agent_{player_symbol.lower()}.pkl'
+    if kind == 'linear':
+        return f'data/models/linear_{player_symbol.lower()}.pkl'
+    return None
 
 def main():
     # Parse command line arguments
@@ -13,6 +88,8 @@ def main():
     parser.add_argument('--episodes', type=int, default=100, help='Number of training episodes')
     parser.add_argument('--display_interval', type=int, default=100, help='Display game every N episodes')
     parser.add_argument('--learning_rate', type=float, default=0.1, help='Learning rate for Q-learning')
+    parser.add_argument('--linear_learning_rate', type=float, default=0.01,
+                    help='Step size of the weight updates of linear agents')
     parser.add_argument('--discount_factor', type=float, default=0.9, help='Discount factor for Q-learning')
     parser.add_argument('--epsilon_start', type=float, default=1.0, help='Starting exploration rate')
     parser.add_argument('--epsilon_end', type=float, default=0.1, help='Ending exploration rate')
@@ -20,61 +97,192 @@ def main():
     parser.add_argument('--headless', action='store_true', help='Run without visualization')
     parser.add_argument('--demo_delay', type=int, default=100, 
                     help='Delay between moves in demo game (ms)')
+    parser.add_argument('--inline_render', action='store_true',
+                    help='Render inside the training loop instead of a separate viewer process')
+    parser.add_argument('--candidate_radius', type=int, default=None,
+                    help='Only consider moves within this distance of existing stones')
+    parser.add_argument('--engine', choices=['board', 'bitboard'], default='board',
+                    help='Board implementation (bitboard is faster without --candidate_radius, board with it; '
+                         'bitboard has no threat index, which alphabeta needs)')
+    parser.add_argument('--shared_q', action='store_true',
+                    help='Let both Q-learning agents share one perspective-normalized Q-table, each '
+                         'learning from the values the other writes')
+    parser.add_argument('--train_workers', type=int, default=0,
+                    help='Self-play processes training both Q-learning agents on one shared-memory '
+                         'Q-table (0 trains in this process)')
+    parser.add_argument('--shared_capacity', type=int, default=1 << 22,
+                    help='Entries of the shared-memory Q-table used with --train_workers')
+    parser.add_argument('--max_plies', type=int, default=None,
+                    help='Stop games after this many moves (default: play until decided)')
+    parser.add_argument('--adjudication', choices=['draw', 'open_lines'], default='draw',
+                    help='Result of games stopped by --max_plies: a draw, or a win for the player '
+                         'with more open five-cell windows')
+    parser.add_argument('--agent_x', choices=['q', 'linear', 'alphabeta', 'mcts'], default='q',
+                    help='Kind of agent playing X')
+    parser.add_argument('--agent_o', choices=['q', 'linear', 'alphabeta', 'mcts'], default='q',
+                    help='Kind of agent playing O')
+    parser.add_argument('--search_time', type=float, default=1.0,
+                    help='Time budget per move for search agents (seconds)')
+    parser.add_argument('--search_depth', type=int, default=8,
+                    help='Maximum search depth for alpha-beta agents')
+    parser.add_argument('--playouts', type=int, default=None,
+                    help='Playouts per move for MCTS agents (default: use --search_time)')
+    parser.add_argument('--search_workers', type=int, default=0,
+                    help='Playout processes for MCTS agents (0 runs playouts in-process)')
+    parser.add_argument('--opening_book', type=str, default='data/models/opening_book.bin',
+                    help='Opening book used in the demo game, if the file exists')
+    parser.add_argument('--game_log', type=str, default=None,
+                    help='Append the move history of every displayed game to this JSON lines file')
+    parser.add_argument('--curriculum', type=str, default=None,
+                    help='Comma-separated board sizes trained on before the 50x50 board, e.g. 9,15,25')
+    parser.add_argument('--curriculum_min_episodes', type=int, default=1000,
+                    help='Episodes played on each curriculum board before promotion')
+    parser.add_argument('--curriculum_max_episodes', type=int, default=20000,
+                    help='Episodes after which a curriculum board is left regardless')
+    parser.add_argument('--league', action='store_true',
+                    help='Pair the learning agents against frozen snapshots of their past selves half the time')
+    parser.add_argument('--league_pool_size', type=int, default=20,
+                    help='Frozen snapshots kept per side in league mode')
+    parser.add_argument('--league_interval', type=int, default=1000,
+                    help='Episodes between league snapshots')
+    parser.add_argument('--eval_interval', type=int, default=0,
+                    help='Episodes between background evaluations of the learning agents (0 to disable)')
+    parser.add_argument('--eval_games', type=int, default=20,
+                    help='Games per evaluation match')
+    parser.add_argument('--eval_patience', type=int, default=None,
+                    help='Stop training after this many evaluations without improvement')
+    parser.add_argument('--table_stats_interval', type=int, default=0,
+                    help='Episodes between Q-table size reports (0 to disable)')
+    parser.add_argument('--table_stats_sample', type=int, default=2000,
+                    help='States examined per Q-table report')
+    parser.add_argument('--stats_db', type=str, default='data/stats/training_stats.db',
+                    help='SQLite database that per-episode statistics are streamed to')
     args = parser.parse_args()
+    if args.engine == 'bitboard' and 'alphabeta' in (args.agent_x, args.agent_o):
+        parser.error("--agent_x/--agent_o alphabeta needs --engine board (it orders moves by the threat index)")
+    if args.train_workers > 0:
+        if args.agent_x != 'q' or args.agent_o != 'q':
+            parser.error("--train_workers needs Q-learning agents on both sides")
+        if args.curriculum or args.league or args.eval_interval or args.table_stats_interval:
+            parser.error("--train_workers cannot be combined with --curriculum, --league, "
+                         "--eval_interval or --table_stats_interval")
     
     # Create data directories if they don't exist
     os.makedirs('data/models', exist_ok=True)
     os.makedirs('data/stats', exist_ok=True)
 
-    # Initialize pygame
-    if not args.headless:
+    # Initialize visualization
+    viewer = None
+    game_renderer = None
+    stats_display = None
+    if not args.headless and not args.inline_render:
+        viewer = ViewerProcess()
+        viewer.start()
+    elif not args.headless:
         pygame.init()
         screen = pygame.display.set_mode((1000, 700))  # Larger window for 50x50 board
         pygame.display.set_caption("Gomoku RL (50x50 with 5-in-a-row)")
         game_renderer = GameRenderer(screen)
         stats_display = StatsDisplay(screen)
-    else:
-        game_renderer = None
-        stats_display = None
 
     # Create game and agents
-    game = TicTacToe()
+    def make_game(board_size=50):
+        return TicTacToe(board_size, candidate_radius=args.candidate_radius, engine=args.engine,
+                         max_plies=args.max_plies, adjudication=args.adjudication)
     
-    agent_x = QLearningAgent('X', 
-                             learning_rate=args.learning_rate,
-                             discount_factor=args.discount_factor,
-                             epsilon_start=args.epsilon_start,
-                             epsilon_end=args.epsilon_end,
-                             epsilon_decay=args.epsilon_decay)
+    game = make_game()
+    curriculum = None
+    if args.curriculum:
+        curriculum = Curriculum([int(size) for size in args.curriculum.split(',')],
+                                min_episodes=args.curriculum_min_episodes,
+                                max_episodes=args.curriculum_max_episodes)
     
-    agent_o = QLearningAgent('O', 
-                             learning_rate=args.learning_rate,
-                             discount_factor=args.discount_factor,
-                             epsilon_start=args.epsilon_start,
-                             epsilon_end=args.epsilon_end,
-                             epsilon_decay=args.epsilon_decay)
+    shared_q = args.shared_q and args.agent_x == 'q' and args.agent_o == 'q'
+    q_table = {} if shared_q else None
+    greedy_cache = {} if shared_q else None
+    backend = SharedQTable(args.shared_capacity) if args.train_workers > 0 else None
+    agent_x = create_agent(args.agent_x, 'X', args, q_table, greedy_cache, relative=curriculum is not None,
+                           backend=backend)
+    agent_o = create_agent(args.agent_o, 'O', args, q_table, greedy_cache, relative=curriculum is not None,
+                           backend=backend)
     
     # Load models if they exist
-    if os.path.exists('data/models/agent_x.pkl'):
-        agent_x.load('data/models/agent_x.pkl')
-    if os.path.exists('data/models/agent_o.pkl'):
-        agent_o.load('data/models/agent_o.pkl')
+    if backend is not None:
+        load_shared([agent_x, agent_o], 'data/models/parallel_q.pkl')
+    elif shared_q:
+        load_shared([agent_x, agent_o], 'data/models/shared_q.pkl',
+                    legacy_paths={'X': 'data/models/agent_x.pkl', 'O': 'data/models/agent_o.pkl'})
+    else:
+        for kind, agent in ((args.agent_x, agent_x), (args.agent_o, agent_o)):
+            path = model_path(kind, agent.player_symbol)
+            if path is not None and os.path.exists(path):
+                agent.load(path)
+    
+    if curriculum is not None:
+        for agent in (agent_x, agent_o):
+            if isinstance(agent, QLearningAgent) and agent.q_table and not agent.relative:
+                print(f"Agent {agent.player_symbol}'s saved Q-table has board-specific keys; "
+                      f"its values will not carry over between curriculum boards")
+    
+    # Opening book for demo games, if one was built
+    opening_book = None
+    if os.path.exists(args.opening_book):
+        opening_book = OpeningBook.load(args.opening_book)
+        if opening_book.board_size != game.board.size:
+            opening_book = None
     
     # Create trainer
-    trainer = Trainer(game, agent_x, agent_o, game_renderer, stats_display)
+    stats_store = StatsStore(args.stats_db)
+    league = None
+    if args.league:
+        league = League(pool_size=args.league_pool_size, snapshot_interval=args.league_interval)
+    evaluator = None
+    if args.eval_interval > 0:
+        evaluator = Evaluator(interval=args.eval_interval, games=args.eval_games, patience=args.eval_patience)
+    table_monitor = None
+    if args.table_stats_interval > 0:
+        table_monitor = QTableMonitor(interval=args.table_stats_interval, sample=args.table_stats_sample)
+    trainer = Trainer(game, agent_x, agent_o, game_renderer, stats_display, viewer,
+                      game_log=args.game_log, opening_book=opening_book, stats_store=stats_store,
+                      league=league, evaluator=evaluator, table_monitor=table_monitor)
     
     # Run training
-    trainer.train(args.episodes, args.display_interval)
+    if curriculum is not None:
+        train_curriculum(trainer, curriculum, make_game, game.board.size, args.episodes, args.display_interval)
+    elif backend is not None:
+        totals = train_parallel(agent_x, agent_o, game, args.episodes, args.train_workers)
+        print(f"Played {totals['games']} games in {args.train_workers} workers: "
+              f"X {totals['x_wins']}, O {totals['o_wins']}, draws {totals['draws']}, "
+              f"{totals['game_lengths']:.1f} moves on average; "
+              f"{len(backend)} Q-values, {backend.dropped} dropped")
+    else:
+        trainer.train(args.episodes, args.display_interval)
     
     # Save trained models
-    agent_x.save('data/models/agent_x.pkl')
-    agent_o.save('data/models/agent_o.pkl')
+    if backend is not None:
+        save_shared([agent_x, agent_o], 'data/models/parallel_q.pkl')
+    elif shared_q:
+        save_shared([agent_x, agent_o], 'data/models/shared_q.pkl')
+    else:
+        for kind, agent in ((args.agent_x, agent_x), (args.agent_o, agent_o)):
+            path = model_path(kind, agent.player_symbol)
+            if path is not None:
+                agent.save(path)
     
     # Save statistics
     trainer.save_stats('data/stats/training_stats.csv')
+    stats_store.close()
+    if evaluator is not None:
+        evaluator.close()
     
     # Play a final demo game with visualization
-    if not args.headless:
+    if viewer is not None:
+        print("Training completed. Playing a demo game...")
+        trainer.play_demo_game(args.demo_delay)
+        
+        # Keep the window open until user closes
+        viewer.close(wait=True)
+    elif not args.headless:
         print("Training completed. Playing a demo game...")
         trainer.play_demo_game()
         
@@ -86,6 +294,11 @@ def main():
                     running = False
                     
         pygame.quit()
+    
+    agent_x.close()
+    agent_o.close()
+    if backend is not None:
+        backend.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
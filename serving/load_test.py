@@ -0,0 +1,118 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+
+def random_positions(count, board_size=50, max_moves=20, seed=0):
+    """Generate random positions clustered around the center of the board.
+    
+    Args:
+        count (int): Number of positions
+        board_size (int): Size of the board
+        max_moves (int): Maximum number of moves per position
+        seed (int): Random seed
+        
+    Returns:
+        list: Move lists
+    """
+    rng = random.Random(seed)
+    center = board_size // 2
+    cells = [(row, col) for row in range(center - 7, center + 8) for col in range(center - 7, center + 8)]
+    return [rng.sample(cells, rng.randrange(max_moves + 1)) for _ in range(count)]
+
+async def _request(reader, writer, method, path, payload=None):
+    """Send one request on a keep-alive connection and read the JSON response.
+    
+    Returns:
+        tuple: (status code, decoded response)
+    """
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def _client(host, port, positions, requests, latencies, errors, rng):
+    """Send requests for random positions from the pool over one connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, 'POST', '/move', {'moves': rng.choice(positions)})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load_test(host='127.0.0.1', port=8080, clients=50, requests=200, positions=1000,
+                        board_size=50, seed=0):
+    """Hammer a running move server with concurrent clients.
+    
+    Args:
+        host (str): Server host
+        port (int): Server port
+        clients (int): Number of concurrent connections
+        requests (int): Requests per client
+        positions (int): Size of the pool of positions requested (repeats hit the cache)
+        board_size (int): Size of the board
+        seed (int): Random seed
+        
+    Returns:
+        dict: Client-side throughput and latency percentiles, and the server's metrics
+    """
+    pool = random_positions(positions, board_size, seed=seed)
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, pool, requests, latencies, errors, random.Random(seed + i + 1))
+        for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await _request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_s': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+        'server': server_metrics
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test a running move server')
+    parser.add_argument('--host', default='127.0.0.1', help='Server host')
+    parser.add_argument('--port', type=int, default=8080, help='Server port')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent connections')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client')
+    parser.add_argument('--positions', type=int, default=1000, help='Distinct positions requested')
+    parser.add_argument('--board_size', type=int, default=50, help='Size of the board')
+    args = parser.parse_args()
+    
+    results = asyncio.run(run_load_test(args.host, args.port, args.clients, args.requests,
+                                        args.positions, args.board_size))
+    print(f"{results['requests']} requests ({results['errors']} errors), "
+          f"{results['requests_per_s']:.0f} req/s, p50 {results['p50_ms']:.2f} ms, p99 {results['p99_ms']:.2f} ms")
+    print(f"Server: {json.dumps(results['server'])}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import random
+import numpy as np
+from game.game import TicTacToe
+from game.board import zobrist_keys
+from agents.q_learning_agent import QLearningAgent
+from agents.linear_agent import LinearAgent, pattern_features
+from learning.arena import parse_participant, build_agent
+
+def position_key(moves, board_size):
+    """Get a cache key for the position reached by a move list.
+    
+    Transpositions (the same stones reached in another order) share a key.
+    Moves are checked first, so that no invalid move list shares the key of
+    a valid one.
+    
+    Args:
+        moves (list): (row, col) moves, starting with X
+        board_size (int): Size of the board
+        
+    Returns:
+        tuple: (Zobrist hash, number of moves)
+        
+    Raises:
+        ValueError: If a move is off the board or plays an occupied cell
+    """
+    keys = zobrist_keys(board_size)
+    position = 0
+    occupied = set()
+    for i, (row, col) in enumerate(moves):
+        if not (isinstance(row, int) and isinstance(col, int)):
+            raise ValueError(f"Move {i + 1} is not a pair of integers: [{row!r}, {col!r}]")
+        if not (0 <= row < board_size and 0 <= col < board_size):
+            raise ValueError(f"Move {i + 1} is off the {board_size}x{board_size} board: [{row}, {col}]")
+        if (row, col) in occupied:
+            raise ValueError(f"Move {i + 1} plays the occupied cell [{row}, {col}]")
+        occupied.add((row, col))
+        position ^= keys['X' if i % 2 == 0 else 'O'][row * board_size + col]
+    return position, len(moves)
+
+def load_agents(x_spec, o_spec, settings):
+    """Load the agents playing each side, once and greedy.
+    
+    If both sides use the same shared model file, its Q-table is loaded only once.
+    
+    Args:
+        x_spec (str): Participant specification (see learning.arena) for X
+        o_spec (str): Participant specification for O
+        settings (dict): Arena settings (search_time for search agents)
+        
+    Returns:
+        dict: Maps 'X' and 'O' to agents
+    """
+    x_agent = build_agent(parse_participant(x_spec), 'X', settings)
+    if o_spec == x_spec and isinstance(x_agent, QLearningAgent) and x_agent.normalize_perspective:
+        o_agent = QLearningAgent('O', epsilon_start=0.0, epsilon_end=0.0,
+                                 q_table=x_agent.q_table, normalize_perspective=True,
+                                 greedy_cache=x_agent.greedy, symmetric=x_agent.symmetric,
+                                 relative=x_agent.relative)
+    else:
+        o_agent = build_agent(parse_participant(o_spec), 'O', settings)
+    return {'X': x_agent, 'O': o_agent}
+
+class GreedyPolicy:
+    """Answers batches of positions with the agents' greedy moves, read-only.
+    
+    Positions are rebuilt on one scratch game with apply_moves and
+    unmake_move. Q-table lookups never insert entries, and the Q-values of
+    linear agents are computed for all positions of a batch with a single
+    matrix product. Q-learning agents still answer position by position, one
+    table lookup each, so batching saves them only the per-request overhead.
+    """
+    
+    def __init__(self, agents, board_size=50, candidate_radius=2):
+        """Initialize the policy.
+        
+        Args:
+            agents (dict): Maps 'X' and 'O' to agents
+            board_size (int): Size of the board
+            candidate_radius (int, optional): Candidate move radius of the games
+        """
+        self.agents = agents
+        self.board_size = board_size
+        self.game = TicTacToe(board_size, candidate_radius=candidate_radius)
+    
+    def best_moves(self, positions):
+        """Choose a move in each of many positions.
+        
+        Args:
+            positions (list): Move lists, each a list of (row, col) moves starting with X
+            
+        Returns:
+            list: (row, col) move, or a ValueError for positions that are
+                invalid or already decided
+        """
+        answers = [None] * len(positions)
+        linear = []  # (index, features, valid moves) waiting for one batched product
+        
+        for index, moves in enumerate(positions):
+            try:
+                self._set_position(moves)
+                if self.game.is_terminal():
+                    raise ValueError("Game is already over")
+                
+                player = self.game.current_player
+                agent = self.agents[player]
+                valid_moves = self.game.get_valid_moves()
+                if isinstance(agent, QLearningAgent):
+                    answers[index] = self._q_move(agent, valid_moves)
+                elif isinstance(agent, LinearAgent):
+                    features = pattern_features(self.game.board, valid_moves, player)
+                    linear.append((index, features, valid_moves, agent))
+                else:
+                    answers[index] = tuple(agent.choose_action(self.game.get_state()))
+            except (ValueError, TypeError, IndexError) as e:
+                answers[index] = ValueError(str(e))
+        
+        if linear:
+            # Group by agent so each side's weights multiply one stacked matrix
+            for player in ('X', 'O'):
+                group = [item for item in linear if item[3] is self.agents[player]]
+                if not group:
+                    continue
+                q_values = np.concatenate([features for _, features, _, _ in group]) @ self.agents[player].weights
+                start = 0
+                for index, features, valid_moves, _ in group:
+                    values = q_values[start:start + len(valid_moves)]
+                    start += len(valid_moves)
+                    best = np.flatnonzero(values == values.max())
+                    answers[index] = tuple(valid_moves[random.choice(best)])
+        
+        return answers
+    
+    def _set_position(self, moves):
+        """Bring the scratch game to a position, reusing the common prefix of moves.
+        
+        Args:
+            moves (list): (row, col) moves starting with X
+            
+        Raises:
+            ValueError: If a move is invalid
+        """
+        history = self.game.move_history
+        common = 0
+        for played, move in zip(history, moves):
+            if played[0] != move[0] or played[1] != move[1]:
+                break
+            common += 1
+        while len(history) > common:
+            self.game.unmake_move()
+        try:
+            self.game.apply_moves(moves[common:])
+        except (ValueError, TypeError, IndexError):
+            # Leave the game at a valid position for the next request
+            while len(history) > common:
+                self.game.unmake_move()
+            raise
+    
+    def _q_move(self, agent, valid_moves):
+        """Choose the greedy move of a Q-learning agent without changing its table.
+        
+        Args:
+            agent (QLearningAgent): Agent to ask
+            valid_moves (list): (row, col) moves available
+            
+        Returns:
+            tuple: (row, col) move, random among equally valued ones
+        """
+        board = self.game.board
+        state_key, frame, moves = agent.frame(board, valid_moves)
+        cached = agent.greedy.get(state_key)
+        if cached is not None:
+            move = random.choice(cached[1])
+        else:
+            actions = agent.q_table.get(state_key, {})
+            q_values = [actions.get(f"{row},{col}", 0.0) for row, col in moves]
+            max_q = max(q_values)
+            move = random.choice([move for move, q in zip(moves, q_values) if q == max_q])
+        return agent.from_frame(board, move, frame)
\ No newline at end of file
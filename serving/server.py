@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import OrderedDict, deque
+from serving.policy import GreedyPolicy, load_agents, position_key
+
+# HTTP status lines used by the server
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+class LatencyMetrics:
+    """Request latencies over a sliding window, plus cache and batch counters."""
+    
+    def __init__(self, window=10000):
+        """Initialize the metrics.
+        
+        Args:
+            window (int): Number of most recent latencies kept for percentiles
+        """
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.batched_positions = 0
+        self.started = time.time()
+    
+    def record(self, seconds):
+        """Record the latency of one request.
+        
+        Args:
+            seconds (float): Time from receiving the request to the response
+        """
+        self.requests += 1
+        self.latencies.append(seconds)
+    
+    def percentile(self, fraction):
+        """Get a latency percentile in milliseconds.
+        
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99
+            
+        Returns:
+            float: Latency in milliseconds (0 before the first request)
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+    
+    def snapshot(self):
+        """Get the current metrics.
+        
+        Returns:
+            dict: Counters and p50/p99 latencies
+        """
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'cache_hit_rate': self.cache_hits / self.requests if self.requests else 0.0,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_positions / self.batches if self.batches else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'uptime_s': round(time.time() - self.started, 1)
+        }
+
+class MoveServer:
+    """Asyncio HTTP/JSON server answering positions with the agents' greedy moves.
+    
+    Endpoints:
+        POST /move     {"moves": [[row, col], ...]} -> {"move": [row, col], "player": "X", "cached": false}
+        GET  /metrics  latency percentiles and counters
+        GET  /health   {"status": "ok"}
+    
+    Concurrent requests are collected for up to max_wait seconds (or until
+    max_batch of them are waiting) and answered by one GreedyPolicy call.
+    Answers are kept in an LRU cache keyed by position.
+    """
+    
+    def __init__(self, policy, max_batch=64, max_wait=0.002, cache_size=100000):
+        """Initialize the server.
+        
+        Args:
+            policy (GreedyPolicy): Policy answering positions
+            max_batch (int): Maximum number of positions per batch
+            max_wait (float): Time a batch waits for more requests, in seconds
+            cache_size (int): Number of positions kept in the LRU cache
+        """
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.metrics = LatencyMetrics()
+        self.pending = None
+    
+    async def choose(self, moves):
+        """Get the move for a position, from the cache or the next batch.
+        
+        Args:
+            moves (list): (row, col) moves starting with X
+            
+        Returns:
+            tuple: ((row, col) move, whether it came from the cache)
+            
+        Raises:
+            ValueError: If the position is invalid or the game is over
+        """
+        key = position_key(moves, self.policy.board_size)
+        move = self.cache.get(key)
+        if move is not None:
+            self.cache.move_to_end(key)
+            self.metrics.cache_hits += 1
+            return move, True
+        
+        future = asyncio.get_running_loop().create_future()
+        await self.pending.put((moves, future))
+        move = await future
+        
+        self.cache[key] = move
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return move, False
+    
+    async def batch_loop(self):
+        """Answer queued positions in batches, forever.
+        
+        The policy runs in a worker thread, so the event loop keeps accepting
+        requests while a batch is scored. Batches run one at a time, which
+        keeps the policy's scratch game single-threaded.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            answers = await loop.run_in_executor(None, self.policy.best_moves, [moves for moves, _ in batch])
+            self.metrics.batches += 1
+            self.metrics.batched_positions += len(batch)
+            for (_, future), answer in zip(batch, answers):
+                if future.done():
+                    continue
+                if isinstance(answer, Exception):
+                    future.set_exception(answer)
+                else:
+                    future.set_result(answer)
+    
+    async def handle_request(self, method, path, body):
+        """Route one HTTP request.
+        
+        Args:
+            method (str): HTTP method
+            path (str): Request path
+            body (bytes): Request body
+            
+        Returns:
+            tuple: (status code, JSON-serializable response)
+        """
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, dict(self.metrics.snapshot(), cache_size=len(self.cache))
+        if path != '/move':
+            return 404, {'error': f"Unknown path: {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+        
+        try:
+            moves = json.loads(body)['moves']
+            move, cached = await self.choose(moves)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': str(e) or type(e).__name__}
+        return 200, {'move': list(move), 'player': 'X' if len(moves) % 2 == 0 else 'O', 'cached': cached}
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, with keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                
+                status, response = await self.handle_request(method, path, body)
+                payload = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode('latin-1') + payload
+                )
+                await writer.drain()
+                
+                if path == '/move':
+                    self.metrics.record(time.perf_counter() - start)
+                    if status != 200:
+                        self.metrics.errors += 1
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self, host='127.0.0.1', port=8080, ready=None):
+        """Run the server until cancelled.
+        
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on
+            ready (asyncio.Event, optional): Set once the server accepts connections
+        """
+        self.pending = asyncio.Queue()
+        batcher = asyncio.create_task(self.batch_loop())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving moves on http://{host}:{port}/move")
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+def default_spec(player_symbol, models_dir='data/models'):
+    """Find the saved model to serve for a side.
+    
+    Args:
+        player_symbol (str): 'X' or 'O'
+        models_dir (str): Directory of saved models
+        
+    Returns:
+        str: Participant specification (see learning.arena)
+    """
+    shared = os.path.join(models_dir, 'shared_q.pkl')
+    if os.path.exists(shared):
+        return f"q:{shared}"
+    return f"q:{os.path.join(models_dir, f'agent_{player_symbol.lower()}.pkl')}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve greedy moves of trained agents over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--x_model', default=None,
+                        help="Agent playing X as 'kind:path' (default: shared or X Q-table in data/models)")
+    parser.add_argument('--o_model', default=None,
+                        help="Agent playing O as 'kind:path' (default: shared or O Q-table in data/models)")
+    parser.add_argument('--board_size', type=int, default=50, help='Size of the board')
+    parser.add_argument('--candidate_radius', type=int, default=2,
+                        help='Only consider moves within this distance of existing stones')
+    parser.add_argument('--max_batch', type=int, default=64, help='Maximum positions per batch')
+    parser.add_argument('--max_wait', type=float, default=2.0, help='Batch collection window (ms)')
+    parser.add_argument('--cache_size', type=int, default=100000, help='Positions kept in the LRU cache')
+    args = parser.parse_args()
+    
+    agents = load_agents(args.x_model or default_spec('X'), args.o_model or default_spec('O'),
+                         {'search_time': 0.1})
+    policy = GreedyPolicy(agents, args.board_size, args.candidate_radius)
+    server = MoveServer(policy, args.max_batch, args.max_wait / 1000, args.cache_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
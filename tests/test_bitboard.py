@@ -0,0 +1,87 @@
+import random
+import pytest
+from game.board import Board
+from game.bitboard import BitBoard
+
+# Board sizes and candidate radii the engines are compared on
+CONFIGS = [(7, 1), (9, 2), (15, 2), (20, 3)]
+
+def play_random_game(size, radius, rng, dense=False):
+    """Play the same random game on both engines, yielding after every move.
+    
+    Moves are drawn from the candidate moves, or from all empty cells when
+    dense, which packs stones together and makes wins frequent.
+    """
+    board, bitboard = Board(size, radius), BitBoard(size, radius)
+    player = 'X'
+    while board.check_winner() == ' ' and not board.is_full():
+        moves = board.get_valid_moves() if dense else sorted(board.get_candidate_moves())
+        row, col = rng.choice(moves)
+        assert board.make_move(row, col, player)
+        assert bitboard.make_move(row, col, player)
+        yield board, bitboard, (row, col, player)
+        player = 'O' if player == 'X' else 'X'
+
+def assert_same_position(board, bitboard):
+    assert bitboard.grid == board.grid
+    assert bitboard.get_state_key() == board.get_state_key()
+    assert bitboard.hash == board.hash
+    assert bitboard.move_count == board.move_count
+    assert bitboard.winner == board.winner
+    assert sorted(bitboard.get_candidate_moves()) == sorted(board.get_candidate_moves())
+    assert sorted(bitboard.get_valid_moves()) == sorted(board.get_valid_moves())
+
+@pytest.mark.parametrize('size, radius', CONFIGS)
+@pytest.mark.parametrize('seed', range(10))
+def test_win_detection_matches_board(size, radius, seed):
+    rng = random.Random(seed)
+    for dense in (False, True):
+        for board, bitboard, _ in play_random_game(size, radius, rng, dense):
+            expected = board.check_winner()
+            assert bitboard.check_winner() == expected
+            assert bitboard.winner == expected
+            for player in ('X', 'O'):
+                assert bitboard.can_win(player) == board.can_win(player)
+                assert bitboard.open_window_count(player) == board.open_window_count(player)
+
+@pytest.mark.parametrize('size, radius', CONFIGS)
+@pytest.mark.parametrize('seed', range(10))
+def test_candidate_moves_match_board(size, radius, seed):
+    rng = random.Random(seed)
+    for board, bitboard, _ in play_random_game(size, radius, rng):
+        assert_same_position(board, bitboard)
+
+@pytest.mark.parametrize('size, radius', CONFIGS)
+@pytest.mark.parametrize('seed', range(10))
+def test_unmake_restores_position(size, radius, seed):
+    rng = random.Random(seed)
+    positions = []
+    for board, bitboard, move in play_random_game(size, radius, rng, dense=seed % 2 == 1):
+        positions.append((move, bitboard.hash, bitboard.get_state_key(), bitboard.winner))
+    
+    while positions:
+        move, hash_, state_key, winner = positions.pop()
+        assert (bitboard.hash, bitboard.get_state_key(), bitboard.winner) == (hash_, state_key, winner)
+        assert bitboard.unmake_move() == move
+        assert board.unmake_move() == move
+        assert_same_position(board, bitboard)
+    assert bitboard.hash == 0 and bitboard.move_count == 0
+    assert bitboard.get_candidate_moves() == [(size // 2, size // 2)]
+
+def test_rejects_invalid_moves():
+    board = BitBoard(9, 2)
+    assert board.make_move(4, 4, 'X')
+    assert not board.make_move(4, 4, 'O')
+    assert not board.make_move(9, 0, 'O')
+    assert not board.make_move(0, -1, 'O')
+    assert board.move_count == 1 and len(board.history) == 1
+
+def test_no_wrap_across_rows():
+    # Stones at the end of one row and the start of the next are not a line
+    board = BitBoard(9, 2)
+    for row, col in ((0, 6), (0, 7), (0, 8), (1, 0), (1, 1)):
+        board.make_move(row, col, 'X')
+    assert board.check_winner() == ' '
+    board.make_move(0, 5, 'X')
+    board.make_move(0, 4, 'X')
+    assert board.check_winner() == 'X'
\ No newline at end of file
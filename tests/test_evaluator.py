@@ -0,0 +1,31 @@
+from learning.evaluator import Evaluator
+
+def feed(evaluator, scores):
+    plateaued = []
+    for score in scores:
+        evaluator._update_plateau(score)
+        plateaued.append(evaluator.plateaued)
+    return plateaued
+
+def test_plateau_after_patience_evaluations_without_improvement():
+    evaluator = Evaluator(patience=2, min_delta=0.01)
+    
+    # 0.505 is within min_delta of the best; 0.6 improves and restarts the count
+    assert feed(evaluator, [0.5, 0.505, 0.6, 0.6, 0.61]) == [False, False, False, False, True]
+    assert evaluator.best == 0.6
+    assert evaluator.stale == 2
+
+def test_reset_forgets_the_best_score():
+    evaluator = Evaluator(patience=1)
+    feed(evaluator, [0.8, 0.7])
+    assert evaluator.plateaued
+    
+    evaluator.reset()
+    assert (evaluator.best, evaluator.stale, evaluator.plateaued) == (None, 0, False)
+    assert feed(evaluator, [0.3]) == [False]
+    assert evaluator.best == 0.3
+
+def test_no_plateau_without_patience():
+    evaluator = Evaluator()
+    assert feed(evaluator, [0.5] * 10) == [False] * 10
+    assert evaluator.stale == 9
\ No newline at end of file
@@ -0,0 +1,84 @@
+from game.game import TicTacToe
+from agents.q_learning_agent import QLearningAgent
+from agents.frozen_q_agent import SnapshotChain, FrozenQAgent
+from learning.league import League
+
+def position(moves):
+    game = TicTacToe(9, candidate_radius=1)
+    game.reset()
+    game.apply_moves(moves)
+    return game.get_state()
+
+FIRST = position([(4, 4), (0, 0)])
+SECOND = position([(4, 4), (0, 0), (4, 5), (0, 1)])
+
+def reward(agent, state, action, value):
+    """Teach the agent that an action ends the game with the given reward."""
+    agent.learn(state, action, value, dict(state, is_terminal=True))
+
+def value(agent, state, action):
+    return agent.get_q_value(agent.state_key(state['board']), action)
+
+def test_snapshots_keep_the_values_they_were_taken_with():
+    agent = QLearningAgent('X')
+    league = League(pool_size=5, seed=0)
+    reward(agent, FIRST, (4, 5), 1.0)
+    
+    league.snapshot([agent])
+    oldest = league.pools['X'][0]
+    assert isinstance(oldest, FrozenQAgent)
+    reward(agent, FIRST, (4, 5), 1.0)
+    
+    league.snapshot([agent])
+    newer = league.pools['X'][1]
+    reward(agent, SECOND, (4, 6), -1.0)
+    
+    assert value(oldest, FIRST, (4, 5)) == 0.1
+    assert value(newer, FIRST, (4, 5)) == value(agent, FIRST, (4, 5)) == 0.1 + 0.1 * 0.9
+    assert value(oldest, SECOND, (4, 6)) == value(newer, SECOND, (4, 6)) == 0.0
+    assert value(agent, SECOND, (4, 6)) == -0.1
+    
+    # Only the changed states are copied, each by the snapshot newest at the time
+    assert [len(frozen.snapshot) for frozen in league.pools['X']] == [1, 1]
+    assert league.preimage_count() == 2
+
+def test_dropped_snapshots_hand_their_preimages_to_older_ones():
+    q_table = {'a': {'0,0': 1.0}}
+    chain = SnapshotChain(q_table)
+    oldest, middle = chain.snapshot(), chain.snapshot()
+    
+    chain.before_write('a')
+    q_table['a'] = {'0,0': 2.0}
+    newest = chain.snapshot()
+    chain.before_write('a')
+    q_table['a'] = {'0,0': 3.0}
+    
+    middle.release()
+    assert oldest.actions('a') == {'0,0': 1.0}
+    assert newest.actions('a') == {'0,0': 2.0}
+    assert chain.newest is newest and newest.older is oldest and oldest.newer is newest
+    
+    newest.release()
+    assert chain.newest is oldest
+    assert oldest.actions('a') == {'0,0': 1.0}
+
+def test_pool_drops_the_oldest_snapshot():
+    agent = QLearningAgent('X')
+    league = League(pool_size=2, seed=0)
+    for _ in range(3):
+        league.snapshot([agent])
+        reward(agent, FIRST, (4, 5), 1.0)
+    
+    pool = league.pools['X']
+    assert len(pool) == 2
+    assert value(pool[0], FIRST, (4, 5)) == 0.1
+    assert pool[0].snapshot.older is None
+
+def test_pairing_uses_frozen_opponents():
+    agent_x, agent_o = QLearningAgent('X'), QLearningAgent('O')
+    league = League(opponent_rate=1.0, seed=0)
+    assert league.pairing(agent_x, agent_o) == (agent_x, agent_o)
+    
+    league.snapshot([agent_x])
+    x, o = league.pairing(agent_x, agent_o)
+    assert x is league.pools['X'][0] and o is agent_o
\ No newline at end of file
@@ -0,0 +1,25 @@
+import pytest
+from game.game import TicTacToe
+from agents.q_learning_agent import QLearningAgent
+from agents.shared_q_table import SharedQTable
+from learning.parallel import train_parallel
+
+def test_workers_update_one_shared_table():
+    backend = SharedQTable(1 << 16)
+    try:
+        agents = [QLearningAgent(symbol, normalize_perspective=True, backend=backend) for symbol in ('X', 'O')]
+        game = TicTacToe(9, candidate_radius=1, max_plies=20)
+        
+        totals = train_parallel(agents[0], agents[1], game, 7, workers=2)
+        
+        assert totals['games'] == 7
+        assert totals['x_wins'] + totals['o_wins'] + totals['draws'] == 7
+        assert len(backend) > 0
+        assert all(agent.episode_count == 7 and agent.epsilon < 1.0 for agent in agents)
+    finally:
+        backend.close()
+
+def test_needs_one_shared_backend():
+    game = TicTacToe(9)
+    with pytest.raises(ValueError):
+        train_parallel(QLearningAgent('X'), QLearningAgent('O'), game, 4, workers=2)
\ No newline at end of file
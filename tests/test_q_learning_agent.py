@@ -0,0 +1,63 @@
+from game.game import TicTacToe
+from agents.q_learning_agent import QLearningAgent
+
+# X has four in a row on row 4, O has stones on row 0; X is to move
+OPENING = [(4, 0), (0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3)]
+
+def position(moves):
+    game = TicTacToe(9, candidate_radius=1)
+    game.reset()
+    game.apply_moves(moves)
+    return game.get_state()
+
+def shared_agents():
+    q_table, greedy = {}, {}
+    return [QLearningAgent(symbol, q_table=q_table, normalize_perspective=True, greedy_cache=greedy)
+            for symbol in ('X', 'O')]
+
+def test_shared_table_negamax_target():
+    agent_x, agent_o = shared_agents()
+    before = position(OPENING)
+    after = position(OPENING + [(0, 6)])
+    
+    # X learns that (4, 4) wins where O has just played (0, 6)
+    agent_x.learn(after, (4, 4), 1.0, dict(after, is_terminal=True))
+    assert agent_x.get_q_value(agent_x.state_key(after['board']), (4, 4)) == 0.1
+    
+    # O's move into that position is worth minus X's best value there
+    agent_o.learn(before, (0, 6), 0.0, after)
+    value = agent_o.get_q_value(agent_o.state_key(before['board']), (0, 6))
+    assert abs(value - 0.1 * 0.9 * -0.1) < 1e-12
+
+def test_perspective_keys_swap_for_o():
+    agent_x, agent_o = shared_agents()
+    board = position(OPENING)['board']
+    assert agent_o.state_key(board) == agent_x.state_key(board).translate(str.maketrans('XO', 'OX'))
+    assert agent_o.state_key(board, 'X') == agent_x.state_key(board)
+
+def test_scans_store_no_zero_entries():
+    agent = QLearningAgent('X', epsilon_start=0.0, epsilon_end=0.0)
+    state = position(OPENING[:4])
+    agent.choose_action(state)
+    assert agent.q_table == {} and agent.greedy == {}
+    
+    # A move whose target is 0.0 changes nothing that needs storing
+    after = position(OPENING[:5])
+    agent.learn(state, (4, 2), 0.0, after)
+    assert agent.q_table == {}
+
+def test_greedy_cache_follows_updates():
+    agent = QLearningAgent('X', epsilon_start=0.0, epsilon_end=0.0)
+    state = position(OPENING[:4])
+    terminal = dict(position(OPENING[:5]), is_terminal=True)
+    agent.learn(state, (4, 2), 1.0, terminal)
+    assert agent.choose_action(state) == (4, 2)
+    key = agent.state_key(state['board'])
+    assert agent.greedy[key] == [0.1, [(4, 2)]]
+    
+    # Once the only best move turns negative, every unstored move is best again
+    for _ in range(3):
+        agent.learn(state, (4, 2), -1.0, terminal)
+    best_value, best_moves = agent.best_actions(key, state['valid_moves'])
+    assert best_value == 0.0
+    assert sorted(best_moves) == sorted(move for move in state['valid_moves'] if move != (4, 2))
\ No newline at end of file
@@ -0,0 +1,30 @@
+import pickle
+from agents.q_table_stats import inspect_file, inspect_table
+
+# Relative keys: bounding box of the stones, actions relative to its corner
+RELATIVE_TABLE = {
+    '1,1:X': {'-2,3': 0.5, '-1,-1': 0.0, '0,1': -0.25},
+    '1,2:XO': {'-3,0': 0.125}
+}
+
+def save(tmp_path, q_table):
+    path = tmp_path / 'agent.pkl'
+    with open(path, 'wb') as f:
+        pickle.dump({'q_table': q_table, 'relative': True, 'episode_count': 10}, f)
+    return path
+
+def test_streamed_report_counts_relative_actions(tmp_path):
+    path = save(tmp_path, RELATIVE_TABLE)
+    streamed = inspect_file(path)
+    loaded = inspect_file(path, stream=False)
+    
+    assert streamed['states'] == loaded['states'] == 2
+    assert streamed['entries'] == loaded['entries'] == 4
+    assert streamed['zero_fraction'] == loaded['zero_fraction'] == 0.25
+    assert streamed['episode'] == 10
+
+def test_table_report_counts_relative_actions():
+    report = inspect_table(RELATIVE_TABLE)
+    assert report['states'] == 2
+    assert report['entries'] == 4
+    assert report['zero_fraction'] == 0.25
\ No newline at end of file
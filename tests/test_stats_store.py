@@ -0,0 +1,73 @@
+import sqlite3
+import pytest
+from game.game import TicTacToe
+from agents.random_agent import RandomAgent
+from learning.stats_store import RollingWindow, StatsStore
+from learning.trainer import Trainer
+
+def test_rolling_window_drops_oldest_episodes():
+    window = RollingWindow(size=3)
+    for winner, plies in (('X', 10), ('O', 20), (None, 30), ('X', 40)):
+        window.add(winner, plies)
+    
+    assert window.summary() == {'games': 3, 'x_wins': 1, 'o_wins': 1, 'draws': 1, 'game_lengths': 30.0}
+
+def test_empty_rolling_window():
+    assert RollingWindow().summary() == {'games': 0, 'x_wins': 0, 'o_wins': 0, 'draws': 0, 'game_lengths': 0.0}
+
+def test_record_summarizes_blocks():
+    store = StatsStore(interval=2, window=3)
+    summaries = [store.record(episode, winner, plies, 0.01, 0.5, 0.4)
+                 for episode, (winner, plies) in enumerate((('X', 10), ('O', 20), ('X', 30), (None, 40)), 1)]
+    
+    assert summaries[0] is None and summaries[2] is None
+    assert summaries[3]['rolling'] == store.rolling()
+    assert store.rolling()['games'] == 3
+    assert list(store.blocks()) == [
+        {'episode': 2, 'games': 2, 'x_wins': 1, 'o_wins': 1, 'draws': 0, 'game_lengths': 15.0,
+         'x_epsilon': 0.5, 'o_epsilon': 0.4, 'q_states': None},
+        {'episode': 4, 'games': 2, 'x_wins': 1, 'o_wins': 0, 'draws': 1, 'game_lengths': 35.0,
+         'x_epsilon': 0.5, 'o_epsilon': 0.4, 'q_states': None}
+    ]
+    store.close()
+
+def test_episodes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    store = StatsStore(path, batch_size=3, flush_interval=float('inf'))
+    
+    def committed():
+        with sqlite3.connect(path) as connection:
+            return connection.execute('SELECT COUNT(*) FROM episodes').fetchone()[0]
+    
+    for episode in range(1, 3):
+        store.record(episode, 'X', 10, 0.01, 1.0, 1.0)
+    assert committed() == 0
+    store.record(3, 'X', 10, 0.01, 1.0, 1.0)
+    assert committed() == 3
+    store.record(4, 'X', 10, 0.01, 1.0, 1.0)
+    store.close()
+    assert committed() == 4
+
+def test_runs_share_a_database(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    first = StatsStore(path, interval=1)
+    first.record(1, 'X', 10, 0.01, 1.0, 1.0)
+    first.close()
+    
+    second = StatsStore(path, interval=1)
+    second.record(1, 'O', 12, 0.01, 1.0, 1.0)
+    assert second.run == first.run + 1
+    assert [block['o_wins'] for block in second.blocks()] == [1]
+    assert [block['x_wins'] for block in second.blocks(first.run)] == [1]
+    second.close()
+
+def test_trainer_stats_lists_blocks():
+    game = TicTacToe(9, max_plies=10)
+    trainer = Trainer(game, RandomAgent('X'), RandomAgent('O'), stats_store=StatsStore(interval=2))
+    trainer.train(4, display_interval=5)
+    
+    stats = trainer.stats
+    assert stats['episode'] == [2, 4]
+    assert [x + o + d for x, o, d in zip(stats['x_wins'], stats['o_wins'], stats['draws'])] == [2, 2]
+    with pytest.raises(AttributeError):
+        trainer.stats = {}
\ No newline at end of file
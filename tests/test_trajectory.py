@@ -0,0 +1,62 @@
+import pytest
+from game.game import TicTacToe
+from learning.trajectory import Trajectory
+
+# X completes row 4 on the ninth move; O plays along row 0
+MOVES = [(4, 0), (0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3), (0, 6), (4, 4)]
+REWARDS = {'X': 1.0, 'O': -1.0}
+
+def new_game():
+    game = TicTacToe(9, candidate_radius=1)
+    game.reset()
+    return game
+
+def record(moves):
+    game = new_game()
+    trajectory = Trajectory()
+    for row, col in moves:
+        trajectory.record(game.current_player, (row, col), game.board.hash)
+        game.play(row, col)
+    return game, trajectory
+
+def board_key(moves):
+    game = new_game()
+    game.apply_moves(moves)
+    return game.board.get_state_key()
+
+def test_replay_rebuilds_each_transition():
+    game, trajectory = record(MOVES)
+    final_state = game.get_state()
+    
+    replayed = []
+    for player, state, action, reward, next_state in trajectory.transitions(
+            new_game(), new_game(), final_state, REWARDS):
+        # States are only valid until the next transition is requested
+        replayed.append((player, state['board'].get_state_key(), state['current_player'], action,
+                         reward, next_state is final_state or next_state['board'].get_state_key()))
+    
+    assert len(replayed) == len(MOVES)
+    for t, (player, key, to_move, action, reward, after) in enumerate(replayed):
+        assert player == to_move == ('X' if t % 2 == 0 else 'O')
+        assert key == board_key(MOVES[:t])
+        assert action == MOVES[t]
+        if t >= len(MOVES) - 2:
+            # Each player's last move leads to the final state with the game's reward
+            assert (reward, after) == (REWARDS[player], True)
+        else:
+            assert (reward, after) == (0, board_key(MOVES[:t + 1]))
+
+def test_empty_trajectory_yields_nothing():
+    assert list(Trajectory().transitions(new_game(), new_game(), new_game().get_state(), REWARDS)) == []
+
+def test_replay_detects_divergence():
+    game, trajectory = record(MOVES)
+    trajectory.hashes[3] ^= 1
+    
+    with pytest.raises(RuntimeError):
+        list(trajectory.transitions(new_game(), new_game(), game.get_state(), REWARDS))
+
+def test_clear_forgets_moves():
+    _, trajectory = record(MOVES[:3])
+    trajectory.clear()
+    assert len(trajectory) == 0
\ No newline at end of file
@@ -1,4 +1,6 @@
 import pygame
+from game.game import TicTacToe
+from ui.viewer import EVENT_RESET, EVENT_MOVE, EVENT_END
 
 class GameRenderer:
     """Renders the tic-tac-toe game using Pygame."""
@@ -20,6 +22,9 @@ class GameRenderer:
         self.scroll_x = 0
         self.scroll_y = 0      # Track scroll position for large board
         
+        # Local copy of the game, rebuilt from events when used as a viewer
+        self.game = None
+        
         # Colors
         self.bg_color = (240, 240, 240)
         self.line_color = (50, 50, 50)
@@ -33,12 +38,31 @@ class GameRenderer:
         self.font = pygame.font.SysFont('Arial', 24)
         self.large_font = pygame.font.SysFont('Arial', 32)
     
-    def render(self, game):
+    def render(self, game=None):
         """Render the game.
         
         Args:
-            game (TicTacToe): The game instance
+            game (TicTacToe, optional): The game instance; defaults to the game
+                rebuilt from events
         """
+        self.draw(game)
+        
+        # Update the display
+        pygame.display.flip()
+    
+    def draw(self, game=None):
+        """Draw the game onto the screen surface without updating the display.
+        
+        Args:
+            game (TicTacToe, optional): The game instance; defaults to the game
+                rebuilt from events
+        """
+        if game is None:
+            game = self.game
+        
+        # Fit the grid to the board
+        self._fit_board(game.board.size)
+        
         # Clear screen
         self.screen.fill(self.bg_color)
         
@@ -50,12 +74,40 @@ class GameRenderer:
         
         # Draw game status
         self._draw_status(game)
+    
+    def handle_event(self, event):
+        """Update the local copy of the game from a viewer event.
         
-        # Update the display
-        pygame.display.flip()
+        Args:
+            event (tuple): Event published by the training process
+        """
+        if event[0] == EVENT_RESET:
+            self.game = TicTacToe(event[1])
+        elif self.game is None:
+            # Joined in the middle of a game; wait for the next one
+            return
+        elif event[0] == EVENT_MOVE:
+            _, row, col, player = event
+            self.game.board.make_move(row, col, player)
+            self.game.move_history.append((row, col, player))
+            self.game.current_player = 'O' if player == 'X' else 'X'
+        elif event[0] == EVENT_END:
+            _, winner, is_draw = event
+            self.game.winner = winner
+            self.game.is_draw = is_draw
+    
+    def _fit_board(self, size):
+        """Size the cells so a board of the given size fills the display area.
+        
+        Args:
+            size (int): Size of the board
+        """
+        if size != self.visible_cells:
+            self.visible_cells = size
+            self.cell_size = max(1, self.board_size // size)
     
     def _draw_board(self):
-        """Draw the tic-tac-toe grid for a 50x50 board."""
+        """Draw the tic-tac-toe grid."""
         # Draw board background
         board_rect = pygame.Rect(
             self.board_pos[0], self.board_pos[1], 
@@ -87,19 +139,16 @@ class GameRenderer:
         Args:
             game (TicTacToe): The game instance
         """
-        for row in range(50):
-            for col in range(50):
-                cell_value = game.board.grid[row][col]
-                if cell_value != ' ':
-                    center_x = self.board_pos[0] + col * self.cell_size + self.cell_size // 2
-                    center_y = self.board_pos[1] + row * self.cell_size + self.cell_size // 2
-                    
-                    if center_x >= self.board_pos[0] and center_x < self.board_pos[0] + self.board_size and \
-                       center_y >= self.board_pos[1] and center_y < self.board_pos[1] + self.board_size:
-                        if cell_value == 'X':
-                            self._draw_x(center_x, center_y)
-                        else:  # 'O'
-                            self._draw_o(center_x, center_y)
+        for row, col, cell_value in game.move_history:
+            center_x = self.board_pos[0] + col * self.cell_size + self.cell_size // 2
+            center_y = self.board_pos[1] + row * self.cell_size + self.cell_size // 2
+            
+            if center_x >= self.board_pos[0] and center_x < self.board_pos[0] + self.board_size and \
+               center_y >= self.board_pos[1] and center_y < self.board_pos[1] + self.board_size:
+                if cell_value == 'X':
+                    self._draw_x(center_x, center_y)
+                else:  # 'O'
+                    self._draw_o(center_x, center_y)
     
     def _draw_x(self, center_x, center_y):
         """Draw an X symbol.
@@ -0,0 +1,163 @@
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from ui.renderer import GameRenderer
+from ui.viewer import EVENT_RESET, EVENT_MOVE, EVENT_END
+
+# Size of one rendered frame: the board area plus the status line below it
+FRAME_SIZE = (600, 620)
+
+def load_games(filepath):
+    """Load recorded games from a game log.
+    
+    Args:
+        filepath (str): JSON lines file written by Trainer
+    
+    Returns:
+        list: Game records with 'episode', 'board_size', 'moves', 'winner' and 'is_draw'
+    """
+    games = []
+    with open(filepath) as f:
+        for line in f:
+            if line.strip():
+                games.append(json.loads(line))
+    return games
+
+def _init_worker():
+    """Prepare a worker process for offscreen rendering."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.init()
+
+def _replay_events(record):
+    """Turn a game record into the event stream understood by GameRenderer.
+    
+    Args:
+        record (dict): Game record
+    
+    Yields:
+        tuple: Viewer events
+    """
+    yield (EVENT_RESET, record['board_size'])
+    for row, col, player in record['moves']:
+        yield (EVENT_MOVE, row, col, player)
+    yield (EVENT_END, record['winner'], record['is_draw'])
+
+def _snapshot_plies(num_moves, every):
+    """Get the ply numbers to draw for a game.
+    
+    Args:
+        num_moves (int): Number of moves in the game
+        every (int): Draw every N-th ply
+    
+    Returns:
+        list: Ply numbers, always including the final position
+    """
+    plies = list(range(0, num_moves + 1, every))
+    if plies[-1] != num_moves:
+        plies.append(num_moves)
+    return plies
+
+def render_game(record, out_dir, mode='frames', every=1, columns=4, thumb_scale=0.5):
+    """Render one recorded game to PNG files.
+    
+    Args:
+        record (dict): Game record
+        out_dir (str): Directory for the images
+        mode (str): 'frames' for one PNG per snapshot, 'sheet' for a single contact sheet
+        every (int): Draw every N-th ply
+        columns (int): Number of thumbnails per contact sheet row
+        thumb_scale (float): Thumbnail size relative to a full frame
+    
+    Returns:
+        list: Paths of the written files
+    """
+    surface = pygame.Surface(FRAME_SIZE)
+    renderer = GameRenderer(surface)
+    name = f"game_{record['episode']:08d}"
+    
+    plies = _snapshot_plies(len(record['moves']), every)
+    wanted = set(plies)
+    frames = []
+    
+    for ply, event in enumerate(_replay_events(record)):
+        renderer.handle_event(event)
+        # Event 0 is the reset, event i is move i, the final event is the result
+        if ply in wanted and ply < len(record['moves']):
+            renderer.draw()
+            frames.append((ply, surface.copy()))
+    
+    # The final frame shows the result
+    renderer.draw()
+    frames.append((len(record['moves']), surface.copy()))
+    
+    paths = []
+    if mode == 'frames':
+        game_dir = os.path.join(out_dir, name)
+        os.makedirs(game_dir, exist_ok=True)
+        for ply, frame in frames:
+            path = os.path.join(game_dir, f"ply_{ply:04d}.png")
+            pygame.image.save(frame, path)
+            paths.append(path)
+    else:
+        thumb_size = (int(FRAME_SIZE[0] * thumb_scale), int(FRAME_SIZE[1] * thumb_scale))
+        rows = (len(frames) + columns - 1) // columns
+        sheet = pygame.Surface((thumb_size[0] * min(columns, len(frames)), thumb_size[1] * rows))
+        sheet.fill(renderer.bg_color)
+        for i, (ply, frame) in enumerate(frames):
+            thumb = pygame.transform.smoothscale(frame, thumb_size)
+            sheet.blit(thumb, ((i % columns) * thumb_size[0], (i // columns) * thumb_size[1]))
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{name}.png")
+        pygame.image.save(sheet, path)
+        paths.append(path)
+    
+    return paths
+
+def _render_game_job(args):
+    """Process pool entry point for render_game."""
+    record, out_dir, mode, every = args
+    return render_game(record, out_dir, mode, every)
+
+def render_games(games, out_dir, mode='frames', every=1, workers=None):
+    """Render many recorded games in parallel.
+    
+    Args:
+        games (list): Game records
+        out_dir (str): Directory for the images
+        mode (str): 'frames' or 'sheet'
+        every (int): Draw every N-th ply
+        workers (int, optional): Number of worker processes (default: CPU count)
+    
+    Returns:
+        list: Paths of all written files
+    """
+    jobs = [(record, out_dir, mode, every) for record in games]
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for game_paths in pool.map(_render_game_job, jobs):
+            paths.extend(game_paths)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Render recorded games to PNG images offscreen')
+    parser.add_argument('game_log', help='JSON lines game log written during training')
+    parser.add_argument('--out', default='data/replays', help='Output directory')
+    parser.add_argument('--mode', choices=['frames', 'sheet'], default='sheet',
+                        help='One PNG per position, or one contact sheet per game')
+    parser.add_argument('--every', type=int, default=1, help='Render every N-th ply')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--episodes', type=int, nargs='*', help='Only render these episodes')
+    args = parser.parse_args()
+    
+    games = load_games(args.game_log)
+    if args.episodes:
+        wanted = set(args.episodes)
+        games = [record for record in games if record['episode'] in wanted]
+    
+    paths = render_games(games, args.out, args.mode, max(1, args.every), args.workers)
+    print(f"Rendered {len(games)} games to {len(paths)} images in {args.out}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
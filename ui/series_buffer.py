@@ -0,0 +1,100 @@
+class SeriesBuffer:
+    """Fixed-width, min/max preserving summary of a growing data series.
+    
+    Points are grouped into buckets that each cover the same number of
+    consecutive samples. A bucket keeps its first, last, lowest and highest
+    value, so spikes survive downsampling. The buffer never holds more than
+    ``capacity`` buckets: it first spreads the points over more slots and,
+    once every slot is used, merges neighbouring buckets pairwise and
+    doubles the bucket span. Both events are rare (logarithmic in the
+    number of points), so appending costs O(1) amortized no matter how long
+    the series grows.
+    """
+    
+    def __init__(self, capacity, initial_slots=8):
+        """Initialize an empty buffer.
+        
+        Args:
+            capacity (int): Maximum number of buckets, usually the graph width in pixels
+            initial_slots (int): Number of slots used before the first rescale
+        """
+        self.capacity = max(2, capacity)
+        self.initial_slots = max(2, min(initial_slots, self.capacity))
+        self.reset()
+    
+    def reset(self):
+        """Remove all points from the buffer."""
+        self.slots = self.initial_slots
+        self.bucket_span = 1
+        self.buckets = []  # [first, last, low, high]
+        self.fill = 0      # Number of samples in the last bucket
+        self.count = 0     # Total number of samples appended
+    
+    def append(self, value):
+        """Append a sample to the series.
+        
+        Args:
+            value (float): Sample value
+        
+        Returns:
+            bool: True if the layout changed (slots rescaled or buckets merged),
+                meaning anything drawn from the previous layout is stale
+        """
+        self.count += 1
+        
+        relayout = False
+        if len(self.buckets) == self.slots and self.fill == self.bucket_span:
+            if self.slots < self.capacity:
+                self.slots = min(self.slots * 2, self.capacity)
+            else:
+                self._merge()
+            relayout = True
+        
+        if self.buckets and self.fill < self.bucket_span:
+            # Grow the last bucket while it still has room
+            bucket = self.buckets[-1]
+            bucket[1] = value
+            if value < bucket[2]:
+                bucket[2] = value
+            if value > bucket[3]:
+                bucket[3] = value
+            self.fill += 1
+        else:
+            self.buckets.append([value, value, value, value])
+            self.fill = 1
+        
+        return relayout
+    
+    def _merge(self):
+        """Merge neighbouring buckets pairwise and double the bucket span."""
+        merged = []
+        for i in range(0, len(self.buckets) - 1, 2):
+            left, right = self.buckets[i], self.buckets[i + 1]
+            merged.append([left[0], right[1], min(left[2], right[2]), max(left[3], right[3])])
+        
+        if len(self.buckets) % 2:
+            # Odd bucket out keeps its samples and accepts more
+            merged.append(self.buckets[-1])
+            self.fill = self.bucket_span
+        else:
+            self.fill = self.bucket_span * 2
+        
+        self.buckets = merged
+        self.bucket_span *= 2
+    
+    def x_position(self, index, left, width):
+        """Map a bucket index to a horizontal screen coordinate.
+        
+        Args:
+            index (int): Bucket index
+            left (float): Left edge of the plotting area
+            width (float): Width of the plotting area
+        
+        Returns:
+            float: Screen x coordinate
+        """
+        return left + index * (width - 1) / (self.slots - 1)
+    
+    def __len__(self):
+        """Get the number of buckets currently held."""
+        return len(self.buckets)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pygame
-import numpy as np
+from ui.series_buffer import SeriesBuffer
+from ui.viewer import EVENT_STATS
 
 class StatsDisplay:
     """Displays statistics about the training process."""
@@ -30,20 +31,120 @@ class StatsDisplay:
         self.font = pygame.font.SysFont('Arial', 16)
         self.title_font = pygame.font.SysFont('Arial', 20)
         
+        # Graph areas
+        self.win_rate_rect = pygame.Rect(
+            self.stats_area_pos[0] + 10, self.stats_area_pos[1] + 40,
+            self.stats_area_size[0] - 20, 150
+        )
+        self.epsilon_rect = pygame.Rect(
+            self.stats_area_pos[0] + 10, self.stats_area_pos[1] + 230,
+            self.stats_area_size[0] - 20, 120
+        )
+        
+        # Downsampled series, one bucket per pixel column of their graph
+        self.series = {
+            'x_wins': SeriesBuffer(self.win_rate_rect.width),
+            'o_wins': SeriesBuffer(self.win_rate_rect.width),
+            'draws': SeriesBuffer(self.win_rate_rect.width),
+            'x_epsilon': SeriesBuffer(self.epsilon_rect.width),
+            'o_epsilon': SeriesBuffer(self.epsilon_rect.width)
+        }
+        self.graphs = {
+            'win_rate': {
+                'rect': self.win_rate_rect,
+                'series': [('x_wins', self.x_color), ('o_wins', self.o_color), ('draws', self.draw_color)],
+                'surface': None
+            },
+            'epsilon': {
+                'rect': self.epsilon_rect,
+                'series': [('x_epsilon', self.x_color), ('o_epsilon', self.o_color)],
+                'surface': None
+            }
+        }
+        
         # Stats data
         self.stats = None
+        self.latest = None
+        self.last_episode = None
     
     def update(self, stats):
         """Update the statistics data.
         
+        Only the data points recorded since the previous call are processed,
+        so the cost of an update does not grow with the length of the run.
+        
         Args:
             stats (dict): Training statistics
         """
         self.stats = stats
+        episodes = stats['episode']
+        if not episodes:
+            return
+        
+        if self.last_episode is not None and episodes[-1] < self.last_episode:
+            # A new run started; drop everything plotted so far
+            self.reset()
+        
+        # Walk back to the first point we have not seen yet
+        first_new = len(episodes)
+        while first_new > 0 and (self.last_episode is None or episodes[first_new - 1] > self.last_episode):
+            first_new -= 1
+        
+        for i in range(first_new, len(episodes)):
+            self.add_point({key: values[i] for key, values in stats.items()})
+    
+    def add_point(self, record):
+        """Append one statistics record to the graphs.
+        
+        Args:
+            record (dict): Values for one reporting interval, with the same keys
+                as the training statistics; 'games' gives the number of games
+                the win counts cover (100 if missing), and the optional
+                'rolling' the aggregates of the store's rolling window
+        """
+        total_games = record.get('games', 100) or 1
+        values = {
+            'x_wins': record['x_wins'] / total_games * 100,
+            'o_wins': record['o_wins'] / total_games * 100,
+            'draws': record['draws'] / total_games * 100,
+            'x_epsilon': record['x_epsilon'] * 100,
+            'o_epsilon': record['o_epsilon'] * 100
+        }
+        
+        for graph in self.graphs.values():
+            relayout = False
+            for name, _ in graph['series']:
+                relayout = self.series[name].append(values[name]) or relayout
+            
+            if graph['surface'] is None or relayout:
+                graph['surface'] = None  # Redrawn in full on the next render
+            else:
+                self._draw_last_segment(graph)
+        
+        self.latest = record
+        self.last_episode = record['episode']
+    
+    def handle_event(self, event):
+        """Consume a viewer event.
+        
+        Args:
+            event (tuple): Event published by the training process
+        """
+        if event[0] == EVENT_STATS:
+            self.add_point(event[1])
+    
+    def reset(self):
+        """Forget all plotted data."""
+        for series in self.series.values():
+            series.reset()
+        for graph in self.graphs.values():
+            graph['surface'] = None
+        self.latest = None
+        self.last_episode = None
     
     def render(self):
         """Render the statistics display."""
-        if not self.stats or not self.stats['episode']:
+        if self.latest is None:
             # No data to display yet
             return
         
@@ -70,52 +171,21 @@ class StatsDisplay:
     
     def _draw_win_rate_graph(self):
         """Draw a graph of win rates over time."""
-        graph_rect = pygame.Rect(
-            self.stats_area_pos[0] + 10, self.stats_area_pos[1] + 40,
-            self.stats_area_size[0] - 20, 150
-        )
-        
-        # Draw graph background and border
-        pygame.draw.rect(self.screen, (248, 248, 248), graph_rect)
-        pygame.draw.rect(self.screen, self.line_color, graph_rect, 1)
+        graph_rect = self.win_rate_rect
         
         # Draw title
         title = self.font.render("Win Rates (last 100 games)", True, self.text_color)
         self.screen.blit(title, (graph_rect.left, graph_rect.top - 20))
         
-        # Get data
-        episodes = self.stats['episode']
-        x_wins = self.stats['x_wins']
-        o_wins = self.stats['o_wins']
-        draws = self.stats['draws']
-        
-        if not episodes:
-            return
-        
-        # Calculate total games and percentages
-        total_games = 100  # Each data point represents 100 games
-        x_percentages = [x / total_games * 100 for x in x_wins]
-        o_percentages = [o / total_games * 100 for o in o_wins]
-        draw_percentages = [d / total_games * 100 for d in draws]
+        # Draw cached plot
+        self.screen.blit(self._get_graph_surface(self.graphs['win_rate']), graph_rect.topleft)
         
-        # Draw grid lines
+        # Draw y-axis labels
         for i in range(0, 101, 20):
             y = graph_rect.bottom - (i / 100 * graph_rect.height)
-            pygame.draw.line(
-                self.screen, self.line_color,
-                (graph_rect.left, y), (graph_rect.right, y),
-                1
-            )
-            
-            # Draw y-axis labels
             label = self.font.render(f"{i}%", True, self.text_color)
             self.screen.blit(label, (graph_rect.left - 30, y - 8))
         
-        # Draw data points and lines
-        self._draw_line(graph_rect, episodes, x_percentages, self.x_color)
-        self._draw_line(graph_rect, episodes, o_percentages, self.o_color)
-        self._draw_line(graph_rect, episodes, draw_percentages, self.draw_color)
-        
         # Draw legend
         legend_x = graph_rect.left
         legend_y = graph_rect.bottom + 10
@@ -139,44 +209,21 @@ class StatsDisplay:
     
     def _draw_epsilon_graph(self):
         """Draw a graph of exploration rates over time."""
-        graph_rect = pygame.Rect(
-            self.stats_area_pos[0] + 10, self.stats_area_pos[1] + 230,
-            self.stats_area_size[0] - 20, 120
-        )
-        
-        # Draw graph background and border
-        pygame.draw.rect(self.screen, (248, 248, 248), graph_rect)
-        pygame.draw.rect(self.screen, self.line_color, graph_rect, 1)
+        graph_rect = self.epsilon_rect
         
         # Draw title
         title = self.font.render("Exploration Rate (ε)", True, self.text_color)
         self.screen.blit(title, (graph_rect.left, graph_rect.top - 20))
         
-        # Get data
-        episodes = self.stats['episode']
-        x_epsilons = self.stats['x_epsilon']
-        o_epsilons = self.stats['o_epsilon']
+        # Draw cached plot
+        self.screen.blit(self._get_graph_surface(self.graphs['epsilon']), graph_rect.topleft)
         
-        if not episodes:
-            return
-        
-        # Draw grid lines
+        # Draw y-axis labels
         for i in range(0, 101, 20):
             y = graph_rect.bottom - (i / 100 * graph_rect.height)
-            pygame.draw.line(
-                self.screen, self.line_color,
-                (graph_rect.left, y), (graph_rect.right, y),
-                1
-            )
-            
-            # Draw y-axis labels
             label = self.font.render(f"{i/100:.1f}", True, self.text_color)
             self.screen.blit(label, (graph_rect.left - 30, y - 8))
         
-        # Draw data points and lines
-        self._draw_line(graph_rect, episodes, [e * 100 for e in x_epsilons], self.x_color)
-        self._draw_line(graph_rect, episodes, [e * 100 for e in o_epsilons], self.o_color)
-        
         # Draw legend
         legend_x = graph_rect.left
         legend_y = graph_rect.bottom + 10
@@ -192,70 +239,117 @@ class StatsDisplay:
         o_label = self.font.render("O ε", True, self.o_color)
         self.screen.blit(o_label, (legend_x + 25, legend_y))
     
-    def _draw_line(self, rect, x_values, y_values, color):
-        """Draw a line graph.
+    def _get_graph_surface(self, graph):
+        """Get the cached plot surface of a graph, redrawing it if it is stale.
         
         Args:
-            rect (pygame.Rect): Graph area rectangle
-            x_values (list): X-axis values
-            y_values (list): Y-axis values
+            graph (dict): Graph description
+            
+        Returns:
+            pygame.Surface: Plot surface, the size of the graph rectangle
+        """
+        if graph['surface'] is None:
+            rect = graph['rect']
+            surface = pygame.Surface(rect.size)
+            
+            # Draw graph background and border
+            surface.fill((248, 248, 248))
+            pygame.draw.rect(surface, self.line_color, surface.get_rect(), 1)
+            
+            # Draw grid lines
+            for i in range(0, 101, 20):
+                y = rect.height - (i / 100 * rect.height)
+                pygame.draw.line(surface, self.line_color, (0, y), (rect.width, y), 1)
+            
+            # Draw data
+            graph['surface'] = surface
+            for name, color in graph['series']:
+                self._draw_series(surface, self.series[name], color, 0)
+        
+        return graph['surface']
+    
+    def _draw_last_segment(self, graph):
+        """Draw only the most recent bucket of each series onto the cached surface.
+        
+        Args:
+            graph (dict): Graph description
+        """
+        for name, color in graph['series']:
+            series = self.series[name]
+            self._draw_series(graph['surface'], series, color, len(series) - 1)
+    
+    def _draw_series(self, surface, series, color, start):
+        """Draw buckets of a series onto a plot surface.
+        
+        Each bucket becomes a vertical stroke spanning its minimum and
+        maximum, joined to the previous bucket by a line.
+        
+        Args:
+            surface (pygame.Surface): Plot surface
+            series (SeriesBuffer): Series to draw
             color (tuple): RGB color
+            start (int): Index of the first bucket to draw
         """
-        if not x_values or not y_values:
-            return
+        width, height = surface.get_size()
         
-        # Scale x_values to fit in the graph
-        x_min = min(x_values)
-        x_max = max(x_values)
-        x_range = max(1, x_max - x_min)
-        
-        # Convert data points to screen coordinates
-        points = []
-        for i in range(len(x_values)):
-            x = rect.left + (x_values[i] - x_min) / x_range * rect.width
-            y = rect.bottom - (y_values[i] / 100 * rect.height)
-            points.append((x, y))
-        
-        # Draw lines between points
-        if len(points) > 1:
-            pygame.draw.lines(self.screen, color, False, points, 2)
-        
-        # Draw points
-        for point in points:
-            pygame.draw.circle(self.screen, color, point, 3)
+        def to_y(value):
+            return height - 1 - (value / 100 * (height - 1))
+        
+        for i in range(max(0, start), len(series)):
+            first, _, low, high = series.buckets[i]
+            x = series.x_position(i, 0, width)
+            
+            if i > 0:
+                prev_x = series.x_position(i - 1, 0, width)
+                pygame.draw.line(surface, color, (prev_x, to_y(series.buckets[i - 1][1])), (x, to_y(first)), 2)
+            
+            if high > low:
+                pygame.draw.line(surface, color, (x, to_y(low)), (x, to_y(high)), 2)
+            elif series.bucket_span == 1:
+                pygame.draw.circle(surface, color, (x, to_y(first)), 3)
     
     def _draw_latest_stats(self):
         """Draw the latest statistics values."""
-        if not self.stats['episode']:
+        if self.latest is None:
             return
         
         stats_x = self.stats_area_pos[0] + 10
         stats_y = self.stats_area_pos[1] + 380
         
         # Get the latest statistics
-        latest_idx = -1
-        latest_episode = self.stats['episode'][latest_idx]
-        latest_x_wins = self.stats['x_wins'][latest_idx]
-        latest_o_wins = self.stats['o_wins'][latest_idx]
-        latest_draws = self.stats['draws'][latest_idx]
-        latest_game_length = self.stats['game_lengths'][latest_idx]
+        latest_episode = self.latest['episode']
+        latest_x_wins = self.latest['x_wins']
+        latest_o_wins = self.latest['o_wins']
+        latest_draws = self.latest['draws']
+        latest_game_length = self.latest['game_lengths']
         
         # Draw statistics
         title = self.title_font.render(f"Latest Stats (Episode {latest_episode})", True, self.text_color)
         self.screen.blit(title, (stats_x, stats_y))
         
         stats_y += 30
-        x_text = self.font.render(f"X Wins: {latest_x_wins}/100 ({latest_x_wins}%)", True, self.x_color)
+        total_games = self.latest.get('games', 100) or 1
+        x_text = self.font.render(f"X Wins: {latest_x_wins}/{total_games} ({latest_x_wins / total_games:.0%})", True, self.x_color)
         self.screen.blit(x_text, (stats_x, stats_y))
         
         stats_y += 20
-        o_text = self.font.render(f"O Wins: {latest_o_wins}/100 ({latest_o_wins}%)", True, self.o_color)
+        o_text = self.font.render(f"O Wins: {latest_o_wins}/{total_games} ({latest_o_wins / total_games:.0%})", True, self.o_color)
         self.screen.blit(o_text, (stats_x, stats_y))
         
         stats_y += 20
-        draw_text = self.font.render(f"Draws: {latest_draws}/100 ({latest_draws}%)", True, self.draw_color)
+        draw_text = self.font.render(f"Draws: {latest_draws}/{total_games} ({latest_draws / total_games:.0%})", True, self.draw_color)
         self.screen.blit(draw_text, (stats_x, stats_y))
         
         stats_y += 20
         length_text = self.font.render(f"Avg. Game Length: {latest_game_length:.1f} moves", True, self.text_color)
-        self.screen.blit(length_text, (stats_x, stats_y))
\ No newline at end of file
+        self.screen.blit(length_text, (stats_x, stats_y))
+        
+        # Longer-term trend from the stats store's rolling window
+        rolling = self.latest.get('rolling')
+        if rolling and rolling['games']:
+            stats_y += 30
+            games = rolling['games']
+            rolling_text = self.font.render(
+                f"Last {games} Games: X {rolling['x_wins'] / games:.0%}, O {rolling['o_wins'] / games:.0%}, "
+                f"Draws {rolling['draws'] / games:.0%}, {rolling['game_lengths']:.1f} moves", True, self.text_color)
+            self.screen.blit(rolling_text, (stats_x, stats_y))
\ No newline at end of file
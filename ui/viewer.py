@@ -0,0 +1,189 @@
+import multiprocessing
+import queue
+
+# Event types sent from the training process to the viewer process.
+# Events are plain tuples so they pickle small and fast.
+EVENT_RESET = 0  # (EVENT_RESET, board_size)
+EVENT_MOVE = 1   # (EVENT_MOVE, row, col, player)
+EVENT_END = 2    # (EVENT_END, winner, is_draw)
+EVENT_STATS = 3  # (EVENT_STATS, record)
+EVENT_CLOSE = 4  # (EVENT_CLOSE,)
+
+class ViewerProcess:
+    """Runs the game and stats visualization in a separate process.
+    
+    The training loop publishes compact events without ever waiting on the
+    viewer. If the event queue is full, the rest of the current game is
+    dropped; the viewer catches up by fast-forwarding through its backlog
+    without drawing intermediate frames.
+    """
+    
+    def __init__(self, screen_size=(1000, 700), caption="Gomoku RL (50x50 with 5-in-a-row)",
+                 move_delay=100, max_queue=10000, max_backlog=200):
+        """Initialize the viewer process (it is not started yet).
+        
+        Args:
+            screen_size (tuple): Window size in pixels
+            caption (str): Window caption
+            move_delay (int): Delay after each rendered move in milliseconds
+            max_queue (int): Maximum number of pending events
+            max_backlog (int): Pending events above which the viewer stops drawing
+                frames and fast-forwards
+        """
+        context = multiprocessing.get_context('spawn')
+        self.events = context.Queue(maxsize=max_queue)
+        self.process = context.Process(
+            target=run_viewer,
+            args=(self.events, screen_size, caption, move_delay, max_backlog),
+            daemon=True
+        )
+        self.dropping = False
+    
+    def start(self):
+        """Start the viewer process."""
+        self.process.start()
+    
+    def is_alive(self):
+        """Check whether the viewer window is still open.
+        
+        Returns:
+            bool: True if the viewer process is running
+        """
+        return self.process.is_alive()
+    
+    def publish(self, event):
+        """Send an event to the viewer without blocking.
+        
+        Args:
+            event (tuple): Event to send
+        
+        Returns:
+            bool: True if the event was queued, False if it was dropped
+        """
+        try:
+            self.events.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+    
+    def begin_game(self, board_size):
+        """Announce the start of a displayed game.
+        
+        Args:
+            board_size (int): Size of the board
+        """
+        self.dropping = not self.publish((EVENT_RESET, board_size))
+    
+    def move(self, row, col, player):
+        """Announce a move of the displayed game.
+        
+        Args:
+            row (int): Row index
+            col (int): Column index
+            player (str): 'X' or 'O'
+        """
+        if not self.dropping:
+            self.dropping = not self.publish((EVENT_MOVE, row, col, player))
+    
+    def end_game(self, winner, is_draw):
+        """Announce the outcome of the displayed game.
+        
+        Args:
+            winner (str): 'X', 'O' or None
+            is_draw (bool): Whether the game ended in a draw
+        """
+        if not self.dropping:
+            self.publish((EVENT_END, winner, is_draw))
+    
+    def stats(self, record):
+        """Send one statistics record to the viewer.
+        
+        Args:
+            record (dict): Values for one reporting interval
+        """
+        self.publish((EVENT_STATS, record))
+    
+    def close(self, wait=True):
+        """Tell the viewer that no more events will follow.
+        
+        Args:
+            wait (bool): Block until the user closes the viewer window
+        """
+        if self.process.is_alive():
+            try:
+                self.events.put((EVENT_CLOSE,), timeout=1.0)
+            except queue.Full:
+                self.process.terminate()
+            if wait:
+                self.process.join()
+
+def _backlog(events, max_backlog):
+    """Get the number of pending events, or an estimate where qsize is unsupported.
+    
+    Args:
+        events (multiprocessing.Queue): Event queue
+        max_backlog (int): Fast-forward threshold
+    
+    Returns:
+        int: Number of pending events
+    """
+    try:
+        return events.qsize()
+    except NotImplementedError:
+        return 0 if events.empty() else max_backlog + 1
+
+def run_viewer(events, screen_size, caption, move_delay, max_backlog):
+    """Entry point of the viewer process.
+    
+    Args:
+        events (multiprocessing.Queue): Event queue to consume
+        screen_size (tuple): Window size in pixels
+        caption (str): Window caption
+        move_delay (int): Delay after each rendered move in milliseconds
+        max_backlog (int): Pending events above which frames are skipped
+    """
+    import pygame
+    from ui.renderer import GameRenderer
+    from ui.stats_display import StatsDisplay
+    
+    pygame.init()
+    screen = pygame.display.set_mode(screen_size)
+    pygame.display.set_caption(caption)
+    renderer = GameRenderer(screen)
+    stats_display = StatsDisplay(screen)
+    
+    running = True
+    closed = False
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        
+        if closed:
+            # Producer is done; keep the final frame up until the window is closed
+            pygame.time.delay(50)
+            continue
+        
+        try:
+            event = events.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        
+        if event[0] == EVENT_CLOSE:
+            closed = True
+        else:
+            renderer.handle_event(event)
+            stats_display.handle_event(event)
+        
+        # Fast-forward: only draw once the backlog is small enough
+        if _backlog(events, max_backlog) > max_backlog or renderer.game is None:
+            continue
+        
+        renderer.draw()
+        stats_display.render()
+        pygame.display.flip()
+        
+        if event[0] == EVENT_MOVE:
+            pygame.time.delay(move_delay)
+    
+    pygame.quit()
\ No newline at end of file